@@ -3,6 +3,7 @@ from apscheduler.jobstores.sqlalchemy import SQLAlchemyJobStore
 from services.jobs_service import JobService
 from datetime import datetime, timedelta
 from utils.logger import logger
+from settings import settings
 
 
 job_stores = {
@@ -32,5 +33,14 @@ scheduler.add_job(
     replace_existing=True
 )
 
+# Retry failed egress deliveries from the outbox
+scheduler.add_job(
+    agent_job.safe_run(agent_job.drain_egress_outbox),
+    trigger="interval",
+    minutes=settings.OUTBOX_DRAIN_INTERVAL_MINUTES,
+    id="drain_egress_outbox",
+    replace_existing=True
+)
+
 logger.info("Agent starting. Scheduler is now running...")
 scheduler.start()
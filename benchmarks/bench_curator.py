@@ -0,0 +1,173 @@
+"""
+Drive CoreService's batched curation against the local fake Gemini server and report
+throughput and per-call latency for each curation mode and concurrency level.
+
+Usage:
+    python -m benchmarks.bench_curator --posts 200 --modes tool,inline,structured --concurrency 1,2,4
+    python -m benchmarks.bench_curator --latency-ms 400 --jitter-ms 200 --server-error-rate 0.05 --quota-error-rate 0.05
+"""
+import argparse
+import math
+import os
+import time
+from typing import List
+
+from fakes.fake_gemini_server import FakeGeminiServer
+
+
+def percentile(values: List[float], fraction: float) -> float:
+    """
+    Nearest-rank percentile of a list of values.
+    """
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[max(0, math.ceil(fraction * len(ordered)) - 1)]
+
+
+def seed_posts(session, post_count: int):
+    """
+    Insert uncurated synthetic posts with sentiments and a few comments each.
+    """
+    from database.models import Post, Comment, Sentiment
+
+    for i in range(post_count):
+        submission_id = f"bench{i}"
+        session.add(Post(
+            subreddit=f"bench{i % 7}",
+            submission_id=submission_id,
+            title=f"Problem {i}: tool{i} keeps failing at step{i}",
+            body=f"Every time I use tool{i} the step{i} workflow breaks. " * 10,
+            upvote_ratio=0.9,
+            score=100 + i,
+            number_of_comments=3,
+            post_url=f"https://reddit.com/{submission_id}",
+        ))
+        session.add(Sentiment(post_id=submission_id, sentiment_results={
+            "dominant_sentiment": "Negative",
+            "avg_compound": -0.4,
+            "counts": {"Negative": 2, "Neutral": 1},
+        }))
+        for j in range(3):
+            session.add(Comment(
+                submission_id=submission_id,
+                subreddit=f"bench{i % 7}",
+                title=f"Problem {i}",
+                author=f"user{j}",
+                body=f"Same here with tool{i}, comment {j}.",
+                score=j,
+            ))
+    session.commit()
+
+
+def reset_curation(session):
+    """
+    Return every post to the uncurated state and drop curation output and cached responses.
+    """
+    from database.models import (
+        Post, Sentiment, CuratedItem, CuratedProblem, ProcessedBriefs, LLMResponseCacheEntry
+    )
+
+    session.query(Post).update({Post.is_curated: False})
+    session.query(Sentiment).update({Sentiment.is_curated: False})
+    session.query(CuratedItem).delete()
+    session.query(CuratedProblem).delete()
+    session.query(ProcessedBriefs).delete()
+    session.query(LLMResponseCacheEntry).delete()
+    session.commit()
+
+
+def run_scenario(mode: str, concurrency: int, token_budget: int):
+    """
+    Run one curation engine pass and print its throughput and latency.
+    """
+    from database import get_session
+    from database.models import Post
+    from services.core_service import CoreService
+
+    session = get_session()
+    reset_curation(session)
+
+    service = CoreService()
+    service.curation_mode = mode
+    service.max_concurrency = concurrency
+    service.token_budget = token_budget
+    service.cache_enabled = False
+
+    started = time.perf_counter()
+    results = service.run_curation_engine()
+    elapsed = time.perf_counter() - started
+
+    curated = session.query(Post).filter(Post.is_curated == True).count()
+    session.close()
+
+    calls = [metric for metric in service.call_metrics if metric["status"] != "cache_hit"]
+    latencies = [metric["latency_seconds"] for metric in calls]
+    failed_batches = sum(1 for result in results if result["error"])
+    print(
+        f"{mode:>10} x{concurrency:<2} {len(results):>4} batches {failed_batches:>3} failed "
+        f"{curated:>5} posts  {elapsed:7.2f}s  {curated / elapsed:8.1f} posts/s  "
+        f"{len(calls) / elapsed:6.2f} calls/s  "
+        f"p50 {percentile(latencies, 0.50):6.3f}s  p95 {percentile(latencies, 0.95):6.3f}s  "
+        f"retries {sum(metric['retries'] for metric in calls)}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark batched curation against a fake Gemini server.")
+    parser.add_argument("--posts", type=int, default=200)
+    parser.add_argument("--modes", default="tool,inline,structured")
+    parser.add_argument("--concurrency", default="1,2,4")
+    parser.add_argument("--token-budget", type=int, default=4000)
+    parser.add_argument("--latency-ms", type=float, default=200.0)
+    parser.add_argument("--jitter-ms", type=float, default=100.0)
+    parser.add_argument("--server-error-rate", type=float, default=0.0)
+    parser.add_argument("--quota-error-rate", type=float, default=0.0)
+    parser.add_argument("--retry-after", type=float, default=0.2)
+    parser.add_argument("--requests-per-minute", type=int, default=6000)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    server = FakeGeminiServer(
+        latency_ms=args.latency_ms,
+        jitter_ms=args.jitter_ms,
+        server_error_rate=args.server_error_rate,
+        quota_error_rate=args.quota_error_rate,
+        retry_after_seconds=args.retry_after,
+        seed=args.seed
+    )
+    server.start()
+
+    # Settings are read at import time, so the environment must be prepared first.
+    os.environ.setdefault("DATABASE_URL", "sqlite://")
+    os.environ.setdefault("GEMINI_API_KEY", "fake")
+    os.environ["GEMINI_BASE_URL"] = server.base_url
+
+    from settings import settings
+    from database import get_session
+    from database.init_db import init_db
+
+    settings.GEMINI_BASE_URL = server.base_url
+    settings.GEMINI_REQUESTS_PER_MINUTE = args.requests_per_minute
+    settings.GEMINI_TOKENS_PER_MINUTE = max(settings.GEMINI_TOKENS_PER_MINUTE, args.requests_per_minute * 10000)
+    settings.GEMINI_BACKOFF_BASE_SECONDS = 0.1
+
+    init_db()
+    session = get_session()
+    seed_posts(session, args.posts)
+    session.close()
+
+    print(f"Curating {args.posts} posts against {server.base_url} "
+          f"(latency {args.latency_ms:g}+{args.jitter_ms:g}ms, "
+          f"{args.server_error_rate:.0%} server / {args.quota_error_rate:.0%} quota errors)")
+
+    try:
+        for mode in args.modes.split(","):
+            for concurrency in (int(value) for value in args.concurrency.split(",")):
+                run_scenario(mode.strip(), concurrency, args.token_budget)
+    finally:
+        server.stop()
+        print(f"Fake server: {server.stats}")
+
+
+if __name__ == "__main__":
+    main()
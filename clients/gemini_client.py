@@ -1,7 +1,14 @@
+import random
+import re
+import threading
+import time
+from typing import Any, Tuple
+from pydantic import BaseModel
 from settings import settings
 from utils.logger import logger
+from utils.rate_limiter import TokenBucket
 from google import genai
-from google.genai import types
+from google.genai import errors, types
 
 
 def initialize_gemini() -> genai.Client:
@@ -16,7 +23,14 @@ def initialize_gemini() -> genai.Client:
             "Startup failed: Please set your GEMINI_API_KEY to initialize the agent.")
 
     try:
-        client = genai.Client(api_key=api_key)
+        if settings.GEMINI_BASE_URL:
+            logger.info(f"Using Gemini endpoint {settings.GEMINI_BASE_URL}")
+            client = genai.Client(
+                api_key=api_key,
+                http_options=types.HttpOptions(base_url=settings.GEMINI_BASE_URL)
+            )
+        else:
+            client = genai.Client(api_key=api_key)
         logger.info("Gemini client initialized successfully. Agent is ready.")
         return client
 
@@ -39,3 +53,225 @@ def provide_agent_tools(tools) -> types.GenerateContentConfig | None:
     except Exception as e:
         logger.exception(f"Failed to configure agent tools: {e}")
         return None
+
+
+class CuratedProblemOutput(BaseModel):
+    """
+    One curated problem in the curator's structured output.
+    """
+    post_number: int
+    problem_statement: str
+    sentiment_statement: str
+
+
+def provide_structured_output_config() -> types.GenerateContentConfig:
+    """
+    Provides a configuration that constrains the agent to a JSON array of curated problems.
+    Tools cannot be combined with a response schema, so the posts must be inlined in the prompt.
+    """
+    return types.GenerateContentConfig(
+        response_mime_type="application/json",
+        response_schema=list[CuratedProblemOutput]
+    )
+
+
+class CircuitOpenError(Exception):
+    """
+    Raised when the Gemini circuit breaker is open and calls are being short-circuited.
+    """
+
+
+class CircuitBreaker:
+    """
+    Thread-safe circuit breaker that stops calling Gemini after repeated server failures
+    and lets a single trial call through once the reset timeout has passed.
+    """
+
+    def __init__(self, failure_threshold: int, reset_timeout: float):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at = None
+        self.trial_in_flight = False
+        self.lock = threading.Lock()
+
+
+    def allow(self) -> bool:
+        """
+        Check whether a call may proceed.
+        """
+        with self.lock:
+            if self.opened_at is None:
+                return True
+            if self.trial_in_flight or time.monotonic() - self.opened_at < self.reset_timeout:
+                return False
+            self.trial_in_flight = True
+            return True
+
+
+    def record_success(self) -> None:
+        """
+        Close the circuit after a successful call.
+        """
+        with self.lock:
+            self.failures = 0
+            self.opened_at = None
+            self.trial_in_flight = False
+
+
+    def record_failure(self) -> None:
+        """
+        Count a failed call and open the circuit once the threshold is reached.
+        """
+        with self.lock:
+            self.failures += 1
+            self.trial_in_flight = False
+            if self.failures >= self.failure_threshold:
+                if self.opened_at is None:
+                    logger.error(f"Gemini circuit opened after {self.failures} consecutive failures.")
+                self.opened_at = time.monotonic()
+
+
+def _is_quota_error(error: errors.APIError) -> bool:
+    """
+    Check whether a Gemini error is a rate limit or quota error.
+    """
+    return error.code == 429 or "RESOURCE_EXHAUSTED" in str(error)
+
+
+def _get_retry_after(error: errors.APIError) -> float | None:
+    """
+    Read the server's requested retry delay from a Retry-After header or a RetryInfo detail.
+    Returns:
+        float | None: Seconds to wait, or None if the server did not say.
+    """
+    response = getattr(error, "response", None)
+    headers = getattr(response, "headers", None)
+    if headers:
+        retry_after = headers.get("retry-after")
+        if retry_after:
+            try:
+                return float(retry_after)
+            except ValueError:
+                pass
+
+    details = error.details if isinstance(error.details, dict) else {}
+    for detail in details.get("error", details).get("details", []) or []:
+        retry_delay = detail.get("retryDelay") if isinstance(detail, dict) else None
+        if retry_delay:
+            match = re.match(r"^([0-9.]+)s$", retry_delay)
+            if match:
+                return float(match.group(1))
+
+    return None
+
+
+class ResilientGeminiCaller:
+    """
+    Call layer around generate_content with exponential backoff and jitter, Retry-After
+    handling, a circuit breaker, and per-minute request and token budgets that make
+    callers wait for capacity instead of failing.
+    """
+
+    def __init__(
+            self,
+            client: genai.Client,
+            max_retries: int,
+            backoff_base: float,
+            backoff_max: float,
+            requests_per_minute: int,
+            tokens_per_minute: int,
+            circuit_breaker: CircuitBreaker
+    ):
+        self.client = client
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.request_budget = TokenBucket(requests_per_minute)
+        self.token_budget = TokenBucket(tokens_per_minute)
+        self.circuit_breaker = circuit_breaker
+
+
+    def _backoff_delay(self, attempt: int) -> float:
+        """
+        Exponential backoff with full jitter for the given zero-based retry attempt.
+        """
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * (2 ** attempt)))
+
+
+    def generate_content(
+            self,
+            model: str,
+            contents: Any,
+            config: types.GenerateContentConfig | None = None,
+            estimated_tokens: int = 0,
+            expected_requests: int = 1
+    ) -> Tuple[types.GenerateContentResponse, int]:
+        """
+        Call generate_content, retrying server and quota errors.
+        Args:
+            model (str): Model name.
+            contents: Prompt contents.
+            config (GenerateContentConfig | None): Optional generation config.
+            estimated_tokens (int): Estimated prompt tokens, charged against the token budget.
+            expected_requests (int): Requests the call makes (2 with automatic function calling).
+        Returns:
+            Tuple[GenerateContentResponse, int]: The response and the number of retries it took.
+        Raises:
+            CircuitOpenError: If the circuit breaker is open.
+            errors.APIError: If retries are exhausted or the error is not retryable; the
+                retries made before giving up are set on the error as `retries`.
+        """
+        retries = 0
+
+        while True:
+            if not self.circuit_breaker.allow():
+                raise CircuitOpenError("Gemini circuit is open; skipping call.")
+
+            waited = self.request_budget.acquire(expected_requests)
+            waited += self.token_budget.acquire(max(1, estimated_tokens))
+            if waited:
+                logger.info(f"Waited {waited:.1f}s for Gemini request/token budget")
+
+            try:
+                response = self.client.models.generate_content(model=model, contents=contents, config=config)
+                self.circuit_breaker.record_success()
+                return response, retries
+
+            except errors.ServerError as e:
+                self.circuit_breaker.record_failure()
+                if retries >= self.max_retries:
+                    e.retries = retries
+                    raise
+                delay = _get_retry_after(e) or self._backoff_delay(retries)
+                logger.warning(f"Gemini server error ({e.code}); retrying in {delay:.1f}s")
+
+            except errors.ClientError as e:
+                # The service answered, so client and quota errors never trip the breaker.
+                self.circuit_breaker.record_success()
+                if not _is_quota_error(e) or retries >= self.max_retries:
+                    e.retries = retries
+                    raise
+                delay = _get_retry_after(e) or self._backoff_delay(retries)
+                logger.warning(f"Gemini quota exhausted; retrying in {delay:.1f}s")
+
+            retries += 1
+            time.sleep(delay)
+
+
+def create_resilient_caller(client: genai.Client) -> ResilientGeminiCaller:
+    """
+    Creates a ResilientGeminiCaller configured from settings.
+    """
+    return ResilientGeminiCaller(
+        client=client,
+        max_retries=settings.GEMINI_MAX_RETRIES,
+        backoff_base=settings.GEMINI_BACKOFF_BASE_SECONDS,
+        backoff_max=settings.GEMINI_BACKOFF_MAX_SECONDS,
+        requests_per_minute=settings.GEMINI_REQUESTS_PER_MINUTE,
+        tokens_per_minute=settings.GEMINI_TOKENS_PER_MINUTE,
+        circuit_breaker=CircuitBreaker(
+            settings.GEMINI_CIRCUIT_FAILURE_THRESHOLD,
+            settings.GEMINI_CIRCUIT_RESET_SECONDS
+        )
+    )
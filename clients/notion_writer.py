@@ -0,0 +1,159 @@
+import random
+import time
+from typing import Callable, Dict, List, Optional
+from notion_client import APIErrorCode, APIResponseError, Client
+from notion_client.errors import RequestTimeoutError
+from settings import settings
+from utils.logger import logger
+from utils.rate_limiter import TokenBucket
+
+RETRYABLE_ERROR_CODES = {
+    APIErrorCode.RateLimited,
+    APIErrorCode.ConflictError,
+    APIErrorCode.InternalServerError,
+    APIErrorCode.ServiceUnavailable,
+}
+
+
+def create_notion_client() -> Client:
+    """
+    Create a Notion client, honouring NOTION_BASE_URL for mock servers.
+    """
+    if settings.NOTION_BASE_URL:
+        logger.info(f"Using Notion endpoint {settings.NOTION_BASE_URL}")
+        return Client(auth=settings.NOTION_API_KEY, base_url=settings.NOTION_BASE_URL)
+    return Client(auth=settings.NOTION_API_KEY)
+
+
+def batch_blocks(blocks: List[Dict], batch_size: int) -> List[List[Dict]]:
+    """
+    Split blocks into batches no larger than Notion's per-request children limit.
+    """
+    return [blocks[start:start + batch_size] for start in range(0, len(blocks), batch_size)]
+
+
+class NotionWriter:
+    """
+    Writes long pages to Notion: the page is created with the first batch of blocks and
+    the rest is appended in maximum-size batches, paced by a shared request budget.
+    Rate-limited and transient failures are retried, honouring Retry-After, and progress
+    is reported after every batch so an interrupted upload can resume where it stopped.
+    """
+
+    def __init__(
+            self,
+            client: Client,
+            requests_per_minute: int,
+            batch_size: int,
+            max_retries: int,
+            backoff_base: float = 1.0,
+            backoff_max: float = 30.0
+    ):
+        self.client = client
+        self.rate_limiter = TokenBucket(requests_per_minute, capacity=max(1, requests_per_minute / 60))
+        self.batch_size = batch_size
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+
+
+    def _retry_delay(self, error: Exception, attempt: int) -> float:
+        """
+        Seconds to wait before retrying: Retry-After when Notion sends it, otherwise
+        exponential backoff with full jitter.
+        """
+        headers = getattr(error, "headers", None)
+        retry_after = headers.get("retry-after") if headers else None
+        if retry_after:
+            try:
+                return float(retry_after)
+            except ValueError:
+                pass
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * (2 ** attempt)))
+
+
+    def _request(self, description: str, send: Callable[[], Dict]) -> Dict:
+        """
+        Send one paced request, retrying rate limits, conflicts, 5xx errors and timeouts.
+        """
+        attempt = 0
+        while True:
+            self.rate_limiter.acquire()
+            try:
+                return send()
+
+            except APIResponseError as error:
+                if error.code not in RETRYABLE_ERROR_CODES or attempt >= self.max_retries:
+                    raise
+                delay = self._retry_delay(error, attempt)
+                logger.warning(f"Notion {description} failed ({error.code}); retrying in {delay:.1f}s")
+
+            except RequestTimeoutError as error:
+                if attempt >= self.max_retries:
+                    raise
+                delay = self._retry_delay(error, attempt)
+                logger.warning(f"Notion {description} timed out; retrying in {delay:.1f}s")
+
+            attempt += 1
+            time.sleep(delay)
+
+
+    def write_page(
+            self,
+            parent_page_id: str,
+            title: str,
+            blocks: List[Dict],
+            page_id: Optional[str] = None,
+            batches_written: int = 0,
+            on_progress: Optional[Callable[[str, int, int], None]] = None
+    ) -> str:
+        """
+        Create a page holding the given blocks, or finish a previously interrupted upload.
+        Args:
+            parent_page_id (str): Parent page ID.
+            title (str): Page title.
+            blocks (List[Dict]): Every block of the page, in order.
+            page_id (Optional[str]): Page created by an earlier attempt, to resume.
+            batches_written (int): Batches that earlier attempt already wrote.
+            on_progress (Optional[Callable[[str, int, int], None]]): Called with the page ID,
+                batches written and total batches after every batch.
+        Returns:
+            str: The page ID.
+        """
+        batches = batch_blocks(blocks, self.batch_size) or [[]]
+
+        if page_id is None:
+            response = self._request("page creation", lambda: self.client.pages.create(
+                parent={"page_id": parent_page_id},
+                properties={"title": [{"type": "text", "text": {"content": title}}]},
+                children=batches[0]
+            ))
+            page_id = response["id"]
+            batches_written = 1
+            if on_progress:
+                on_progress(page_id, batches_written, len(batches))
+        elif batches_written:
+            logger.info(f"Resuming Notion page {page_id} after {batches_written}/{len(batches)} batch(es)")
+
+        for index in range(batches_written, len(batches)):
+            batch = batches[index]
+            self._request("block append", lambda: self.client.blocks.children.append(
+                block_id=page_id, children=batch))
+            batches_written = index + 1
+            if on_progress:
+                on_progress(page_id, batches_written, len(batches))
+
+        logger.info(f"Wrote {len(blocks)} block(s) to Notion page {page_id} in {len(batches)} batch(es)")
+        return page_id
+
+
+def create_notion_writer(client: Client) -> NotionWriter:
+    """
+    Build a NotionWriter configured from settings.
+    """
+    return NotionWriter(
+        client=client,
+        requests_per_minute=settings.NOTION_REQUESTS_PER_MINUTE,
+        batch_size=settings.NOTION_MAX_BLOCKS_PER_REQUEST,
+        max_retries=settings.NOTION_MAX_RETRIES
+    )
@@ -1,9 +1,13 @@
+import threading
 import praw
 from dotenv import load_dotenv
 from settings import settings
 from utils.logger import logger
+from utils.rate_limiter import TokenBucket
 
-_reddit_instance = None
+# PRAW is not thread-safe, so every thread gets its own client.
+_reddit_local = threading.local()
+_rate_limiter_instance = None
 
 
 def _validate_reddit_secrets(reddit_secrets: dict) -> bool:
@@ -80,17 +84,34 @@ def _create_reddit_client() -> praw.Reddit | None:
 
 def get_reddit_client() -> praw.Reddit | None:
     """
-    Returns the Reddit client instance.
+    Returns the Reddit client instance of the calling thread, creating it on first use.
+    Workers fetching concurrently each get their own client and share only the rate budget.
 
     Returns:
         praw.Reddit | None: The Reddit client instance.
     """
-    global _reddit_instance
+    reddit = getattr(_reddit_local, "reddit", None)
 
-    if _reddit_instance is None:
-        logger.info("Creating new Reddit client instance.")
-        _reddit_instance = _create_reddit_client()
+    if reddit is None:
+        logger.info(f"Creating new Reddit client instance for thread {threading.current_thread().name}.")
+        reddit = _create_reddit_client()
+        _reddit_local.reddit = reddit
     else:
-        logger.info("Returning existing Reddit client instance.")
+        logger.debug("Returning existing Reddit client instance.")
 
-    return _reddit_instance
+    return reddit
+
+
+def get_reddit_rate_limiter() -> TokenBucket:
+    """
+    Returns the token bucket shared by every Reddit API worker.
+
+    Returns:
+        TokenBucket: The shared Reddit request budget.
+    """
+    global _rate_limiter_instance
+
+    if _rate_limiter_instance is None:
+        _rate_limiter_instance = TokenBucket(settings.REDDIT_REQUESTS_PER_MINUTE)
+
+    return _rate_limiter_instance
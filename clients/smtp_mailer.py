@@ -0,0 +1,173 @@
+import smtplib
+from concurrent.futures import ThreadPoolExecutor
+from email.message import EmailMessage
+from smtplib import (SMTPAuthenticationError, SMTPConnectError, SMTPException, SMTPRecipientsRefused,
+                     SMTPResponseException, SMTPServerDisconnected)
+from typing import Dict, List, Optional, Tuple
+from settings import settings
+from utils.logger import logger
+
+
+class SMTPMailer:
+    """
+    Sends many messages over a small pool of authenticated SMTP sessions. Each session
+    is opened once, does STARTTLS and logs in once, and is reused for every message it
+    sends; a session dropped by the server is reopened and the message retried, up to
+    max_reconnects times in a row.
+    Failures are reported per recipient, so one rejected address does not fail the rest.
+    """
+
+    def __init__(
+            self,
+            host: str,
+            port: int,
+            username: Optional[str],
+            password: Optional[str],
+            use_tls: bool,
+            timeout: float,
+            pool_size: int,
+            max_reconnects: int
+    ):
+        self.host = host
+        self.port = port
+        self.username = username
+        self.password = password
+        self.use_tls = use_tls
+        self.timeout = timeout
+        self.pool_size = max(1, pool_size)
+        self.max_reconnects = max_reconnects
+
+
+    def _connect(self) -> smtplib.SMTP:
+        """
+        Open and authenticate one SMTP session.
+        """
+        smtp = smtplib.SMTP(self.host, self.port, timeout=self.timeout)
+        try:
+            if self.use_tls:
+                smtp.starttls()
+            if self.username and self.password:
+                smtp.login(self.username, self.password)
+        except Exception:
+            self._close(smtp)
+            raise
+        return smtp
+
+
+    @staticmethod
+    def _close(smtp: Optional[smtplib.SMTP]):
+        """
+        End a session, ignoring errors from a connection that is already gone.
+        """
+        if smtp is None:
+            return
+        try:
+            smtp.quit()
+        except Exception:
+            smtp.close()
+
+
+    def _send_over_session(self, messages: List[Tuple[str, EmailMessage]]) -> Dict[str, Dict]:
+        """
+        Send messages one after another over a single reused session.
+        """
+        results: Dict[str, Dict] = {}
+        smtp = None
+        reconnects = 0
+        fatal_error = None
+
+        try:
+            for recipient, message in messages:
+                if fatal_error:
+                    results[recipient] = {"success": False, "error": fatal_error}
+                    continue
+
+                while True:
+                    try:
+                        if smtp is None:
+                            smtp = self._connect()
+                        smtp.send_message(message, to_addrs=[recipient])
+                        results[recipient] = {"success": True, "error": None}
+                        reconnects = 0
+                        break
+
+                    except SMTPRecipientsRefused as e:
+                        code, reason = e.recipients.get(recipient, (None, b""))
+                        error = f"Recipient refused: {code} {reason.decode(errors='replace')}".strip()
+                        results[recipient] = {"success": False, "error": error}
+                        break
+
+                    except SMTPAuthenticationError as e:
+                        # Every later message would fail the same way, so stop connecting.
+                        logger.error("SMTP authentication failed.", exc_info=True)
+                        fatal_error = f"SMTP authentication failed: {e.smtp_code}"
+                        results[recipient] = {"success": False, "error": fatal_error}
+                        break
+
+                    except (SMTPServerDisconnected, SMTPConnectError, ConnectionError, TimeoutError) as e:
+                        self._close(smtp)
+                        smtp = None
+                        if reconnects < self.max_reconnects:
+                            reconnects += 1
+                            logger.warning(f"SMTP connection lost ({e}); reconnecting ({reconnects}/{self.max_reconnects})")
+                            continue
+                        results[recipient] = {"success": False, "error": f"SMTP connection failed: {e}"}
+                        break
+
+                    except SMTPResponseException as e:
+                        # The server rejected this message; the session itself is still usable.
+                        reason = e.smtp_error.decode(errors="replace") if isinstance(e.smtp_error, bytes) else e.smtp_error
+                        results[recipient] = {"success": False, "error": f"{e.smtp_code} {reason}"}
+                        break
+
+                    except (SMTPException, OSError) as e:
+                        self._close(smtp)
+                        smtp = None
+                        results[recipient] = {"success": False, "error": str(e) or type(e).__name__}
+                        break
+        finally:
+            self._close(smtp)
+
+        return results
+
+
+    def send_many(self, messages: List[Tuple[str, EmailMessage]]) -> Dict[str, Dict]:
+        """
+        Send each message to its recipient, spreading them across the session pool.
+        Args:
+            messages (List[Tuple[str, EmailMessage]]): (recipient, message) pairs.
+        Returns:
+            Dict[str, Dict]: Per-recipient "success" and "error".
+        """
+        if not messages:
+            return {}
+
+        session_count = min(self.pool_size, len(messages))
+        groups = [messages[index::session_count] for index in range(session_count)]
+        if session_count == 1:
+            results = self._send_over_session(groups[0])
+        else:
+            results = {}
+            with ThreadPoolExecutor(max_workers=session_count, thread_name_prefix="smtp") as executor:
+                for group_results in executor.map(self._send_over_session, groups):
+                    results.update(group_results)
+
+        sent = sum(1 for result in results.values() if result["success"])
+        logger.info(f"Emailed {sent}/{len(messages)} recipient(s) over {session_count} SMTP session(s)")
+        return results
+
+
+def create_smtp_mailer() -> SMTPMailer:
+    """
+    Build an SMTPMailer configured from settings.
+    """
+    return SMTPMailer(
+        host=settings.SMTP_HOST,
+        port=settings.SMTP_PORT,
+        username=settings.EMAIL_ADDRESS,
+        password=settings.EMAIL_APP_PASSWORD,
+        use_tls=settings.SMTP_USE_TLS,
+        timeout=settings.SMTP_TIMEOUT_SECONDS,
+        pool_size=settings.SMTP_POOL_SIZE,
+        max_reconnects=settings.SMTP_MAX_RECONNECTS
+    )
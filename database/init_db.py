@@ -1,10 +1,35 @@
+from sqlalchemy import inspect, text
 from database import Base, database_engine
 from utils.logger import logger
 
 
+def add_missing_columns():
+    """
+    Add nullable columns that were introduced after a table was first created,
+    since create_all() only creates missing tables.
+    """
+    inspector = inspect(database_engine)
+
+    with database_engine.begin() as connection:
+        for table in Base.metadata.sorted_tables:
+            if not inspector.has_table(table.name):
+                continue
+
+            existing_columns = {column["name"] for column in inspector.get_columns(table.name)}
+            for column in table.columns:
+                if column.name in existing_columns or not column.nullable:
+                    continue
+
+                column_type = column.type.compile(dialect=database_engine.dialect)
+                connection.execute(text(
+                    f"ALTER TABLE {table.name} ADD COLUMN {column.name} {column_type}"))
+                logger.info(f"Added missing column {table.name}.{column.name}")
+
+
 def init_db():
     try:
         Base.metadata.create_all(bind=database_engine)
+        add_missing_columns()
         logger.info(
             "Database initialized successfully (new tables created if missing).")
     except Exception as e:
@@ -1,8 +1,16 @@
-from sqlalchemy import Column, Integer, String, Float, Text, ForeignKey, Boolean, JSON
+from datetime import datetime, timezone
+from sqlalchemy import Column, Integer, String, Float, Text, ForeignKey, Boolean, JSON, DateTime, UniqueConstraint, Index
 from sqlalchemy.orm import relationship
 from database import Base
 
 
+def utc_now() -> datetime:
+    """
+    Current UTC time as a naive datetime, matching how DateTime columns are stored.
+    """
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
 class Post(Base):
     __tablename__ = "posts"
 
@@ -46,6 +54,7 @@ class Sentiment(Base):
         "posts.submission_id", ondelete="CASCADE"), nullable=False)
     sentiment_results = Column(JSON, nullable=False)
     is_curated = Column(Boolean, default=False)
+    comment_fingerprint = Column(String(64))
 
     post = relationship("Post", back_populates="sentiments")
 
@@ -63,3 +72,104 @@ class CuratedItem(Base):
     id = Column(Integer, primary_key=True, autoincrement=True)
     submission_id = Column(String(20), nullable=False, unique=True)
     scheduled_deletion = Column(Boolean, default=False)
+
+
+class IngestCursor(Base):
+    __tablename__ = "ingest_cursors"
+    __table_args__ = (
+        UniqueConstraint("subreddit", "listing", name="uq_ingest_cursors_subreddit_listing"),
+    )
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    subreddit = Column(String(100), nullable=False)
+    listing = Column(String(20), nullable=False)
+    last_fullname = Column(String(20))
+    last_created_utc = Column(Float)
+    updated_at = Column(DateTime, default=utc_now)
+
+
+class SentimentCacheEntry(Base):
+    __tablename__ = "sentiment_cache"
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    content_hash = Column(String(64), nullable=False, unique=True)
+    # Double precision so cached scores match freshly computed ones exactly.
+    compound = Column(Float(precision=53), nullable=False)
+    created_at = Column(DateTime, default=utc_now)
+
+
+class LLMResponseCacheEntry(Base):
+    __tablename__ = "llm_response_cache"
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    cache_key = Column(String(64), nullable=False, unique=True)
+    model = Column(String(100), nullable=False)
+    response_text = Column(Text, nullable=False)
+    created_at = Column(DateTime, default=utc_now)
+
+
+class CuratedProblem(Base):
+    __tablename__ = "curated_problems"
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    brief_id = Column(Integer, ForeignKey("processed_briefs.id", ondelete="CASCADE"), index=True)
+    submission_id = Column(String(20), nullable=False, index=True)
+    post_number = Column(Integer)
+    problem_statement = Column(Text, nullable=False)
+    sentiment_statement = Column(Text)
+    created_at = Column(DateTime, default=utc_now)
+
+
+class LLMCall(Base):
+    __tablename__ = "llm_calls"
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    run_id = Column(String(32), nullable=False, index=True)
+    model = Column(String(100), nullable=False)
+    mode = Column(String(20))
+    # "success", "error" or "cache_hit"
+    status = Column(String(20), nullable=False)
+    cache_hit = Column(Boolean, default=False)
+    prompt_tokens = Column(Integer, default=0)
+    candidate_tokens = Column(Integer, default=0)
+    total_tokens = Column(Integer, default=0)
+    latency_seconds = Column(Float, default=0.0)
+    round_trips = Column(Integer, default=0)
+    retries = Column(Integer, default=0)
+    error = Column(Text)
+    created_at = Column(DateTime, default=utc_now, index=True)
+
+
+class NotionUpload(Base):
+    __tablename__ = "notion_uploads"
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    brief_id = Column(Integer, ForeignKey("processed_briefs.id", ondelete="CASCADE"), nullable=False, unique=True)
+    page_id = Column(String(64))
+    # Block batches written so far; the page is created with the first one.
+    batches_written = Column(Integer, default=0)
+    total_batches = Column(Integer)
+    # "in_progress" or "completed"
+    status = Column(String(20), nullable=False, default="in_progress")
+    updated_at = Column(DateTime, default=utc_now, onupdate=utc_now)
+
+
+class EgressOutboxEntry(Base):
+    __tablename__ = "egress_outbox"
+    __table_args__ = (
+        UniqueConstraint("brief_id", "channel", "recipient", name="uq_egress_outbox_brief_channel_recipient"),
+        Index("ix_egress_outbox_status_next_attempt_at", "status", "next_attempt_at"),
+    )
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    brief_id = Column(Integer, ForeignKey("processed_briefs.id", ondelete="CASCADE"), nullable=False)
+    channel = Column(String(20), nullable=False)
+    recipient = Column(String(255), nullable=False, default="")
+    # "pending", "sending", "sent" or "dead" (gave up after OUTBOX_MAX_ATTEMPTS)
+    status = Column(String(20), nullable=False, default="pending")
+    attempts = Column(Integer, nullable=False, default=0)
+    next_attempt_at = Column(DateTime, default=utc_now)
+    last_error = Column(Text)
+    created_at = Column(DateTime, default=utc_now)
+    updated_at = Column(DateTime, default=utc_now)
+    sent_at = Column(DateTime)
@@ -0,0 +1,310 @@
+"""
+Local stand-in for the Gemini REST endpoint used by google.genai's generate_content.
+
+It implements POST /v1beta/models/{model}:generateContent including function-calling
+round trips, JSON (schema-constrained) responses, configurable latency and injected
+server and RESOURCE_EXHAUSTED errors. Responses are derived from the request only,
+so the same prompt always gets the same answer.
+
+Point the app at it with GEMINI_BASE_URL:
+    python -m fakes.fake_gemini_server --port 8765 --latency-ms 300 --server-error-rate 0.05
+    GEMINI_BASE_URL=http://127.0.0.1:8765 GEMINI_API_KEY=fake python main.py
+"""
+import argparse
+import hashlib
+import json
+import random
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional, Tuple
+
+GENERATE_CONTENT_PATH = re.compile(r"^/v1beta/models/([^/:]+):generateContent$")
+POSTS_MARKER = "Posts:\n"
+
+
+def estimate_tokens(value: Any) -> int:
+    """
+    Roughly estimate tokens the way the service bills them (about four characters per token).
+    """
+    text = value if isinstance(value, str) else json.dumps(value)
+    return len(text) // 4 + 1
+
+
+def find_function_declarations(body: Dict) -> List[Dict]:
+    """
+    Collect the function declarations of every tool in a request.
+    """
+    declarations = []
+    for tool in body.get("tools") or []:
+        declarations.extend(tool.get("functionDeclarations") or [])
+    return declarations
+
+
+def find_function_result(body: Dict) -> Optional[Any]:
+    """
+    Return the result of the latest function response in the conversation, if any.
+    """
+    for content in reversed(body.get("contents") or []):
+        for part in content.get("parts") or []:
+            if "functionResponse" in part:
+                response = part["functionResponse"].get("response") or {}
+                return response.get("result", response)
+    return None
+
+
+def find_prompt_records(body: Dict) -> Optional[List[Dict]]:
+    """
+    Return the post records inlined in the prompt after the "Posts:" marker, if any.
+    """
+    for content in body.get("contents") or []:
+        for part in content.get("parts") or []:
+            text = part.get("text") or ""
+            if POSTS_MARKER in text:
+                try:
+                    return json.loads(text.split(POSTS_MARKER, 1)[1])
+                except json.JSONDecodeError:
+                    return None
+    return None
+
+
+def record_field(record: Dict, long_key: str, short_key: str, default: Any = None) -> Any:
+    """
+    Read a field from a full or compact post record.
+    """
+    return record.get(long_key, record.get(short_key, default))
+
+
+def build_problems(records: List[Dict]) -> List[Dict]:
+    """
+    Build one deterministic curated problem per post record.
+    """
+    problems = []
+    for record in records:
+        if not isinstance(record, dict):
+            continue
+        title = record_field(record, "title", "t", "an unnamed topic")
+        subreddit = record_field(record, "subreddit", "r", "reddit")
+        problems.append({
+            "post_number": record_field(record, "post_number", "n", 0),
+            "problem_statement": (
+                f"r/{subreddit} users face '{title}' so build a focused tool for faster results."),
+            "sentiment_statement": (
+                f"Sentiment towards '{title}' is predominantly Negative, with users describing recurring friction."),
+        })
+    return problems
+
+
+def build_answer(body: Dict) -> Dict:
+    """
+    Build the model turn for a request: a function call when tools are offered and not
+    yet answered, otherwise text (JSON when a JSON response is requested).
+    """
+    declarations = find_function_declarations(body)
+    function_result = find_function_result(body)
+
+    if declarations and function_result is None:
+        return {"role": "model", "parts": [{"functionCall": {"name": declarations[0]["name"], "args": {}}}]}
+
+    records = function_result if function_result is not None else find_prompt_records(body)
+    problems = build_problems(records) if isinstance(records, list) else []
+    generation_config = body.get("generationConfig") or {}
+
+    if generation_config.get("responseMimeType") == "application/json":
+        text = json.dumps(problems)
+    elif problems:
+        text = "\n\n".join(
+            f"{problem['problem_statement']}\nSentiment statement: {problem['sentiment_statement']}"
+            for problem in problems)
+    else:
+        digest = hashlib.sha256(json.dumps(body, sort_keys=True).encode("utf-8")).hexdigest()[:12]
+        text = f"No posts were provided (request {digest})."
+
+    return {"role": "model", "parts": [{"text": text}]}
+
+
+class FakeGeminiServer:
+    """
+    Threaded fake Gemini server with configurable latency and error injection.
+    """
+
+    def __init__(
+            self,
+            host: str = "127.0.0.1",
+            port: int = 0,
+            latency_ms: float = 0.0,
+            jitter_ms: float = 0.0,
+            server_error_rate: float = 0.0,
+            quota_error_rate: float = 0.0,
+            retry_after_seconds: float = 1.0,
+            seed: int = 0
+    ):
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.server_error_rate = server_error_rate
+        self.quota_error_rate = quota_error_rate
+        self.retry_after_seconds = retry_after_seconds
+        self.random = random.Random(seed)
+        self.lock = threading.Lock()
+        self.stats: Dict[str, int] = {"requests": 0, "server_errors": 0, "quota_errors": 0, "function_calls": 0}
+        self.httpd = ThreadingHTTPServer((host, port), self._build_handler())
+        self.httpd.daemon_threads = True
+        self.thread: Optional[threading.Thread] = None
+
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+
+    def _draw(self) -> Tuple[float, float]:
+        """
+        Draw the delay and the error roll of one request from the seeded generator.
+        """
+        with self.lock:
+            self.stats["requests"] += 1
+            delay = (self.latency_ms + self.random.uniform(0, self.jitter_ms)) / 1000.0
+            return delay, self.random.random()
+
+
+    def handle_generate_content(self, body: Dict) -> Tuple[int, Dict, Dict[str, str]]:
+        """
+        Produce the status code, JSON payload and extra headers for one request.
+        """
+        delay, roll = self._draw()
+        if delay:
+            time.sleep(delay)
+
+        if roll < self.server_error_rate:
+            with self.lock:
+                self.stats["server_errors"] += 1
+            return 500, {"error": {"code": 500, "message": "Injected internal error.", "status": "INTERNAL"}}, {}
+
+        if roll < self.server_error_rate + self.quota_error_rate:
+            with self.lock:
+                self.stats["quota_errors"] += 1
+            error = {"error": {
+                "code": 429,
+                "message": "Resource has been exhausted (injected).",
+                "status": "RESOURCE_EXHAUSTED",
+                "details": [{
+                    "@type": "type.googleapis.com/google.rpc.RetryInfo",
+                    "retryDelay": f"{self.retry_after_seconds:g}s",
+                }],
+            }}
+            return 429, error, {"Retry-After": f"{self.retry_after_seconds:g}"}
+
+        answer = build_answer(body)
+        if "functionCall" in answer["parts"][0]:
+            with self.lock:
+                self.stats["function_calls"] += 1
+
+        prompt_tokens = estimate_tokens(body.get("contents") or [])
+        candidate_tokens = estimate_tokens(answer["parts"])
+        payload = {
+            "candidates": [{"content": answer, "finishReason": "STOP", "index": 0}],
+            "usageMetadata": {
+                "promptTokenCount": prompt_tokens,
+                "candidatesTokenCount": candidate_tokens,
+                "totalTokenCount": prompt_tokens + candidate_tokens,
+            },
+            "modelVersion": "fake-gemini",
+        }
+        return 200, payload, {}
+
+
+    def _build_handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                if not GENERATE_CONTENT_PATH.match(self.path.split("?", 1)[0]):
+                    self._send(404, {"error": {"code": 404, "message": "Not found.", "status": "NOT_FOUND"}}, {})
+                    return
+
+                try:
+                    body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+                except json.JSONDecodeError:
+                    self._send(400, {"error": {"code": 400, "message": "Invalid JSON.", "status": "INVALID_ARGUMENT"}}, {})
+                    return
+
+                self._send(*server.handle_generate_content(body))
+
+            def _send(self, status: int, payload: Dict, headers: Dict[str, str]):
+                data = json.dumps(payload).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                for name, value in headers.items():
+                    self.send_header(name, value)
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+
+    def start(self) -> str:
+        """
+        Serve in a background thread and return the base URL.
+        """
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self.thread.start()
+        return self.base_url
+
+
+    def stop(self):
+        """
+        Stop serving and release the socket.
+        """
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+    def __enter__(self) -> "FakeGeminiServer":
+        self.start()
+        return self
+
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run a local fake Gemini generateContent endpoint.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency-ms", type=float, default=0.0)
+    parser.add_argument("--jitter-ms", type=float, default=0.0)
+    parser.add_argument("--server-error-rate", type=float, default=0.0)
+    parser.add_argument("--quota-error-rate", type=float, default=0.0)
+    parser.add_argument("--retry-after", type=float, default=1.0, help="Seconds advertised on quota errors.")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    server = FakeGeminiServer(
+        host=args.host,
+        port=args.port,
+        latency_ms=args.latency_ms,
+        jitter_ms=args.jitter_ms,
+        server_error_rate=args.server_error_rate,
+        quota_error_rate=args.quota_error_rate,
+        retry_after_seconds=args.retry_after,
+        seed=args.seed
+    )
+    print(f"Fake Gemini listening on {server.base_url}")
+    try:
+        server.httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.httpd.server_close()
+        print(f"Served {server.stats}")
+
+
+if __name__ == "__main__":
+    main()
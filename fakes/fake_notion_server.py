@@ -0,0 +1,261 @@
+"""
+Local mock of the Notion API endpoints used to publish briefs.
+
+It implements POST /v1/pages, PATCH /v1/blocks/{id}/children and GET /v1/blocks/{id}/children,
+enforces Notion's 100-children and 2000-character rich text limits, answers with
+429 rate_limited and Retry-After when the request rate is exceeded, and can inject
+503 service_unavailable errors.
+
+Point the app at it with NOTION_BASE_URL:
+    python -m fakes.fake_notion_server --port 8766 --requests-per-second 3
+    NOTION_BASE_URL=http://127.0.0.1:8766 NOTION_API_KEY=fake python main.py
+"""
+import argparse
+import json
+import random
+import re
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional, Tuple
+
+BLOCK_CHILDREN_PATH = re.compile(r"^/v1/blocks/([^/]+)/children$")
+MAX_CHILDREN_PER_REQUEST = 100
+MAX_RICH_TEXT_LENGTH = 2000
+
+
+def notion_error(status: int, code: str, message: str) -> Dict:
+    """
+    Build a Notion-style error body.
+    """
+    return {"object": "error", "status": status, "code": code, "message": message}
+
+
+def validate_children(children: List[Dict]) -> Optional[str]:
+    """
+    Return a validation message if the children break Notion's request limits.
+    """
+    if len(children) > MAX_CHILDREN_PER_REQUEST:
+        return f"body.children.length should be ≤ {MAX_CHILDREN_PER_REQUEST}, instead was {len(children)}."
+
+    for index, block in enumerate(children):
+        block_type = block.get("type")
+        for rich_text in (block.get(block_type) or {}).get("rich_text", []):
+            content = (rich_text.get("text") or {}).get("content", "")
+            if len(content) > MAX_RICH_TEXT_LENGTH:
+                return (f"body.children[{index}].{block_type}.rich_text.text.content.length should be "
+                        f"≤ {MAX_RICH_TEXT_LENGTH}, instead was {len(content)}.")
+    return None
+
+
+class FakeNotionServer:
+    """
+    Threaded mock Notion API with request-rate limiting and error injection.
+    """
+
+    def __init__(
+            self,
+            host: str = "127.0.0.1",
+            port: int = 0,
+            requests_per_second: float = 0.0,
+            server_error_rate: float = 0.0,
+            retry_after_seconds: float = 1.0,
+            seed: int = 0
+    ):
+        self.requests_per_second = requests_per_second
+        self.server_error_rate = server_error_rate
+        self.retry_after_seconds = retry_after_seconds
+        self.random = random.Random(seed)
+        self.lock = threading.Lock()
+        self.last_request_at = 0.0
+        self.pages: Dict[str, Dict] = {}
+        self.stats: Dict[str, int] = {"requests": 0, "rate_limited": 0, "server_errors": 0}
+        self.httpd = ThreadingHTTPServer((host, port), self._build_handler())
+        self.httpd.daemon_threads = True
+        self.thread: Optional[threading.Thread] = None
+
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+
+    def _admit(self) -> Optional[Tuple[int, Dict, Dict[str, str]]]:
+        """
+        Apply rate limiting and error injection; return an error response or None to proceed.
+        """
+        with self.lock:
+            self.stats["requests"] += 1
+            now = time.monotonic()
+            if self.requests_per_second and now - self.last_request_at < 1.0 / self.requests_per_second:
+                self.stats["rate_limited"] += 1
+                error = notion_error(429, "rate_limited", "You have been rate limited. Please try again in a few minutes.")
+                return 429, error, {"Retry-After": f"{self.retry_after_seconds:g}"}
+            self.last_request_at = now
+
+            if self.random.random() < self.server_error_rate:
+                self.stats["server_errors"] += 1
+                return 503, notion_error(503, "service_unavailable", "Injected service unavailable."), {}
+
+        return None
+
+
+    def create_page(self, body: Dict) -> Tuple[int, Dict, Dict[str, str]]:
+        """
+        Handle POST /v1/pages.
+        """
+        children = body.get("children") or []
+        message = validate_children(children)
+        if message:
+            return 400, notion_error(400, "validation_error", message), {}
+
+        page_id = str(uuid.uuid4())
+        with self.lock:
+            self.pages[page_id] = {"parent": body.get("parent"), "properties": body.get("properties"),
+                                   "children": list(children)}
+        return 200, {"object": "page", "id": page_id, "request_id": str(uuid.uuid4())}, {}
+
+
+    def append_children(self, block_id: str, body: Dict) -> Tuple[int, Dict, Dict[str, str]]:
+        """
+        Handle PATCH /v1/blocks/{id}/children.
+        """
+        if block_id not in self.pages:
+            return 404, notion_error(404, "object_not_found", f"Could not find block with ID: {block_id}."), {}
+
+        children = body.get("children") or []
+        message = validate_children(children)
+        if message:
+            return 400, notion_error(400, "validation_error", message), {}
+
+        with self.lock:
+            self.pages[block_id]["children"].extend(children)
+        return 200, {"object": "list", "results": children, "has_more": False, "next_cursor": None}, {}
+
+
+    def list_children(self, block_id: str) -> Tuple[int, Dict, Dict[str, str]]:
+        """
+        Handle GET /v1/blocks/{id}/children, returning every child at once.
+        """
+        if block_id not in self.pages:
+            return 404, notion_error(404, "object_not_found", f"Could not find block with ID: {block_id}."), {}
+        return 200, {"object": "list", "results": self.pages[block_id]["children"],
+                     "has_more": False, "next_cursor": None}, {}
+
+
+    def _build_handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def _read_body(self) -> Optional[Dict]:
+                try:
+                    return json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+                except json.JSONDecodeError:
+                    self._send(400, notion_error(400, "invalid_json", "Invalid JSON."), {})
+                    return None
+
+            def _route(self, method: str):
+                path = self.path.split("?", 1)[0]
+                rejected = server._admit()
+                if rejected:
+                    self._send(*rejected)
+                    return
+
+                match = BLOCK_CHILDREN_PATH.match(path)
+                if method == "POST" and path == "/v1/pages":
+                    body = self._read_body()
+                    if body is not None:
+                        self._send(*server.create_page(body))
+                elif method == "PATCH" and match:
+                    body = self._read_body()
+                    if body is not None:
+                        self._send(*server.append_children(match.group(1), body))
+                elif method == "GET" and match:
+                    self._send(*server.list_children(match.group(1)))
+                else:
+                    self._send(400, notion_error(400, "invalid_request_url", "Invalid request URL."), {})
+
+            def do_POST(self):
+                self._route("POST")
+
+            def do_PATCH(self):
+                self._route("PATCH")
+
+            def do_GET(self):
+                self._route("GET")
+
+            def _send(self, status: int, payload: Dict, headers: Dict[str, str]):
+                data = json.dumps(payload).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                for name, value in headers.items():
+                    self.send_header(name, value)
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+
+    def start(self) -> str:
+        """
+        Serve in a background thread and return the base URL.
+        """
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self.thread.start()
+        return self.base_url
+
+
+    def stop(self):
+        """
+        Stop serving and release the socket.
+        """
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+    def __enter__(self) -> "FakeNotionServer":
+        self.start()
+        return self
+
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run a local mock of the Notion API.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8766)
+    parser.add_argument("--requests-per-second", type=float, default=3.0,
+                        help="Requests faster than this get 429 rate_limited (0 disables).")
+    parser.add_argument("--server-error-rate", type=float, default=0.0)
+    parser.add_argument("--retry-after", type=float, default=1.0, help="Seconds advertised on rate limits.")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    server = FakeNotionServer(
+        host=args.host,
+        port=args.port,
+        requests_per_second=args.requests_per_second,
+        server_error_rate=args.server_error_rate,
+        retry_after_seconds=args.retry_after,
+        seed=args.seed
+    )
+    print(f"Fake Notion listening on {server.base_url}")
+    try:
+        server.httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.httpd.server_close()
+        print(f"Served {server.stats}; {len(server.pages)} page(s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,150 @@
+"""
+Local SMTP sink for testing email fan-out, built on aiosmtpd (pip install aiosmtpd).
+
+It accepts any login without TLS, records every delivered message, can refuse chosen
+recipients with 550 and can drop the connection after a number of messages to
+exercise reconnects.
+
+Point the app at it with the SMTP settings:
+    python -m fakes.smtp_sink --port 8025
+    SMTP_HOST=127.0.0.1 SMTP_PORT=8025 SMTP_USE_TLS=false RECIPIENT_ADDRESSES=a@example.com,b@example.com python main.py
+"""
+import argparse
+import asyncio
+import threading
+from typing import Dict, Iterable, List, Optional
+
+try:
+    from aiosmtpd.controller import Controller
+    from aiosmtpd.smtp import AuthResult
+except ImportError:
+    Controller = None
+    AuthResult = None
+
+
+class SinkHandler:
+    """
+    aiosmtpd handler that stores messages and applies the sink's failure rules.
+    """
+
+    def __init__(self, sink: "SMTPSink"):
+        self.sink = sink
+
+
+    async def handle_RCPT(self, server, session, envelope, address, rcpt_options):
+        if address.lower() in self.sink.refused_recipients:
+            return "550 5.1.1 Mailbox unavailable"
+        envelope.rcpt_tos.append(address)
+        return "250 OK"
+
+
+    async def handle_DATA(self, server, session, envelope):
+        with self.sink.lock:
+            self.sink.messages.append({
+                "from": envelope.mail_from,
+                "to": list(envelope.rcpt_tos),
+                "data": envelope.content.decode("utf-8", errors="replace"),
+            })
+            session_count = self.sink.messages_per_session.get(id(session), 0) + 1
+            self.sink.messages_per_session[id(session)] = session_count
+
+        if self.sink.disconnect_after and session_count >= self.sink.disconnect_after:
+            # Acknowledge the message, then drop the connection as a flaky server would.
+            # The close is scheduled so aiosmtpd writes the reply first.
+            asyncio.get_running_loop().call_soon(server.transport.close)
+        return "250 OK"
+
+
+class SMTPSink:
+    """
+    Threaded local SMTP server that records messages instead of delivering them.
+    """
+
+    def __init__(
+            self,
+            host: str = "127.0.0.1",
+            port: int = 8025,
+            refused_recipients: Optional[Iterable[str]] = None,
+            disconnect_after: int = 0
+    ):
+        if Controller is None:
+            raise RuntimeError("aiosmtpd is required for the SMTP sink: pip install aiosmtpd")
+
+        self.refused_recipients = {address.lower() for address in refused_recipients or []}
+        self.disconnect_after = disconnect_after
+        self.lock = threading.Lock()
+        self.messages: List[Dict] = []
+        self.messages_per_session: Dict[int, int] = {}
+        self.logins = 0
+        self.controller = Controller(
+            SinkHandler(self),
+            hostname=host,
+            port=port,
+            authenticator=self._authenticate,
+            auth_require_tls=False
+        )
+
+
+    def _authenticate(self, server, session, envelope, mechanism, auth_data):
+        with self.lock:
+            self.logins += 1
+        return AuthResult(success=True)
+
+
+    @property
+    def host(self) -> str:
+        return self.controller.hostname
+
+
+    @property
+    def port(self) -> int:
+        return self.controller.port
+
+
+    def start(self):
+        """
+        Serve in a background thread.
+        """
+        self.controller.start()
+
+
+    def stop(self):
+        """
+        Stop serving and release the socket.
+        """
+        self.controller.stop()
+
+
+    def __enter__(self) -> "SMTPSink":
+        self.start()
+        return self
+
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run a local SMTP sink.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8025)
+    parser.add_argument("--refuse", action="append", default=[], help="Recipient to refuse with 550 (repeatable).")
+    parser.add_argument("--disconnect-after", type=int, default=0,
+                        help="Drop each connection after this many messages (0 disables).")
+    args = parser.parse_args()
+
+    sink = SMTPSink(host=args.host, port=args.port, refused_recipients=args.refuse,
+                    disconnect_after=args.disconnect_after)
+    sink.start()
+    print(f"SMTP sink listening on {args.host}:{args.port}")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        sink.stop()
+        print(f"Received {len(sink.messages)} message(s) over {sink.logins} login(s)")
+
+
+if __name__ == "__main__":
+    main()
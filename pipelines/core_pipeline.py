@@ -12,10 +12,17 @@ class CorePipeline:
     def run(self):
         """
         Executes the core curation pipeline: execute agent and store response.
+        When CURATION_BATCHING is set, the whole uncurated backlog is curated in batches.
         """
         try:
             logger.info("Core Curation pipeline started")
 
+            if self.service.batching:
+                logger.info("Running batched curation engine...")
+                self.service.run_curation_engine()
+                logger.info("Core Curation pipeline complete")
+                return True
+
             logger.info("Executing curator agent...")
             self.service.execute_curator_agent()
 
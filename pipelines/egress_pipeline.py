@@ -1,5 +1,6 @@
+from typing import Dict
 from services.egress_service import EgressService
-from utils.helpers import send_by_channel
+from utils.helpers import channels_for_choice, send_by_channel
 from settings import settings
 from utils.logger import logger
 
@@ -16,22 +17,81 @@ class EgressPipeline:
 
     def run(self, choice):
         """
-        Executes the egress pipeline: query brief and deliver via chosen channels.
+        Executes the egress pipeline: query brief and deliver via chosen channels concurrently.
         """
         try:
             logger.info("Egress pipeline started")
             logger.info("Querying latest processed brief...")
             self.service.query_brief()
-            send_by_channel(
-                service=self.service,
-                choice=choice,
-                notion_only=self.notion_only,
-                email_only=self.email_only,
-                all_channels=self.all_channels,
-            )
+            if settings.OUTBOX_ENABLED:
+                channel_results = self.deliver_through_outbox(choice)
+            else:
+                channel_results = send_by_channel(
+                    service=self.service,
+                    choice=choice,
+                    notion_only=self.notion_only,
+                    email_only=self.email_only,
+                    all_channels=self.all_channels,
+                )
+
+            failed = [channel for channel, result in channel_results.items() if not result["success"]]
+            for channel in failed:
+                logger.error(f"Egress to {channel} failed: {channel_results[channel]['error']}")
+
             logger.info("Egress pipeline complete")
+            if failed:
+                return {"error": f"Delivery failed for: {', '.join(failed)}", "channels": channel_results}
             return True
 
         except Exception as e:
             logger.error(f"Error executing Egress pipeline: {e}", exc_info=True)
             return {"error": str(e)}
+
+
+    def deliver_through_outbox(self, choice) -> Dict[str, Dict]:
+        """
+        Queue the brief in the outbox for the chosen channels and drain it. Channels already
+        delivered on an earlier run are skipped; failed ones stay queued for the drain job.
+        Returns:
+            Dict[str, Dict]: Per-channel results for the brief, with "success", "error" and
+                per-recipient "recipients".
+        """
+        channels = channels_for_choice(choice, self.notion_only, self.email_only, self.all_channels)
+        brief = self.service.queried_brief
+        if not brief:
+            return {channel: {"success": False, "error": "No brief available"} for channel in channels}
+
+        self.service.enqueue_brief(channels)
+        self.service.drain_outbox()
+
+        channel_results = {channel: {"success": False, "error": "No recipients configured", "recipients": {}} for channel in channels}
+        for entry in self.service.outbox_status(brief["id"]):
+            result = channel_results.get(entry["channel"])
+            if result is None:
+                continue
+            sent = entry["status"] == "sent"
+            error = None if sent else entry["error"] or "Awaiting delivery"
+            result["recipients"][entry["recipient"]] = {"success": sent, "status": entry["status"], "error": error}
+
+        # A channel succeeds only once every one of its recipients has been delivered to.
+        for result in channel_results.values():
+            failed = [outcome for outcome in result["recipients"].values() if not outcome["success"]]
+            if result["recipients"]:
+                result["success"] = not failed
+                result["error"] = failed[0]["error"] if failed else None
+        return channel_results
+
+
+    def drain(self):
+        """
+        Retry outbox deliveries that are due, without re-running the rest of egress.
+        """
+        try:
+            outcomes = self.service.drain_outbox()
+            failed = [outcome for outcome in outcomes if outcome["status"] != "sent"]
+            if failed:
+                return {"error": f"{len(failed)} outbox deliver(ies) failed", "entries": outcomes}
+            return True
+        except Exception as e:
+            logger.error(f"Error draining egress outbox: {e}", exc_info=True)
+            return {"error": str(e)}
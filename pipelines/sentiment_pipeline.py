@@ -1,3 +1,4 @@
+import argparse
 from services.sentiment_service import SentimentService
 from utils.logger import logger
 
@@ -9,28 +10,52 @@ class SentimentPipeline:
         self.service = SentimentService()
 
 
-    def run(self):
+    def run(self, full_rescore: bool = False):
         """
         Executes the sentiment analysis pipeline: query, analyze, summarize, and store.
+        When SENTIMENT_STREAMING is set the four steps run as a single streaming pass.
+        Args:
+            full_rescore (bool): Re-score every post instead of only new or changed ones.
         """
         try:
             logger.info("Sentiment pipeline started")
+            if full_rescore:
+                self.service.full_rescore = True
 
-            logger.info("Querying posts with comments...")
-            self.service.query_posts_with_comments()
+            # One scoring pool is shared by the whole run and shut down when it ends.
+            with self.service:
+                if self.service.streaming:
+                    logger.info("Streaming query, analysis, summary and storage...")
+                    self.service.run_streaming()
+                    logger.info("Sentiment pipeline complete")
+                    return True
 
-            logger.info("Analyzing sentiment...")
-            self.service.analyze_post_sentiment()
+                logger.info("Querying posts with comments...")
+                self.service.query_posts_with_comments()
 
-            logger.info("Summarizing sentiment...")
-            self.service.summarize_post_sentiment()
+                logger.info("Analyzing sentiment...")
+                self.service.analyze_post_sentiment()
 
-            logger.info("Storing sentiment results...")
-            self.service.store_sentiment_results()
+                logger.info("Summarizing sentiment...")
+                self.service.summarize_post_sentiment()
 
-            logger.info("Sentiment pipeline complete")
-            return True
+                logger.info("Storing sentiment results...")
+                self.service.store_sentiment_results()
+
+                logger.info("Sentiment pipeline complete")
+                return True
 
         except Exception as e:
             logger.error(f"Error in Sentiment Analysis pipeline: {e}", exc_info=True)
             return {"error": str(e)}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run the sentiment analysis pipeline.")
+    parser.add_argument(
+        "--full-rescore",
+        action="store_true",
+        help="Re-score every post and replace all stored sentiments.")
+    args = parser.parse_args()
+
+    SentimentPipeline().run(full_rescore=args.full_rescore)
@@ -24,3 +24,10 @@ class BriefRepository:
         Retrieve the first (or latest) processed brief.
         """
         return self.session.query(ProcessedBriefs).first()
+
+
+    def get_brief_by_id(self, brief_id: int) -> Optional[ProcessedBriefs]:
+        """
+        Retrieve a processed brief by its ID.
+        """
+        return self.session.query(ProcessedBriefs).filter(ProcessedBriefs.id == brief_id).first()
@@ -1,6 +1,11 @@
 from typing import List, Dict
+from sqlalchemy import insert, func
 from sqlalchemy.orm import Session
 from database.models import Comment
+from utils.helpers import execute_in_batches
+
+# Fingerprint of a submission without comments, so its empty sentiment is not re-scored.
+NO_COMMENTS_FINGERPRINT = ""
 
 class CommentRepository:
     """
@@ -29,13 +34,111 @@ class CommentRepository:
         return count
 
 
-    def store_comments(self, reddit_data: dict) -> int:
+    def bulk_create_comments(self, comments_data: List[Dict], batch_size: int = 1000) -> int:
+        """
+        Store multiple comments with batched Core inserts.
+        Comments carry no natural unique key, so this is a plain executemany insert.
+        """
+        rows = []
+        for comment_data in comments_data:
+            rows.append({
+                "submission_id": comment_data["submission_id"],
+                "title": comment_data.get("title", ""),
+                "subreddit": comment_data.get("subreddit", ""),
+                "author": comment_data.get("author", ""),
+                "body": comment_data.get("body", ""),
+                "score": comment_data.get("score", 0)
+            })
+
+        if not rows:
+            return 0
+
+        return execute_in_batches(self.session, insert(Comment), rows, batch_size)
+
+
+    def store_comments(self, reddit_data: dict, bulk: bool = False, batch_size: int = 1000) -> int:
         """
         Extract and persist comments from raw Reddit data.
         Args:
             reddit_data (dict): Raw Reddit data containing a 'comments' list.
+            bulk (bool): Use the batched Core insert path instead of the ORM.
+            batch_size (int): Rows per executemany batch when bulk is set.
         Returns:
             int: Number of comments stored.
         """
         comments_to_store = reddit_data.get("comments", [])
+        if bulk:
+            return self.bulk_create_comments(comments_to_store, batch_size)
         return self.create_comments(comments_to_store)
+
+
+    def delete_comments_by_submission_ids(self, submission_ids: List[str]) -> int:
+        """
+        Delete all comments belonging to the given submissions.
+        Returns:
+            int: Number of comments deleted.
+        """
+        if not submission_ids:
+            return 0
+
+        return self.session.query(Comment).filter(
+            Comment.submission_id.in_(submission_ids)
+        ).delete(synchronize_session=False)
+
+
+    def get_comment_fingerprints(self) -> Dict[str, str]:
+        """
+        Compute a cheap fingerprint of each submission's comment set in one grouped query.
+        Comments are append-only (refreshes replace them with new rows), so the count
+        and highest comment ID change whenever the set changes.
+        Returns:
+            Dict[str, str]: "<count>:<max id>" keyed by submission ID.
+        """
+        results = (
+            self.session.query(Comment.submission_id, func.count(Comment.id), func.max(Comment.id))
+            .group_by(Comment.submission_id)
+            .all()
+        )
+        fingerprints = {}
+        for submission_id, comment_count, max_comment_id in results:
+            fingerprints[submission_id] = f"{comment_count}:{max_comment_id}"
+        return fingerprints
+
+
+    def get_top_comments(self, submission_ids: List[str], per_post: int, chunk_size: int = 500) -> Dict[str, List[Dict]]:
+        """
+        Retrieve the highest-scoring comments of each submission.
+        Args:
+            submission_ids (List[str]): Submissions to fetch comments for.
+            per_post (int): Maximum comments per submission.
+        Returns:
+            Dict[str, List[Dict]]: Comment bodies and scores keyed by submission ID, best first.
+        """
+        top_comments: Dict[str, List[Dict]] = {}
+        if not submission_ids or per_post <= 0:
+            return top_comments
+
+        for start in range(0, len(submission_ids), chunk_size):
+            ranked = (
+                self.session.query(
+                    Comment.submission_id,
+                    Comment.body,
+                    Comment.score,
+                    func.row_number().over(
+                        partition_by=Comment.submission_id,
+                        order_by=(Comment.score.desc(), Comment.id)
+                    ).label("rank")
+                )
+                .filter(Comment.submission_id.in_(submission_ids[start:start + chunk_size]))
+                .subquery()
+            )
+            results = (
+                self.session.query(ranked.c.submission_id, ranked.c.body, ranked.c.score)
+                .filter(ranked.c.rank <= per_post)
+                .order_by(ranked.c.submission_id, ranked.c.rank)
+                .all()
+            )
+            for row in results:
+                top_comments.setdefault(row.submission_id, []).append({"body": row.body, "score": row.score})
+
+        return top_comments
@@ -0,0 +1,57 @@
+from typing import Dict, List
+from sqlalchemy.orm import Session
+from database.models import IngestCursor, utc_now
+
+class CursorRepository:
+    """
+    Repository for handling per-subreddit IngestCursor high-water marks.
+    """
+    def __init__(self, session: Session):
+        self.session = session
+
+
+    def get_cursors(self, subreddits: List[str], listing: str) -> Dict[str, Dict]:
+        """
+        Retrieve the stored cursors for the given subreddits and listing type.
+        Returns:
+            Dict[str, Dict]: Cursor data keyed by subreddit name.
+        """
+        if not subreddits:
+            return {}
+
+        results = (
+            self.session.query(IngestCursor)
+            .filter(IngestCursor.listing == listing)
+            .filter(IngestCursor.subreddit.in_(subreddits))
+            .all()
+        )
+        cursors = {}
+        for cursor in results:
+            cursors[cursor.subreddit] = {
+                "fullname": cursor.last_fullname,
+                "created_utc": cursor.last_created_utc,
+            }
+        return cursors
+
+
+    def save_cursor(self, subreddit: str, listing: str, fullname: str, created_utc: float) -> IngestCursor:
+        """
+        Create or advance the cursor for a subreddit and listing type.
+        A cursor is never moved back to an older item.
+        """
+        cursor = (
+            self.session.query(IngestCursor)
+            .filter(IngestCursor.subreddit == subreddit, IngestCursor.listing == listing)
+            .first()
+        )
+
+        if cursor is None:
+            cursor = IngestCursor(subreddit=subreddit, listing=listing)
+            self.session.add(cursor)
+        elif cursor.last_created_utc is not None and created_utc <= cursor.last_created_utc:
+            return cursor
+
+        cursor.last_fullname = fullname
+        cursor.last_created_utc = created_utc
+        cursor.updated_at = utc_now()
+        return cursor
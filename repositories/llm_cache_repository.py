@@ -0,0 +1,72 @@
+from datetime import timedelta
+from typing import Optional
+from sqlalchemy.orm import Session
+from database.models import LLMResponseCacheEntry, utc_now
+
+class LLMCacheRepository:
+    """
+    Repository for handling LLMResponseCacheEntry database operations.
+    """
+    def __init__(self, session: Session):
+        self.session = session
+
+
+    def get_response(self, cache_key: str, ttl_hours: int) -> Optional[str]:
+        """
+        Retrieve a cached response that is younger than the TTL.
+        """
+        cutoff = utc_now() - timedelta(hours=ttl_hours)
+        entry = (
+            self.session.query(LLMResponseCacheEntry)
+            .filter(LLMResponseCacheEntry.cache_key == cache_key)
+            .filter(LLMResponseCacheEntry.created_at >= cutoff)
+            .first()
+        )
+        if entry is None:
+            return None
+        return entry.response_text
+
+
+    def save_response(self, cache_key: str, model: str, response_text: str) -> LLMResponseCacheEntry:
+        """
+        Store a response, replacing any previous (expired) entry for the same key.
+        """
+        entry = (
+            self.session.query(LLMResponseCacheEntry)
+            .filter(LLMResponseCacheEntry.cache_key == cache_key)
+            .first()
+        )
+        if entry is None:
+            entry = LLMResponseCacheEntry(cache_key=cache_key)
+            self.session.add(entry)
+
+        entry.model = model
+        entry.response_text = response_text
+        entry.created_at = utc_now()
+        return entry
+
+
+    def evict(self, ttl_hours: int, max_entries: int) -> int:
+        """
+        Delete expired entries, then the oldest entries beyond max_entries.
+        Returns:
+            int: Number of entries deleted.
+        """
+        cutoff = utc_now() - timedelta(hours=ttl_hours)
+        deleted = self.session.query(LLMResponseCacheEntry).filter(
+            LLMResponseCacheEntry.created_at < cutoff
+        ).delete(synchronize_session=False)
+
+        threshold = (
+            self.session.query(LLMResponseCacheEntry.id)
+            .order_by(LLMResponseCacheEntry.id.desc())
+            .offset(max_entries)
+            .limit(1)
+            .scalar()
+        )
+        if threshold is not None:
+            deleted += self.session.query(LLMResponseCacheEntry).filter(
+                LLMResponseCacheEntry.id <= threshold
+            ).delete(synchronize_session=False)
+
+        return deleted
@@ -0,0 +1,103 @@
+from datetime import timedelta
+from typing import List, Dict, Optional
+from sqlalchemy import func, case
+from sqlalchemy.orm import Session
+from database.models import LLMCall, utc_now
+
+class LLMCallRepository:
+    """
+    Repository for handling LLMCall database operations.
+    """
+    def __init__(self, session: Session):
+        self.session = session
+
+
+    def create_calls(self, run_id: str, calls: List[Dict]) -> List[LLMCall]:
+        """
+        Record Gemini calls made (or skipped through the response cache) during a run.
+        Args:
+            run_id (str): ID of the curation run.
+            calls (List[Dict]): Call metrics as recorded by CoreService.
+        """
+        rows = [
+            LLMCall(
+                run_id=run_id,
+                model=call["model"],
+                mode=call.get("mode"),
+                status=call["status"],
+                cache_hit=call["status"] == "cache_hit",
+                prompt_tokens=call.get("prompt_tokens", 0),
+                candidate_tokens=call.get("candidate_tokens", 0),
+                total_tokens=call.get("total_tokens", 0),
+                latency_seconds=call.get("latency_seconds", 0.0),
+                round_trips=call.get("round_trips", 0),
+                retries=call.get("retries", 0),
+                error=call.get("error")
+            )
+            for call in calls
+        ]
+        self.session.add_all(rows)
+        return rows
+
+
+    def _aggregate_columns(self):
+        """
+        Aggregate columns shared by the per-run and per-day views.
+        """
+        return (
+            func.count(LLMCall.id).label("calls"),
+            func.sum(case((LLMCall.status == "success", 1), else_=0)).label("successes"),
+            func.sum(case((LLMCall.status == "error", 1), else_=0)).label("errors"),
+            func.sum(case((LLMCall.status == "cache_hit", 1), else_=0)).label("cache_hits"),
+            func.coalesce(func.sum(LLMCall.prompt_tokens), 0).label("prompt_tokens"),
+            func.coalesce(func.sum(LLMCall.candidate_tokens), 0).label("candidate_tokens"),
+            func.coalesce(func.sum(LLMCall.total_tokens), 0).label("total_tokens"),
+            func.coalesce(func.sum(LLMCall.retries), 0).label("retries"),
+            func.avg(case((LLMCall.status != "cache_hit", LLMCall.latency_seconds))).label("avg_latency_seconds"),
+            func.max(LLMCall.latency_seconds).label("max_latency_seconds"),
+        )
+
+
+    def get_run_summaries(self, limit: int = 20, run_id: Optional[str] = None) -> List[Dict]:
+        """
+        Aggregate recorded calls per run, most recent run first.
+        Args:
+            limit (int): Maximum number of runs.
+            run_id (Optional[str]): Only summarize this run.
+        Returns:
+            List[Dict]: Call, status, token, retry and latency totals per run.
+        """
+        query = self.session.query(
+            LLMCall.run_id,
+            func.min(LLMCall.created_at).label("started_at"),
+            *self._aggregate_columns()
+        )
+        if run_id is not None:
+            query = query.filter(LLMCall.run_id == run_id)
+
+        results = (
+            query.group_by(LLMCall.run_id)
+            .order_by(func.min(LLMCall.created_at).desc())
+            .limit(limit)
+            .all()
+        )
+        return [row._asdict() for row in results]
+
+
+    def get_daily_summaries(self, days: int = 30) -> List[Dict]:
+        """
+        Aggregate recorded calls per UTC day, most recent day first.
+        Args:
+            days (int): Number of days to look back.
+        Returns:
+            List[Dict]: Call, status, token, retry and latency totals per day.
+        """
+        day = func.date(LLMCall.created_at)
+        results = (
+            self.session.query(day.label("day"), *self._aggregate_columns())
+            .filter(LLMCall.created_at >= utc_now() - timedelta(days=days))
+            .group_by(day)
+            .order_by(day.desc())
+            .all()
+        )
+        return [row._asdict() for row in results]
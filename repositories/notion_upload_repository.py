@@ -0,0 +1,34 @@
+from typing import Optional
+from sqlalchemy.orm import Session
+from database.models import NotionUpload, utc_now
+
+class NotionUploadRepository:
+    """
+    Repository for handling NotionUpload progress records.
+    """
+    def __init__(self, session: Session):
+        self.session = session
+
+
+    def get_upload(self, brief_id: int) -> Optional[NotionUpload]:
+        """
+        Retrieve the upload progress of a brief, if an upload was started.
+        """
+        return self.session.query(NotionUpload).filter(NotionUpload.brief_id == brief_id).first()
+
+
+    def save_progress(self, brief_id: int, page_id: str, batches_written: int, total_batches: int) -> NotionUpload:
+        """
+        Create or update the upload progress of a brief; it is completed once every batch is written.
+        """
+        upload = self.get_upload(brief_id)
+        if upload is None:
+            upload = NotionUpload(brief_id=brief_id)
+            self.session.add(upload)
+
+        upload.page_id = page_id
+        upload.batches_written = batches_written
+        upload.total_batches = total_batches
+        upload.status = "completed" if batches_written >= total_batches else "in_progress"
+        upload.updated_at = utc_now()
+        return upload
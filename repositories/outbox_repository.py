@@ -0,0 +1,137 @@
+from datetime import datetime, timedelta
+from typing import List, Optional
+from sqlalchemy import and_, or_
+from sqlalchemy.orm import Session
+from database.models import EgressOutboxEntry, utc_now
+from utils.helpers import build_upsert_statement, execute_in_batches
+
+class OutboxRepository:
+    """
+    Repository for handling EgressOutboxEntry delivery records.
+    """
+    def __init__(self, session: Session):
+        self.session = session
+
+
+    def enqueue(self, brief_id: int, channel: str, recipients: List[str]) -> int:
+        """
+        Queue a brief for delivery to recipients of a channel. Entries that already
+        exist, whatever their status, are left untouched, so a brief is never queued twice.
+        """
+        now = utc_now()
+        rows = [
+            {
+                "brief_id": brief_id,
+                "channel": channel,
+                "recipient": recipient or "",
+                "status": "pending",
+                "attempts": 0,
+                "next_attempt_at": now,
+                "created_at": now,
+                "updated_at": now,
+            }
+            for recipient in dict.fromkeys(recipients)
+        ]
+        statement = build_upsert_statement(
+            self.session, EgressOutboxEntry,
+            conflict_columns=["brief_id", "channel", "recipient"], update_columns=[])
+        return execute_in_batches(self.session, statement, rows, batch_size=1000)
+
+
+    def _due_condition(self, now: datetime, lease_seconds: float):
+        """
+        Entries ready to be sent: pending and due, or left "sending" past the lease.
+        """
+        return or_(
+            and_(EgressOutboxEntry.status == "pending", EgressOutboxEntry.next_attempt_at <= now),
+            and_(EgressOutboxEntry.status == "sending",
+                 EgressOutboxEntry.updated_at <= now - timedelta(seconds=lease_seconds)),
+        )
+
+
+    def get_due(self, limit: int, lease_seconds: float) -> List[EgressOutboxEntry]:
+        """
+        Retrieve entries ready to be sent, oldest first.
+        """
+        return (
+            self.session.query(EgressOutboxEntry)
+            .filter(self._due_condition(utc_now(), lease_seconds))
+            .order_by(EgressOutboxEntry.next_attempt_at, EgressOutboxEntry.id)
+            .limit(limit)
+            .all()
+        )
+
+
+    def claim(self, entry_id: int, lease_seconds: float) -> bool:
+        """
+        Mark a due entry as being sent. The conditional update makes the claim atomic, so
+        two workers never send the same entry.
+        Returns:
+            bool: True if this worker claimed the entry.
+        """
+        now = utc_now()
+        claimed = (
+            self.session.query(EgressOutboxEntry)
+            .filter(EgressOutboxEntry.id == entry_id)
+            .filter(self._due_condition(now, lease_seconds))
+            .update({EgressOutboxEntry.status: "sending", EgressOutboxEntry.updated_at: now},
+                    synchronize_session=False)
+        )
+        return claimed == 1
+
+
+    def mark_sent(self, entry_id: int):
+        """
+        Record a successful delivery.
+        """
+        now = utc_now()
+        self.session.query(EgressOutboxEntry).filter(EgressOutboxEntry.id == entry_id).update({
+            EgressOutboxEntry.status: "sent",
+            EgressOutboxEntry.attempts: EgressOutboxEntry.attempts + 1,
+            EgressOutboxEntry.last_error: None,
+            EgressOutboxEntry.sent_at: now,
+            EgressOutboxEntry.updated_at: now,
+        }, synchronize_session=False)
+
+
+    def mark_failed(self, entry_id: int, error: str, next_attempt_at: Optional[datetime]):
+        """
+        Record a failed delivery and schedule the retry; with no next attempt the entry is given up on.
+        """
+        self.session.query(EgressOutboxEntry).filter(EgressOutboxEntry.id == entry_id).update({
+            EgressOutboxEntry.status: "pending" if next_attempt_at else "dead",
+            EgressOutboxEntry.attempts: EgressOutboxEntry.attempts + 1,
+            EgressOutboxEntry.last_error: error,
+            EgressOutboxEntry.next_attempt_at: next_attempt_at,
+            EgressOutboxEntry.updated_at: utc_now(),
+        }, synchronize_session=False)
+
+
+    def mark_timed_out(self, entry_id: int, error: str, give_up: bool):
+        """
+        Record a delivery that timed out while its send may still be running. The entry
+        stays "sending" with its claim time untouched, so it only becomes retryable once
+        the lease expires; with give_up it is marked dead instead and never retried.
+        """
+        values = {
+            EgressOutboxEntry.attempts: EgressOutboxEntry.attempts + 1,
+            EgressOutboxEntry.last_error: error,
+        }
+        if give_up:
+            values[EgressOutboxEntry.status] = "dead"
+            values[EgressOutboxEntry.next_attempt_at] = None
+            values[EgressOutboxEntry.updated_at] = utc_now()
+        self.session.query(EgressOutboxEntry).filter(EgressOutboxEntry.id == entry_id).update(
+            values, synchronize_session=False)
+
+
+    def get_entries_by_brief(self, brief_id: int) -> List[EgressOutboxEntry]:
+        """
+        Retrieve every delivery record of a brief.
+        """
+        return (
+            self.session.query(EgressOutboxEntry)
+            .filter(EgressOutboxEntry.brief_id == brief_id)
+            .order_by(EgressOutboxEntry.id)
+            .all()
+        )
@@ -1,6 +1,9 @@
-from typing import List, Dict, Set
-from sqlalchemy.orm import Session
+from typing import List, Dict, Set, Iterator, Optional
+from sqlalchemy import or_, select
+from sqlalchemy.orm import Session, selectinload
 from database.models import Post, CuratedItem
+from utils.helpers import build_upsert_statement, execute_in_batches
+from repositories.comment_repository import NO_COMMENTS_FINGERPRINT
 from utils.logger import logger
 
 class PostRepository:
@@ -32,15 +35,55 @@ class PostRepository:
         return count
 
 
-    def store_posts(self, reddit_data: Dict, validated_ids: Set[str]) -> int:
+    def bulk_upsert_posts(self, posts_data: List[Dict], batch_size: int = 1000) -> int:
         """
-        Filter posts by validated submission IDs and persist them.
+        Store multiple posts with batched Core inserts, updating the engagement
+        metrics of posts whose submission_id already exists.
+        """
+        rows = []
+        for post_data in posts_data:
+            rows.append({
+                "submission_id": post_data["submission_id"],
+                "subreddit": post_data.get("subreddit", ""),
+                "title": post_data.get("title", ""),
+                "body": post_data.get("body", ""),
+                "upvote_ratio": post_data.get("upvote_ratio", 0.0),
+                "score": post_data.get("score", 0),
+                "number_of_comments": post_data.get("number_of_comments", 0),
+                "post_url": post_data.get("post_url", ""),
+                "is_curated": False
+            })
+
+        if not rows:
+            return 0
+
+        statement = build_upsert_statement(
+            self.session,
+            Post,
+            conflict_columns=["submission_id"],
+            update_columns=["upvote_ratio", "score", "number_of_comments"]
+        )
+        return execute_in_batches(self.session, statement, rows, batch_size)
+
+
+    def store_posts(self, reddit_data: Dict, validated_ids: Set[str], bulk: bool = False,
+                    batch_size: int = 1000) -> int:
+        """
+        Filter posts by validated submission IDs and persist them. In bulk mode every
+        fetched post is upserted instead, so re-seen posts get their engagement metrics refreshed.
         Args:
             reddit_data (dict): Raw Reddit data containing a 'posts' list.
             validated_ids (set): Set of submission IDs that passed integrity checks.
+            bulk (bool): Use the batched Core upsert path instead of the ORM.
+            batch_size (int): Rows per executemany batch when bulk is set.
         Returns:
-            int: Number of posts stored.
+            int: Number of posts stored or refreshed.
         """
+        if bulk:
+            # One row per submission: a batch may not upsert the same row twice.
+            latest_posts = {post["submission_id"]: post for post in reddit_data.get("posts", [])}
+            return self.bulk_upsert_posts(list(latest_posts.values()), batch_size)
+
         posts_to_store = []
         for post in reddit_data.get("posts", []):
             if post["submission_id"] in validated_ids:
@@ -48,18 +91,70 @@ class PostRepository:
         return self.create_posts(posts_to_store)
 
 
-    def get_posts_with_sentiments(self, limit: int = 10) -> List:
+    def get_existing_submission_ids(self, submission_ids: List[str]) -> Set[str]:
+        """
+        Return the subset of the given submission IDs that are already stored.
+        """
+        if not submission_ids:
+            return set()
+
+        results = (
+            self.session.query(Post.submission_id)
+            .filter(Post.submission_id.in_(submission_ids))
+            .all()
+        )
+        existing_ids = set()
+        for row in results:
+            existing_ids.add(row.submission_id)
+        return existing_ids
+
+
+    def get_posts_with_sentiments(self, limit: Optional[int] = 10) -> List:
         """
         Query posts that have not been curated yet, joined with their sentiments.
+        Posts whose sentiment was recorded without comments are left out.
+        A limit of None returns every uncurated post.
         """
         from database.models import Sentiment
-        return (
+        query = (
             self.session.query(Post, Sentiment)
             .join(Sentiment, Sentiment.post_id == Post.submission_id)
             .filter(Post.is_curated == False)
-            .limit(limit)
-            .all()
+            .filter(or_(Sentiment.comment_fingerprint.is_(None),
+                        Sentiment.comment_fingerprint != NO_COMMENTS_FINGERPRINT))
         )
+        if limit is not None:
+            query = query.limit(limit)
+        return query.all()
+
+    def get_submission_ids(self, include_curated: bool = True) -> List[str]:
+        """
+        Retrieve submission IDs in primary key order, optionally skipping curated posts.
+        """
+        query = self.session.query(Post.submission_id)
+        if not include_curated:
+            query = query.filter(Post.is_curated == False)
+        return [row.submission_id for row in query.order_by(Post.id).all()]
+
+
+    def iter_posts_with_sentiments(self, chunk_size: int = 500) -> Iterator:
+        """
+        Stream uncurated posts joined with their sentiments, fetching chunk_size rows at a time.
+        Posts whose sentiment was recorded without comments are left out.
+        """
+        from database.models import Sentiment
+        # A 2.0-style select is used here: the legacy Query uniquifies rows holding
+        # JSON columns, which cannot be combined with yield_per.
+        statement = (
+            select(Post, Sentiment)
+            .join(Sentiment, Sentiment.post_id == Post.submission_id)
+            .where(Post.is_curated == False)
+            .where(or_(Sentiment.comment_fingerprint.is_(None),
+                       Sentiment.comment_fingerprint != NO_COMMENTS_FINGERPRINT))
+            .execution_options(yield_per=chunk_size)
+        )
+        return self.session.execute(statement)
+
 
     def get_all_posts(self) -> List[Post]:
         """
@@ -68,6 +163,43 @@ class PostRepository:
         return self.session.query(Post).all()
 
 
+    def iter_posts_with_comments(self, chunk_size: int = 500,
+                                 submission_ids: Optional[List[str]] = None) -> Iterator[List[Post]]:
+        """
+        Stream posts in chunks with their comments eagerly loaded.
+        Each chunk costs two queries (posts, then their comments) regardless of its size.
+        Without submission_ids every post is streamed in primary key order.
+        """
+        if submission_ids is not None:
+            for start in range(0, len(submission_ids), chunk_size):
+                posts = (
+                    self.session.query(Post)
+                    .options(selectinload(Post.comments))
+                    .filter(Post.submission_id.in_(submission_ids[start:start + chunk_size]))
+                    .order_by(Post.id)
+                    .all()
+                )
+                if posts:
+                    yield posts
+            return
+
+        last_id = 0
+        while True:
+            posts = (
+                self.session.query(Post)
+                .options(selectinload(Post.comments))
+                .filter(Post.id > last_id)
+                .order_by(Post.id)
+                .limit(chunk_size)
+                .all()
+            )
+            if not posts:
+                return
+
+            yield posts
+            last_id = posts[-1].id
+
+
     def get_posts_by_ids(self, post_ids: List[int]) -> List[Post]:
         """
         Retrieve posts by their primary key IDs.
@@ -0,0 +1,68 @@
+from typing import List, Dict, Optional
+from sqlalchemy.orm import Session
+from database.models import CuratedProblem
+
+class ProblemRepository:
+    """
+    Repository for handling CuratedProblem database operations.
+    """
+    def __init__(self, session: Session):
+        self.session = session
+
+
+    def create_problems(self, brief_id: Optional[int], problems: List[Dict]) -> List[CuratedProblem]:
+        """
+        Store curated problems, one row per problem, linked to their brief.
+        Args:
+            brief_id (Optional[int]): ID of the brief the problems were rendered into.
+            problems (List[Dict]): Dicts with submission_id, post_number, problem_statement
+                and sentiment_statement.
+        """
+        rows = [
+            CuratedProblem(
+                brief_id=brief_id,
+                submission_id=problem["submission_id"],
+                post_number=problem.get("post_number"),
+                problem_statement=problem["problem_statement"],
+                sentiment_statement=problem.get("sentiment_statement")
+            )
+            for problem in problems
+        ]
+        self.session.add_all(rows)
+        return rows
+
+
+    def get_problems_by_brief(self, brief_id: int) -> List[CuratedProblem]:
+        """
+        Retrieve the problems of a brief.
+        """
+        return (
+            self.session.query(CuratedProblem)
+            .filter(CuratedProblem.brief_id == brief_id)
+            .order_by(CuratedProblem.id)
+            .all()
+        )
+
+
+    def get_problems_by_submission(self, submission_id: str) -> List[CuratedProblem]:
+        """
+        Retrieve every problem curated from a submission.
+        """
+        return (
+            self.session.query(CuratedProblem)
+            .filter(CuratedProblem.submission_id == submission_id)
+            .order_by(CuratedProblem.id)
+            .all()
+        )
+
+
+    def get_recent_problems(self, limit: int = 50) -> List[CuratedProblem]:
+        """
+        Retrieve the most recently curated problems.
+        """
+        return (
+            self.session.query(CuratedProblem)
+            .order_by(CuratedProblem.id.desc())
+            .limit(limit)
+            .all()
+        )
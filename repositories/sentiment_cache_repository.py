@@ -0,0 +1,70 @@
+from typing import Dict, Iterable
+from sqlalchemy.orm import Session
+from database.models import SentimentCacheEntry, utc_now
+from utils.helpers import build_upsert_statement, execute_in_batches
+
+class SentimentCacheRepository:
+    """
+    Repository for handling SentimentCacheEntry database operations.
+    """
+    def __init__(self, session: Session):
+        self.session = session
+
+
+    def get_many(self, content_hashes: Iterable[str], chunk_size: int = 500) -> Dict[str, float]:
+        """
+        Look up cached compound scores for many content hashes at once.
+        Returns:
+            Dict[str, float]: Compound scores keyed by content hash, for hits only.
+        """
+        content_hashes = list(content_hashes)
+        cached = {}
+
+        for start in range(0, len(content_hashes), chunk_size):
+            results = (
+                self.session.query(SentimentCacheEntry.content_hash, SentimentCacheEntry.compound)
+                .filter(SentimentCacheEntry.content_hash.in_(content_hashes[start:start + chunk_size]))
+                .all()
+            )
+            for row in results:
+                cached[row.content_hash] = row.compound
+
+        return cached
+
+
+    def put_many(self, scores: Dict[str, float], batch_size: int = 1000) -> int:
+        """
+        Store compound scores keyed by content hash, ignoring hashes already cached.
+        """
+        if not scores:
+            return 0
+
+        created_at = utc_now()
+        rows = []
+        for content_hash, compound in scores.items():
+            rows.append({"content_hash": content_hash, "compound": compound, "created_at": created_at})
+
+        statement = build_upsert_statement(
+            self.session, SentimentCacheEntry, conflict_columns=["content_hash"], update_columns=[])
+        return execute_in_batches(self.session, statement, rows, batch_size)
+
+
+    def evict(self, max_entries: int) -> int:
+        """
+        Delete the oldest entries so that at most max_entries remain.
+        Returns:
+            int: Number of entries deleted.
+        """
+        threshold = (
+            self.session.query(SentimentCacheEntry.id)
+            .order_by(SentimentCacheEntry.id.desc())
+            .offset(max_entries)
+            .limit(1)
+            .scalar()
+        )
+        if threshold is None:
+            return 0
+
+        return self.session.query(SentimentCacheEntry).filter(
+            SentimentCacheEntry.id <= threshold
+        ).delete(synchronize_session=False)
@@ -1,4 +1,4 @@
-from typing import List, Dict
+from typing import List, Dict, Optional
 from sqlalchemy.orm import Session
 from database.models import Sentiment
 
@@ -18,7 +18,8 @@ class SentimentRepository:
         for data in sentiments_data:
             sentiment = Sentiment(
                 post_id=data.get("post_id"),
-                sentiment_results=data.get("sentiment_results")
+                sentiment_results=data.get("sentiment_results"),
+                comment_fingerprint=data.get("comment_fingerprint")
             )
             self.session.add(sentiment)
 
@@ -30,3 +31,26 @@ class SentimentRepository:
         self.session.query(Sentiment).filter(
             Sentiment.post_id.in_(submission_ids)
         ).update({"is_curated": True}, synchronize_session=False)
+
+
+    def get_fingerprints(self) -> Dict[str, Optional[str]]:
+        """
+        Retrieve the comment fingerprint each stored sentiment was scored from, keyed by post ID.
+        """
+        results = self.session.query(Sentiment.post_id, Sentiment.comment_fingerprint).all()
+        fingerprints = {}
+        for row in results:
+            fingerprints[row.post_id] = row.comment_fingerprint
+        return fingerprints
+
+
+    def delete_sentiments_for_posts(self, post_ids: List[str]) -> int:
+        """
+        Delete the stored sentiments of the given posts before they are re-scored.
+        """
+        if not post_ids:
+            return 0
+
+        return self.session.query(Sentiment).filter(
+            Sentiment.post_id.in_(post_ids)
+        ).delete(synchronize_session=False)
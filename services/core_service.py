@@ -1,11 +1,28 @@
-from typing import Dict, List
+import hashlib
+import heapq
+import json
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional, Callable
 from google.genai import errors
+from pydantic import ValidationError
 from settings import settings
 from database import get_session
-from clients.gemini_client import initialize_gemini, provide_agent_tools
+from clients.gemini_client import (
+    initialize_gemini, provide_agent_tools, provide_structured_output_config, create_resilient_caller,
+    CircuitOpenError, CuratedProblemOutput
+)
 from repositories.post_repository import PostRepository
 from repositories.sentiment_repository import SentimentRepository
 from repositories.brief_repository import BriefRepository
+from repositories.llm_cache_repository import LLMCacheRepository
+from repositories.comment_repository import CommentRepository
+from repositories.problem_repository import ProblemRepository
+from repositories.llm_call_repository import LLMCallRepository
+from utils.helpers import plan_token_batches, estimate_tokens, compute_pain_signal
+from utils.clustering import vectorize_documents, cluster_vectors, pick_representative
+from utils.compaction import compact_post_record, record_post_number
 from utils.logger import logger
 
 
@@ -20,9 +37,182 @@ class CoreService:
         self.post_repo = PostRepository(self.session)
         self.sentiment_repo = SentimentRepository(self.session)
         self.brief_repo = BriefRepository(self.session)
+        self.comment_repo = CommentRepository(self.session)
+        self.llm_cache_repo = LLMCacheRepository(self.session)
+        self.problem_repo = ProblemRepository(self.session)
+        self.llm_call_repo = LLMCallRepository(self.session)
         self.agent = initialize_gemini()
+        self.caller = create_resilient_caller(self.agent)
         self.post_with_sentiments = []
         self.curator_agent_response = None
+        self.batching = settings.CURATION_BATCHING
+        self.token_budget = settings.CURATION_TOKEN_BUDGET
+        self.max_concurrency = settings.CURATION_MAX_CONCURRENCY
+        self.merge_briefs = settings.CURATION_MERGE_BRIEFS
+        self.curation_mode = settings.CURATION_MODE
+        self.call_metrics: List[Dict] = []
+        self.recorded_calls = 0
+        self.run_id = uuid.uuid4().hex
+        self.cache_enabled = settings.LLM_CACHE_ENABLED
+        self.cache_ttl_hours = settings.LLM_CACHE_TTL_HOURS
+        self.cache_max_entries = settings.LLM_CACHE_MAX_ENTRIES
+        self.run_metrics: Dict[str, int] = {"cache_hits": 0, "cache_misses": 0}
+        self.clustering_enabled = settings.CLUSTERING_ENABLED
+        self.cluster_threshold = settings.CLUSTER_SIMILARITY_THRESHOLD
+        self.cluster_features = settings.CLUSTER_HASH_FEATURES
+        self.cluster_top_comments = settings.CLUSTER_TOP_COMMENTS
+        self.submission_ids_by_post: Dict[int, str] = {}
+        self.top_k = settings.CURATION_TOP_K
+        self.unbatched_post_limit = settings.CURATION_UNBATCHED_POST_LIMIT
+        self.signal_weights = settings.PAIN_SIGNAL_WEIGHTS
+        self.cluster_members: Dict[int, List[int]] = {}
+        self.compaction_enabled = settings.COMPACTION_ENABLED
+        self.compaction_body_budget = settings.COMPACTION_BODY_TOKEN_BUDGET
+        self.compaction_top_comments = settings.COMPACTION_TOP_COMMENTS
+        self.compaction_comment_chars = settings.COMPACTION_COMMENT_MAX_CHARS
+
+
+    def build_post_records(self, limit: Optional[int] = None) -> List[Dict]:
+        """
+        Load uncurated posts joined with their sentiments and serialize them for the agent.
+        Args:
+            limit (Optional[int]): Maximum number of posts, or None for every uncurated post.
+        Returns:
+            List[Dict]: Post records with their sentiment scores.
+        """
+        post_records = []
+        posts_with_sentiments = self.post_repo.get_posts_with_sentiments(limit=limit)
+
+        for post, sentiment in posts_with_sentiments:
+            post_records.append(self.serialize_post_with_sentiment(post, sentiment))
+
+        return post_records
+
+
+    def build_ranked_post_records(self, top_k: Optional[int] = None) -> List[Dict]:
+        """
+        Rank uncurated posts by pain signal and serialize the strongest ones for the agent.
+        Candidates are streamed from the database; only a heap of top_k rows is kept.
+        Args:
+            top_k (Optional[int]): Number of posts to keep, or None to keep and order every post.
+        Returns:
+            List[Dict]: Post records with their sentiment scores, strongest signal first.
+        """
+        candidates = self.post_repo.iter_posts_with_sentiments()
+
+        def signal(row):
+            return compute_pain_signal(row[0], row[1].sentiment_results, self.signal_weights)
+
+        if top_k is None:
+            ranked = sorted(candidates, key=signal, reverse=True)
+        else:
+            ranked = heapq.nlargest(top_k, candidates, key=signal)
+
+        logger.info(f"Selected {len(ranked)} post(s) by pain signal")
+        return [self.serialize_post_with_sentiment(post, sentiment) for post, sentiment in ranked]
+
+
+    def serialize_post_with_sentiment(self, post, sentiment) -> Dict:
+        """
+        Serialize a post and its sentiment into the record sent to the agent.
+        """
+        self.submission_ids_by_post[post.id] = post.submission_id
+        return {
+            "post_number": post.id,
+            "subreddit": post.subreddit,
+            "title": post.title,
+            "body": post.body,
+            "sentiment_score": sentiment.sentiment_results
+        }
+
+
+    def cluster_post_records(self, post_records: List[Dict]) -> List[Dict]:
+        """
+        Group near-duplicate posts and keep one representative per cluster.
+        Titles, bodies and top comments are vectorized with hashed TF-IDF and clustered
+        incrementally; each representative carries a "cluster_size" when it stands for
+        more than one post, and the members are remembered so all get marked curated.
+        Args:
+            post_records (List[Dict]): Post records from build_post_records().
+        Returns:
+            List[Dict]: One record per cluster.
+        """
+        if len(post_records) < 2:
+            return post_records
+
+        submission_ids = [self.submission_ids_by_post[record["post_number"]] for record in post_records]
+        top_comments = self.comment_repo.get_top_comments(submission_ids, self.cluster_top_comments)
+
+        documents = []
+        for record, submission_id in zip(post_records, submission_ids):
+            comment_text = " ".join(comment["body"] or "" for comment in top_comments.get(submission_id, []))
+            documents.append(f"{record['title']} {record['body'] or ''} {comment_text}")
+
+        vectors = vectorize_documents(documents, self.cluster_features)
+        clusters = cluster_vectors(vectors, self.cluster_threshold)
+
+        representatives = []
+        for cluster in clusters:
+            representative = dict(post_records[pick_representative(cluster, vectors)])
+            if len(cluster) > 1:
+                representative["cluster_size"] = len(cluster)
+            self.cluster_members[representative["post_number"]] = [
+                post_records[index]["post_number"] for index in cluster]
+            representatives.append(representative)
+
+        logger.info(f"Clustered {len(post_records)} posts into {len(representatives)} topic(s)")
+        return representatives
+
+
+    def compact_post_records(self, post_records: List[Dict]) -> List[Dict]:
+        """
+        Compact post records for the prompt: bodies are cleaned and trimmed to their key
+        sentences, the top comments are attached and keys are shortened. Estimated payload
+        tokens before and after are recorded in run_metrics.
+        Args:
+            post_records (List[Dict]): Post records, possibly cluster representatives.
+        Returns:
+            List[Dict]: The compact records, in the same order.
+        """
+        if not self.compaction_enabled or not post_records:
+            return post_records
+
+        submission_ids = [self.submission_ids_by_post[record["post_number"]] for record in post_records]
+        top_comments = self.comment_repo.get_top_comments(submission_ids, self.compaction_top_comments)
+
+        compact_records = [
+            compact_post_record(
+                record,
+                self.compaction_body_budget,
+                top_comments.get(submission_id, []),
+                self.compaction_comment_chars
+            )
+            for record, submission_id in zip(post_records, submission_ids)
+        ]
+
+        tokens_before = estimate_tokens(json.dumps(post_records, default=str))
+        tokens_after = estimate_tokens(json.dumps(compact_records, separators=(",", ":"), ensure_ascii=False))
+        self.run_metrics["payload_tokens_before"] = self.run_metrics.get("payload_tokens_before", 0) + tokens_before
+        self.run_metrics["payload_tokens_after"] = self.run_metrics.get("payload_tokens_after", 0) + tokens_after
+        logger.info(
+            f"Compacted {len(post_records)} post record(s): ~{tokens_before} -> ~{tokens_after} payload tokens")
+        return compact_records
+
+
+    def curation_objective(self) -> str:
+        """
+        Return the objective of the current curation mode, with the key legend appended
+        when records are compacted.
+        """
+        if self.curation_mode == "structured":
+            objective = settings.INLINE_SCOUT_OBJECTIVE + settings.STRUCTURED_OUTPUT_INSTRUCTIONS
+        elif self.curation_mode == "inline":
+            objective = settings.INLINE_SCOUT_OBJECTIVE
+        else:
+            objective = settings.SCOUT_OBJECTIVE
+        if self.compaction_enabled:
+            objective += settings.COMPACT_RECORD_LEGEND
+        return objective
 
 
     def query_posts_with_sentiments(self) -> List[Dict]:
@@ -31,22 +221,11 @@ class CoreService:
         Each record in the returned list contains a post and its sentiment score.
         Use this information to guide your next actions, generate summaries, or perform analysis as required.
         """
-        post_records = []
-
         logger.info("Querying posts with sentiments")
+        top_k = self.top_k if self.top_k is not None else self.unbatched_post_limit
 
         try:
-            posts_with_sentiments = self.post_repo.get_posts_with_sentiments(limit=10)
-
-            for post, sentiment in posts_with_sentiments:
-                post_with_sentiments = {
-                    "post_number": post.id,
-                    "subreddit": post.subreddit,
-                    "title": post.title,
-                    "body": post.body,
-                    "sentiment_score": sentiment.sentiment_results
-                }
-                post_records.append(post_with_sentiments)
+            post_records = self.compact_post_records(self.build_ranked_post_records(top_k=top_k))
 
             logger.info("Successfully queried posts with sentiments.")
 
@@ -59,6 +238,522 @@ class CoreService:
             raise SystemExit
 
 
+    def call_curator_model(self, contents: str, config, mode: str, payload_tokens: int = 0,
+                           validate: Optional[Callable[[str], Any]] = None) -> str:
+        """
+        Call Gemini through the resilient call layer and record the call's latency,
+        retries, token usage and outcome in call_metrics.
+        Args:
+            contents (str): The prompt.
+            config: Optional GenerateContentConfig.
+            mode (str): Curation mode the call was made for ("tool", "inline" or "structured").
+            payload_tokens (int): Estimated tokens of data the model fetches through tools.
+            validate (Optional[Callable[[str], Any]]): Checks the response text and raises
+                ValueError if it is unusable; the call is then recorded as an error.
+        Returns:
+            str: The response text.
+        Raises:
+            ValueError: If validate rejects the response.
+        """
+        started = time.perf_counter()
+        try:
+            response, retries = self.caller.generate_content(
+                model=settings.AGENT_MODEL,
+                contents=contents,
+                config=config,
+                estimated_tokens=estimate_tokens(contents) + payload_tokens,
+                expected_requests=2 if mode == "tool" else 1
+            )
+        except Exception as e:
+            self.call_metrics.append({
+                "model": settings.AGENT_MODEL,
+                "mode": mode,
+                "status": "error",
+                "latency_seconds": time.perf_counter() - started,
+                "round_trips": 0,
+                "retries": getattr(e, "retries", 0),
+                "prompt_tokens": 0,
+                "candidate_tokens": 0,
+                "total_tokens": 0,
+                "error": f"{type(e).__name__}: {e}"[:1000],
+            })
+            raise
+        latency = time.perf_counter() - started
+
+        usage = response.usage_metadata
+        # Automatic function calling hides the intermediate turns; the history holds
+        # one model turn per tool call, each of which was a separate round trip.
+        history = response.automatic_function_calling_history or []
+        round_trips = 1 + sum(1 for content in history if content.role == "model")
+
+        metric = {
+            "model": settings.AGENT_MODEL,
+            "mode": mode,
+            "status": "success",
+            "latency_seconds": latency,
+            "round_trips": round_trips,
+            "retries": retries,
+            "prompt_tokens": (usage.prompt_token_count or 0) if usage else 0,
+            "candidate_tokens": (usage.candidates_token_count or 0) if usage else 0,
+            "total_tokens": (usage.total_token_count or 0) if usage else 0,
+        }
+
+        try:
+            if validate:
+                validate(response.text)
+        except ValueError as e:
+            metric["status"] = "error"
+            metric["error"] = f"Invalid response: {e}"[:1000]
+            raise
+        finally:
+            self.call_metrics.append(metric)
+        return response.text
+
+
+    def generate_curator_response(self, posts_tool: Callable[[], List[Dict]], payload_tokens: int = 0) -> str:
+        """
+        Run one curator generation with the given posts tool exposed to the model.
+        Args:
+            posts_tool (Callable[[], List[Dict]]): Tool the model calls to retrieve its posts.
+            payload_tokens (int): Estimated tokens of the posts the tool returns.
+        Returns:
+            str: The curator agent response text.
+        """
+        return self.call_curator_model(
+            self.curation_objective(), provide_agent_tools(tools=[posts_tool]), "tool", payload_tokens)
+
+
+    def build_inline_prompt(self, post_records: List[Dict]) -> str:
+        """
+        Build a prompt that carries the posts as a compact JSON payload.
+        Args:
+            post_records (List[Dict]): The post records to curate.
+        Returns:
+            str: The prompt text.
+        """
+        payload = json.dumps(post_records, separators=(",", ":"), ensure_ascii=False, default=str)
+        return self.curation_objective() + "\nPosts:\n" + payload
+
+
+    def generate_inline_response(self, post_records: List[Dict]) -> str:
+        """
+        Run one curator generation with the posts inlined in the prompt, so no tool call
+        and no second generation are needed.
+        Args:
+            post_records (List[Dict]): The post records to curate.
+        Returns:
+            str: The curator agent response text.
+        """
+        return self.call_curator_model(self.build_inline_prompt(post_records), None, "inline")
+
+
+    def generate_structured_response(self, post_records: List[Dict]) -> str:
+        """
+        Run one curator generation with the posts inlined and the answer constrained to
+        a JSON array of curated problems, then check that the answer parses. An answer
+        with no valid problem for a non-empty batch counts as a failed call, so it is
+        neither stored nor cached.
+        Args:
+            post_records (List[Dict]): The post records to curate.
+        Returns:
+            str: The curator agent response, as JSON text.
+        Raises:
+            ValueError: If the response is not a JSON array or holds no valid problem.
+        """
+        def validate(response_text: str):
+            problems = self.parse_curated_problems(response_text, post_records)
+            if post_records and not problems:
+                raise ValueError("Curator response contains no valid curated problems.")
+
+        return self.call_curator_model(
+            self.build_inline_prompt(post_records), provide_structured_output_config(), "structured",
+            validate=validate)
+
+
+    def parse_curated_problems(self, response_text: str, post_records: List[Dict]) -> List[Dict]:
+        """
+        Parse a structured curator response into problems linked to their submissions.
+        Items that do not match the schema or name a post outside the batch are dropped.
+        Args:
+            response_text (str): The JSON response text.
+            post_records (List[Dict]): The post records the response was generated for.
+        Returns:
+            List[Dict]: Problems with submission_id, post_number, problem_statement
+                and sentiment_statement.
+        Raises:
+            ValueError: If the response is not a JSON array.
+        """
+        try:
+            items = json.loads(response_text)
+        except (TypeError, json.JSONDecodeError) as e:
+            raise ValueError(f"Curator response is not valid JSON: {e}") from e
+
+        if not isinstance(items, list):
+            raise ValueError("Curator response is not a JSON array.")
+
+        post_numbers = {record_post_number(record) for record in post_records}
+        problems = []
+        for item in items:
+            try:
+                output = CuratedProblemOutput.model_validate(item)
+            except ValidationError as e:
+                logger.warning(f"Skipping malformed curated problem: {e}")
+                continue
+
+            if output.post_number not in post_numbers:
+                logger.warning(f"Skipping curated problem for unknown post number {output.post_number}")
+                continue
+
+            problems.append({
+                "submission_id": self.submission_ids_by_post[output.post_number],
+                "post_number": output.post_number,
+                "problem_statement": output.problem_statement,
+                "sentiment_statement": output.sentiment_statement
+            })
+
+        return problems
+
+
+    def render_problems(self, problems: List[Dict]) -> str:
+        """
+        Render curated problems as the plain-text brief delivered by egress.
+        """
+        return "\n\n".join(
+            f"{problem['problem_statement']}\n"
+            f"Sentiment statement: {problem['sentiment_statement']}"
+            for problem in problems
+        )
+
+
+    def prepare_brief(self, response_text: str, post_records: List[Dict]) -> Dict:
+        """
+        Turn a curator response into brief content, structured problems and the records
+        to mark as curated. In structured mode only posts the response covers are marked,
+        so the others are retried on the next run.
+        Args:
+            response_text (str): The curator agent response.
+            post_records (List[Dict]): The post records the response was generated for.
+        Returns:
+            Dict: "content", "problems" and "records".
+        """
+        if self.curation_mode != "structured":
+            return {"content": response_text, "problems": [], "records": post_records}
+
+        problems = self.parse_curated_problems(response_text, post_records)
+        answered = {problem["post_number"] for problem in problems}
+        return {
+            "content": self.render_problems(problems),
+            "problems": problems,
+            "records": [record for record in post_records if record_post_number(record) in answered]
+        }
+
+
+    def store_brief(self, parts: List[Dict]):
+        """
+        Store prepared curator output as one brief with its problems and mark the covered
+        posts as curated. The caller commits.
+        Args:
+            parts (List[Dict]): Prepared output from prepare_brief().
+        """
+        parts = [part for part in parts if part["content"]]
+        if not parts:
+            return
+
+        brief = self.brief_repo.create_brief("\n\n".join(part["content"] for part in parts))
+        problems = [problem for part in parts for problem in part["problems"]]
+        if problems:
+            self.session.flush()
+            self.problem_repo.create_problems(brief.id, problems)
+        self.mark_records_curated([record for part in parts for record in part["records"]])
+
+
+    def summarize_call_metrics(self) -> Dict[str, Dict]:
+        """
+        Aggregate recorded Gemini calls per curation mode and log the totals.
+        Returns:
+            Dict[str, Dict]: Call count, round trips, average latency and token totals per mode.
+        """
+        summary: Dict[str, Dict] = {}
+        for metric in self.call_metrics:
+            if metric["status"] == "cache_hit":
+                continue
+            mode_summary = summary.setdefault(metric["mode"], {
+                "calls": 0, "round_trips": 0, "retries": 0, "latency_seconds": 0.0,
+                "prompt_tokens": 0, "candidate_tokens": 0, "total_tokens": 0,
+            })
+            mode_summary["calls"] += 1
+            for key in ("round_trips", "retries", "latency_seconds", "prompt_tokens", "candidate_tokens", "total_tokens"):
+                mode_summary[key] += metric[key]
+
+        for mode, mode_summary in summary.items():
+            mode_summary["avg_latency_seconds"] = mode_summary["latency_seconds"] / mode_summary["calls"]
+            logger.info(
+                f"Gemini {mode} mode: {mode_summary['calls']} call(s), {mode_summary['round_trips']} round trip(s), "
+                f"{mode_summary['retries']} retries, "
+                f"avg latency {mode_summary['avg_latency_seconds']:.2f}s, "
+                f"{mode_summary['prompt_tokens']} prompt / {mode_summary['candidate_tokens']} candidate / "
+                f"{mode_summary['total_tokens']} total tokens")
+
+        return summary
+
+
+    def record_call_metrics(self):
+        """
+        Persist the calls recorded since the last flush to the llm_calls table under this run's ID.
+        """
+        pending = self.call_metrics[self.recorded_calls:]
+        if not pending:
+            return
+
+        try:
+            self.llm_call_repo.create_calls(self.run_id, pending)
+            self.session.commit()
+            self.recorded_calls += len(pending)
+            logger.info(f"Recorded {len(pending)} Gemini call(s) for run {self.run_id}")
+
+        except Exception as e:
+            self.session.rollback()
+            logger.error(f"Failed to record Gemini call metrics: {e}", exc_info=True)
+
+
+    def build_batch_tool(self, batch: List[Dict]) -> Callable[[], List[Dict]]:
+        """
+        Build a query_posts_with_sentiments() tool that returns one planned batch of posts.
+        Args:
+            batch (List[Dict]): The post records of the batch.
+        Returns:
+            Callable[[], List[Dict]]: The tool passed to the model.
+        """
+        def query_posts_with_sentiments() -> List[Dict]:
+            return batch
+
+        query_posts_with_sentiments.__doc__ = CoreService.query_posts_with_sentiments.__doc__
+        return query_posts_with_sentiments
+
+
+    def build_cache_key(self, post_records: List[Dict]) -> str:
+        """
+        Build the response cache key from the model name, the objective of the current
+        curation mode and a hash of the serialized post/sentiment payload.
+        Args:
+            post_records (List[Dict]): The post records sent to the model.
+        Returns:
+            str: Hex SHA-256 cache key.
+        """
+        objective = self.curation_objective()
+        payload = json.dumps(post_records, sort_keys=True, separators=(",", ":"), default=str)
+        payload_hash = hashlib.sha256(payload.encode("utf-8")).hexdigest()
+        key_material = "\n".join([settings.AGENT_MODEL, self.curation_mode, objective, payload_hash])
+        return hashlib.sha256(key_material.encode("utf-8")).hexdigest()
+
+
+    def lookup_cached_responses(self, batches: List[List[Dict]]) -> Dict[int, str]:
+        """
+        Look up cached responses for planned batches.
+        Args:
+            batches (List[List[Dict]]): The planned batches.
+        Returns:
+            Dict[int, str]: Cached response text keyed by batch index, for hits only.
+        """
+        cached = {}
+        if not self.cache_enabled:
+            return cached
+
+        try:
+            for index, batch in enumerate(batches):
+                response = self.llm_cache_repo.get_response(self.build_cache_key(batch), self.cache_ttl_hours)
+                if response is not None:
+                    cached[index] = response
+        except Exception as e:
+            logger.error(f"LLM response cache lookup failed: {e}", exc_info=True)
+            self.session.rollback()
+            return {}
+
+        for _ in cached:
+            self.call_metrics.append({"model": settings.AGENT_MODEL, "mode": self.curation_mode, "status": "cache_hit"})
+        self.run_metrics["cache_hits"] += len(cached)
+        self.run_metrics["cache_misses"] += len(batches) - len(cached)
+        logger.info(f"LLM response cache: {len(cached)} hit(s), {len(batches) - len(cached)} miss(es)")
+        return cached
+
+
+    def cache_batch_responses(self, results: List[Dict]):
+        """
+        Store fresh batch responses in the response cache and evict old entries.
+        Args:
+            results (List[Dict]): Per-batch results from curate_batch().
+        """
+        if not self.cache_enabled:
+            return
+
+        try:
+            for result in results:
+                if result["response"] and not result.get("cached"):
+                    self.llm_cache_repo.save_response(
+                        self.build_cache_key(result["batch"]), settings.AGENT_MODEL, result["response"])
+            self.llm_cache_repo.evict(self.cache_ttl_hours, self.cache_max_entries)
+            self.session.commit()
+
+        except Exception as e:
+            self.session.rollback()
+            logger.error(f"Failed to update LLM response cache: {e}", exc_info=True)
+
+
+    def curate_batch(self, batch: List[Dict]) -> Dict:
+        """
+        Execute the curator agent for a single batch of posts.
+        Runs on a worker thread, so it only talks to Gemini and never to the database.
+        Args:
+            batch (List[Dict]): The post records of the batch.
+        Returns:
+            Dict: The batch, and either its "response" text or an "error" message.
+        """
+        try:
+            if self.curation_mode == "structured":
+                response = self.generate_structured_response(batch)
+            elif self.curation_mode == "inline":
+                response = self.generate_inline_response(batch)
+            else:
+                response = self.generate_curator_response(
+                    self.build_batch_tool(batch), estimate_tokens(json.dumps(batch, default=str)))
+            return {"batch": batch, "response": response, "error": None}
+
+        except errors.ServerError as e:
+            logger.error(f"Gemini server error: {e}")
+            return {"batch": batch, "response": None, "error": "Model temporarily unavailable."}
+
+        except errors.ClientError as e:
+            if "RESOURCE_EXHAUSTED" in str(e):
+                logger.error("Quota exceeded. Try again after reset or switch models.")
+                return {"batch": batch, "response": None, "error": "Quota exceeded"}
+            logger.error(f"Gemini client error: {e}")
+            return {"batch": batch, "response": None, "error": str(e)}
+
+        except CircuitOpenError as e:
+            logger.error(f"{e}")
+            return {"batch": batch, "response": None, "error": "Circuit open"}
+
+        except Exception as e:
+            logger.error(f"Unexpected error while curating batch: {e}", exc_info=True)
+            return {"batch": batch, "response": None, "error": str(e)}
+
+
+    def run_curation_engine(self) -> List[Dict]:
+        """
+        Curate every uncurated post: split the backlog into batches sized by estimated prompt
+        tokens, run them through Gemini with at most CURATION_MAX_CONCURRENCY calls in flight,
+        and store one brief per batch or a single merged brief. Batches with a cached
+        response skip the network entirely.
+        Returns:
+            List[Dict]: Per-batch results in batch order.
+        """
+        logger.info("Curation engine started")
+
+        try:
+            post_records = self.build_ranked_post_records(top_k=self.top_k)
+        except Exception as e:
+            logger.error(f"Error querying posts with sentiments from the database!:{e}", exc_info=True)
+            self.session.close()
+            return []
+
+        if not post_records:
+            logger.info("No uncurated posts to curate.")
+            self.session.close()
+            return []
+
+        if self.clustering_enabled:
+            try:
+                post_records = self.cluster_post_records(post_records)
+            except Exception as e:
+                logger.error(f"Topic clustering failed, curating every post: {e}", exc_info=True)
+                self.cluster_members = {}
+
+        try:
+            post_records = self.compact_post_records(post_records)
+        except Exception as e:
+            logger.error(f"Prompt compaction failed, sending full records: {e}", exc_info=True)
+
+        batches = plan_token_batches(post_records, self.token_budget)
+        workers = max(1, min(self.max_concurrency, len(batches)))
+        logger.info(
+            f"Curating {len(post_records)} posts in {len(batches)} batch(es) "
+            f"with up to {workers} concurrent call(s)")
+
+        cached_responses = self.lookup_cached_responses(batches)
+        uncached_batches = [batch for index, batch in enumerate(batches) if index not in cached_responses]
+
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            fresh_results = iter(list(executor.map(self.curate_batch, uncached_batches)))
+
+        results = []
+        for index, batch in enumerate(batches):
+            if index in cached_responses:
+                results.append({"batch": batch, "response": cached_responses[index], "error": None, "cached": True})
+            else:
+                results.append(next(fresh_results))
+
+        self.summarize_call_metrics()
+        self.record_call_metrics()
+        self.cache_batch_responses(results)
+        self.store_batch_results(results)
+        return results
+
+
+    def store_batch_results(self, results: List[Dict]):
+        """
+        Store the briefs of successful batches and mark their posts as curated.
+        Failed batches stay uncurated and are picked up by the next run.
+        Args:
+            results (List[Dict]): Per-batch results from curate_batch().
+        """
+        successful = [result for result in results if result["response"]]
+        failed = len(results) - len(successful)
+
+        try:
+            if self.merge_briefs and successful:
+                self.store_brief([self.prepare_brief(result["response"], result["batch"]) for result in successful])
+                self.session.commit()
+            else:
+                for result in successful:
+                    self.store_brief([self.prepare_brief(result["response"], result["batch"])])
+                    self.session.commit()
+
+            logger.info(f"Stored curator responses for {len(successful)} batch(es); {failed} failed")
+
+        except Exception as e:
+            self.session.rollback()
+            logger.error(
+                f"Failed to store curator responses and update curation status: {e}", exc_info=True)
+
+        finally:
+            self.session.close()
+
+
+    def mark_records_curated(self, post_records: List[Dict]):
+        """
+        Mark the posts behind the given records, and their sentiments, as curated
+        and record them for cleanup.
+        Args:
+            post_records (List[Dict]): Post records sent to the curator agent.
+        """
+        post_ids = []
+        for record in post_records:
+            post_number = record_post_number(record)
+            post_ids.extend(self.cluster_members.get(post_number, [post_number]))
+
+        if not post_ids:
+            return
+
+        posts = self.post_repo.get_posts_by_ids(post_ids)
+        submission_ids = [post.submission_id for post in posts]
+
+        self.post_repo.mark_as_curated(post_ids)
+        self.sentiment_repo.mark_as_curated(submission_ids)
+
+        for sub_id in submission_ids:
+            self.post_repo.add_curated_item(sub_id)
+
+
     def execute_curator_agent(self):
         """
         Execute the curator agent to generate a summary or analysis using the Gemini model.
@@ -67,15 +762,15 @@ class CoreService:
         """
         try:
             logger.info("Executing Curator Agent")
-            response = self.agent.models.generate_content(
-                model=settings.AGENT_MODEL,
-                contents=settings.SCOUT_OBJECTIVE,
-                config=provide_agent_tools(
-                    tools=[self.query_posts_with_sentiments])
-            )
+            if self.curation_mode == "structured":
+                curator_response = self.generate_structured_response(self.query_posts_with_sentiments())
+            elif self.curation_mode == "inline":
+                curator_response = self.generate_inline_response(self.query_posts_with_sentiments())
+            else:
+                curator_response = self.generate_curator_response(self.query_posts_with_sentiments)
+            self.summarize_call_metrics()
 
             logger.info("Curator Agent complete")
-            curator_response = response.text
 
             self.curator_agent_response = curator_response
             return curator_response
@@ -91,11 +786,18 @@ class CoreService:
                 return {"error": "Quota exceeded"}
             raise
 
+        except CircuitOpenError as e:
+            logger.error(f"{e}")
+            return {"error": "Model temporarily unavailable. Please try again later."}
+
         except Exception as e:
             logger.error(
                 f"Unexpected error while running Market Scout Agent: {e}")
             raise SystemExit("Agent terminated due to an error.")
 
+        finally:
+            self.record_call_metrics()
+
 
     def store_curator_response(self):
         """
@@ -111,23 +813,9 @@ class CoreService:
 
         try:
             if self.curator_agent_response is not None:
-                self.brief_repo.create_brief(self.curator_agent_response)
-                
-                # Mark as curated and record for cleanup
-                post_ids = []
-                for record in self.post_with_sentiments:
-                    post_ids.append(record["post_number"])
-
-                if post_ids:
-                    posts = self.post_repo.get_posts_by_ids(post_ids)
-
-                    submission_ids = [post.submission_id for post in posts]
-
-                    self.post_repo.mark_as_curated(post_ids)
-                    self.sentiment_repo.mark_as_curated(submission_ids)
-
-                    for sub_id in submission_ids:
-                        self.post_repo.add_curated_item(sub_id)
+                # Store the brief, mark its posts as curated and record them for cleanup
+                if self.post_with_sentiments:
+                    self.store_brief([self.prepare_brief(self.curator_agent_response, self.post_with_sentiments)])
 
                     self.session.commit()
                     logger.info("Curator response stored")
@@ -1,15 +1,22 @@
-import smtplib
+from datetime import timedelta
 from pathlib import Path
+from typing import Dict, List, Optional
 from email.message import EmailMessage
-from smtplib import SMTPAuthenticationError, SMTPConnectError
 from jinja2 import Environment, FileSystemLoader, select_autoescape
-from notion_client import APIErrorCode, APIResponseError, Client
+from notion_client import APIErrorCode, APIResponseError
 from database import get_session
+from database.models import utc_now
 from utils.logger import logger
-from utils.helpers import chunk_text, create_notion_blocks, format_email
+from utils.helpers import format_email
+from utils.notion_blocks import markdown_to_notion_blocks
+from utils.egress_dispatcher import EgressDispatcher
 from settings import settings
+from clients.notion_writer import create_notion_client, create_notion_writer
+from clients.smtp_mailer import create_smtp_mailer
 
 from repositories.brief_repository import BriefRepository
+from repositories.notion_upload_repository import NotionUploadRepository
+from repositories.outbox_repository import OutboxRepository
 
 BASE_DIR = Path(__file__).resolve().parents[1]
 TEMPLATE_DIR = BASE_DIR / "utils" / "templates"
@@ -22,15 +29,20 @@ class EgressService:
     def __init__(self):
         self.queried_brief = None
         self.formatted_email = None
+        self.formatted_email_brief_id = None
         self.notion_key = settings.NOTION_API_KEY
         self.notion_parent_page = settings.NOTION_DB_ID
         self.email_address = settings.EMAIL_ADDRESS
         self.email_password = settings.EMAIL_APP_PASSWORD
-        self.recipient_address = settings.RECIPIENT_ADDRESS
-        self.notion_client = Client(auth=self.notion_key)
+        self.recipient_addresses = settings.RECIPIENT_ADDRESSES
+        self.smtp_mailer = create_smtp_mailer()
+        self.notion_client = create_notion_client()
+        self.notion_writer = create_notion_writer(self.notion_client)
         self.notion_blocks = []
         self.session = get_session()
         self.brief_repo = BriefRepository(self.session)
+        self.notion_upload_repo = NotionUploadRepository(self.session)
+        self.outbox_repo = OutboxRepository(self.session)
         self.title = "Reddit Problem & Sentiment Report"
         self.footer_text = "©2026 Rocksoncodes. All rights reserved."
 
@@ -42,6 +54,20 @@ class EgressService:
             autoescape=select_autoescape(["html"])
         )
 
+        self.dispatcher = EgressDispatcher(settings.EGRESS_CHANNEL_TIMEOUT_SECONDS)
+        self.dispatcher.register(
+            settings.NOTION_CHANNEL, self.create_notion_page,
+            settings.EGRESS_CHANNEL_TIMEOUTS.get(settings.NOTION_CHANNEL))
+        self.dispatcher.register(
+            settings.EMAIL_CHANNEL, self.send_email,
+            settings.EGRESS_CHANNEL_TIMEOUTS.get(settings.EMAIL_CHANNEL))
+
+        # Outbox entries sent one per recipient; email entries go out together through
+        # send_email_fan_out instead (see deliver_entries).
+        self.channel_senders = {
+            settings.NOTION_CHANNEL: lambda recipient: self.create_notion_page(parent_page_id=recipient or None),
+        }
+
 
     def query_brief(self):
         """
@@ -69,30 +95,33 @@ class EgressService:
                 f"Error querying briefs from the database: {e}", exc_info=True)
             return None
 
+        finally:
+            # Release the connection: channels run on worker threads and check out their own.
+            self.session.close()
+
 
-    def create_notion_page(self):
+    def create_notion_page(self, parent_page_id: Optional[str] = None) -> bool:
         """
-        Create a Notion page with the chunked and formatted content blocks.
+        Create a Notion page with the brief converted from markdown to Notion blocks.
+        Args:
+            parent_page_id (Optional[str]): Parent page to publish under; defaults to NOTION_DB_ID.
+        Returns:
+            bool: True if the brief is on Notion (including an earlier completed upload).
         """
         if not self.queried_brief:
             self.query_brief()
             if not self.queried_brief:
                 logger.error("No brief available. Aborting Notion page creation.")
-                return
+                return False
 
         content = self.queried_brief.get("curated_content", "")
-        text_blocks = chunk_text(content)
-
-        if not text_blocks:
-            logger.warning("No Notion blocks to publish. Aborting page creation...")
-            return
-
-        notion_blocks = create_notion_blocks(text_blocks)
+        notion_blocks = list(markdown_to_notion_blocks(content))
         self.notion_blocks = notion_blocks
+        logger.info(f"Converted brief to {len(notion_blocks)} Notion block(s)")
 
         if not notion_blocks:
             logger.warning("No Notion blocks to publish. Aborting page creation...")
-            return
+            return False
 
         try:
             children_blocks = [
@@ -106,21 +135,26 @@ class EgressService:
                 *notion_blocks
             ]
 
-            response = self.notion_client.pages.create(
-                parent={"page_id": self.notion_parent_page},
-                properties={
-                    "title": [
-                        {"type": "text", "text": {"content": self.title}}
-                    ]
-                },
-                children=children_blocks
+            brief_id = self.queried_brief.get("id")
+            upload = self.notion_upload_repo.get_upload(brief_id)
+
+            if upload and upload.status == "completed":
+                logger.info(f"Brief ID {brief_id} was already published to Notion page {upload.page_id}")
+                return True
+
+            # Large briefs exceed Notion's children limit, so the writer creates the page
+            # with the first batch and appends the rest, saving progress after each batch.
+            page_id = self.notion_writer.write_page(
+                parent_page_id=parent_page_id or self.notion_parent_page,
+                title=self.title,
+                blocks=children_blocks,
+                page_id=upload.page_id if upload else None,
+                batches_written=upload.batches_written if upload else 0,
+                on_progress=lambda page_id, written, total: self.save_notion_progress(
+                    brief_id, page_id, written, total)
             )
-
-            if response.get("request_id"):
-                logger.info("Notion page created")
-            else:
-                logger.warning(
-                    "Notion page creation response received but request_id missing.")
+            logger.info(f"Notion page created: {page_id}")
+            return True
 
         except APIResponseError as error:
             if error.code == APIErrorCode.ObjectNotFound:
@@ -132,52 +166,303 @@ class EgressService:
             logger.error(
                 f"Unexpected error creating Notion page: {e}", exc_info=True)
 
+        return False
 
-    def send_email(self, subject="Reddit Problem Report!"):
+
+    def save_notion_progress(self, brief_id: int, page_id: str, batches_written: int, total_batches: int):
         """
-        Format and send the brief as an HTML email to the configured recipient.
-        Args:
-            subject (str): Subject line for the email.
+        Persist how far a Notion upload got, so a failed upload resumes instead of starting over.
+        """
+        try:
+            self.notion_upload_repo.save_progress(brief_id, page_id, batches_written, total_batches)
+            self.session.commit()
+        except Exception as e:
+            self.session.rollback()
+            logger.error(f"Failed to save Notion upload progress: {e}", exc_info=True)
+
+
+    def render_email(self) -> str:
+        """
+        Render the queried brief as HTML once; every recipient gets the same rendering.
+        Returns:
+            str: The rendered HTML, or an empty string if there is nothing to send.
         """
         if not self.queried_brief or not self.queried_brief.get("curated_content"):
             logger.warning("No content available to format for email.")
-            return
+            return ""
 
-        content = self.queried_brief.get("curated_content")
         brief_id = self.queried_brief.get("id")
+        if self.formatted_email and self.formatted_email_brief_id == brief_id:
+            return self.formatted_email
 
         self.formatted_email = format_email(
-            content=content,
+            content=self.queried_brief.get("curated_content"),
             jinja_env=self.jinja_env,
             title=self.title,
             footer_text=self.footer_text,
             brief_id=brief_id,
         )
+        self.formatted_email_brief_id = brief_id
+        return self.formatted_email
+
 
-        if not self.formatted_email:
+    def build_email_message(self, subject: str, recipient: str, html: str) -> EmailMessage:
+        """
+        Build the HTML email for one recipient.
+        """
+        msg = EmailMessage()
+        msg["From"] = self.email_address
+        msg["To"] = recipient
+        msg["Subject"] = subject
+        msg.set_content("This email contains an HTML report.")
+        msg.add_alternative(html, subtype="html")
+        return msg
+
+
+    def send_email_fan_out(self, recipients: List[str], subject="Reddit Problem Report!") -> Dict[str, Dict]:
+        """
+        Send the brief to many recipients, rendering it once and reusing pooled SMTP sessions.
+        Args:
+            recipients (List[str]): Addresses to send to.
+            subject (str): Subject line for the email.
+        Returns:
+            Dict[str, Dict]: Per-recipient "success" and "error".
+        """
+        recipients = [recipient for recipient in dict.fromkeys(recipients) if recipient]
+        if not recipients:
+            logger.warning("No email recipients configured.")
+            return {}
+
+        html = self.render_email()
+        if not html:
             logger.warning("No data to email after formatting. Aborting send.")
-            return
+            return {recipient: {"success": False, "error": "Nothing to send"} for recipient in recipients}
 
         try:
-            msg = EmailMessage()
-            msg["From"] = self.email_address
-            msg["To"] = self.recipient_address
-            msg["Subject"] = subject
-            msg.set_content("This email contains an HTML report.")
-            msg.add_alternative(self.formatted_email, subtype="html")
-
-            logger.info(f"Sending email to {self.recipient_address}")
-
-            with smtplib.SMTP("smtp.gmail.com", 587) as smtp_server:
-                smtp_server.starttls()
-                smtp_server.login(self.email_address, self.email_password)
-                smtp_server.send_message(msg)
-
-            logger.info("Email successfully sent.")
-
-        except SMTPAuthenticationError:
-            logger.error("SMTP authentication failed.", exc_info=True)
-        except SMTPConnectError:
-            logger.error("SMTP connection failed.", exc_info=True)
+            messages = [(recipient, self.build_email_message(subject, recipient, html)) for recipient in recipients]
+            logger.info(f"Sending email to {len(messages)} recipient(s)")
+            results = self.smtp_mailer.send_many(messages)
         except Exception as e:
             logger.error(f"Email send failed: {e}", exc_info=True)
+            return {recipient: {"success": False, "error": str(e)} for recipient in recipients}
+
+        for recipient, result in results.items():
+            if not result["success"]:
+                logger.error(f"Email to {recipient} failed: {result['error']}")
+        return results
+
+
+    def send_email(self, subject="Reddit Problem Report!") -> bool:
+        """
+        Format and send the brief as an HTML email to every address in RECIPIENT_ADDRESSES.
+        Args:
+            subject (str): Subject line for the email.
+        Returns:
+            bool: True if every recipient was emailed.
+        """
+        results = self.send_email_fan_out(self.recipient_addresses, subject)
+        return bool(results) and all(result["success"] for result in results.values())
+
+
+    def channel_recipients(self, channel: str) -> List[str]:
+        """
+        The recipients an outbox entry is queued for on a channel.
+        """
+        if channel == settings.NOTION_CHANNEL:
+            return [self.notion_parent_page or ""]
+        if channel == settings.EMAIL_CHANNEL:
+            return list(self.recipient_addresses)
+        return [""]
+
+
+    def enqueue_brief(self, channels: List[str]) -> int:
+        """
+        Queue the queried brief in the outbox for each channel and recipient. Deliveries
+        already queued or sent are left alone, so re-running egress never sends twice.
+        Args:
+            channels (List[str]): Channels to deliver to.
+        Returns:
+            int: Number of outbox entries requested.
+        """
+        if not self.queried_brief:
+            logger.error("No brief available. Nothing to queue.")
+            return 0
+
+        brief_id = self.queried_brief.get("id")
+        try:
+            queued = 0
+            for channel in channels:
+                queued += self.outbox_repo.enqueue(brief_id, channel, self.channel_recipients(channel))
+            self.session.commit()
+            logger.info(f"Queued brief ID {brief_id} for: {', '.join(channels) or 'no channels'}")
+            return queued
+        except Exception as e:
+            self.session.rollback()
+            logger.error(f"Failed to queue brief ID {brief_id}: {e}", exc_info=True)
+            return 0
+        finally:
+            self.session.close()
+
+
+    def claim_due_entries(self) -> List[Dict]:
+        """
+        Claim the outbox entries that are due, so no other worker sends them meanwhile.
+        Returns:
+            List[Dict]: The claimed entries as plain dicts.
+        """
+        claimed = []
+        try:
+            for entry in self.outbox_repo.get_due(settings.OUTBOX_BATCH_SIZE, settings.OUTBOX_SENDING_LEASE_SECONDS):
+                if self.outbox_repo.claim(entry.id, settings.OUTBOX_SENDING_LEASE_SECONDS):
+                    claimed.append({
+                        "id": entry.id,
+                        "brief_id": entry.brief_id,
+                        "channel": entry.channel,
+                        "recipient": entry.recipient,
+                        "attempts": entry.attempts,
+                    })
+            self.session.commit()
+        except Exception as e:
+            self.session.rollback()
+            logger.error(f"Failed to claim outbox entries: {e}", exc_info=True)
+            claimed = []
+        finally:
+            self.session.close()
+        return claimed
+
+
+    def next_attempt_at(self, attempts: int):
+        """
+        When to retry an entry that has now failed `attempts` times, or None to give up.
+        The delay doubles with each failure, capped at OUTBOX_BACKOFF_MAX_SECONDS.
+        """
+        if attempts >= settings.OUTBOX_MAX_ATTEMPTS:
+            return None
+        delay = min(settings.OUTBOX_BACKOFF_MAX_SECONDS, settings.OUTBOX_BACKOFF_BASE_SECONDS * 2 ** (attempts - 1))
+        return utc_now() + timedelta(seconds=delay)
+
+
+    def deliver_entries(self, brief_id: int, entries: List[Dict]) -> Dict[int, Dict]:
+        """
+        Send a brief's claimed entries concurrently, one dispatcher channel per entry.
+        Returns:
+            Dict[int, Dict]: Dispatcher results keyed by entry ID.
+        """
+        try:
+            brief = self.brief_repo.get_brief_by_id(brief_id)
+            self.queried_brief = {"id": brief.id, "curated_content": brief.curated_content} if brief else None
+        finally:
+            self.session.close()
+
+        if not self.queried_brief:
+            logger.error(f"Brief ID {brief_id} no longer exists.")
+            return {entry["id"]: {"success": False, "timed_out": False, "error": "Brief not found",
+                                  "elapsed_seconds": 0.0} for entry in entries}
+
+        dispatcher = EgressDispatcher(settings.EGRESS_CHANNEL_TIMEOUT_SECONDS)
+        email_entries = [entry for entry in entries if entry["channel"] == settings.EMAIL_CHANNEL]
+        other_entries = [entry for entry in entries if entry["channel"] != settings.EMAIL_CHANNEL]
+
+        for entry in other_entries:
+            sender = self.channel_senders.get(entry["channel"])
+            if sender:
+                dispatcher.register(
+                    str(entry["id"]),
+                    lambda sender=sender, recipient=entry["recipient"]: sender(recipient),
+                    settings.EGRESS_CHANNEL_TIMEOUTS.get(entry["channel"]))
+
+        # Email entries are sent together so they share one rendering and the SMTP session pool.
+        email_results: Dict[str, Dict] = {}
+        if email_entries:
+            def send_emails() -> bool:
+                email_results.update(self.send_email_fan_out([entry["recipient"] for entry in email_entries]))
+                return True
+
+            dispatcher.register(
+                settings.EMAIL_CHANNEL, send_emails, settings.EGRESS_CHANNEL_TIMEOUTS.get(settings.EMAIL_CHANNEL))
+
+        names = [str(entry["id"]) for entry in other_entries] + ([settings.EMAIL_CHANNEL] if email_entries else [])
+        dispatched = dispatcher.dispatch(names)
+
+        results = {int(name): result for name, result in dispatched.items() if name != settings.EMAIL_CHANNEL}
+        for entry in email_entries:
+            fan_out = dispatched[settings.EMAIL_CHANNEL]
+            recipient_result = email_results.get(entry["recipient"])
+            if fan_out["success"] and recipient_result:
+                results[entry["id"]] = {**fan_out, **recipient_result}
+            else:
+                results[entry["id"]] = {**fan_out, "success": False,
+                                        "error": fan_out["error"] or "No result for recipient"}
+        return results
+
+
+    def drain_outbox(self) -> List[Dict]:
+        """
+        Deliver the outbox entries that are due and record each outcome. Sent entries are
+        never sent again; failed ones are retried later with backoff, independently of the
+        other channels of the same brief. Timed-out entries stay "sending" until their
+        lease expires, since their send may still complete.
+        Returns:
+            List[Dict]: One result per attempted entry, with "status" and "error".
+        """
+        claimed = self.claim_due_entries()
+        if not claimed:
+            logger.info("No outbox entries due")
+            return []
+
+        by_brief: Dict[int, List[Dict]] = {}
+        for entry in claimed:
+            by_brief.setdefault(entry["brief_id"], []).append(entry)
+
+        outcomes = []
+        for brief_id, entries in by_brief.items():
+            results = self.deliver_entries(brief_id, entries)
+            try:
+                for entry in entries:
+                    result = results[entry["id"]]
+                    attempts = entry["attempts"] + 1
+                    if result["success"]:
+                        self.outbox_repo.mark_sent(entry["id"])
+                        status = "sent"
+                    elif result.get("timed_out"):
+                        # The send may still finish in the background, so retrying now could
+                        # deliver twice; only lease expiry makes the entry retryable.
+                        give_up = attempts >= settings.OUTBOX_MAX_ATTEMPTS
+                        self.outbox_repo.mark_timed_out(entry["id"], result["error"], give_up)
+                        status = "dead" if give_up else "sending"
+                        logger.warning(
+                            f"Outbox entry {entry['id']} ({entry['channel']}) timed out on attempt {attempts}; "
+                            + ("giving up" if give_up else "retryable once its lease expires"))
+                    else:
+                        retry_at = self.next_attempt_at(attempts)
+                        self.outbox_repo.mark_failed(entry["id"], result["error"], retry_at)
+                        status = "pending" if retry_at else "dead"
+                        logger.warning(
+                            f"Outbox entry {entry['id']} ({entry['channel']}) failed attempt {attempts}: "
+                            f"{result['error']}; " + (f"retrying at {retry_at}" if retry_at else "giving up"))
+                    outcomes.append({**entry, "attempts": attempts, "status": status, "error": result["error"]})
+                self.session.commit()
+            except Exception as e:
+                # Entries left "sending" are picked up again once their lease expires.
+                self.session.rollback()
+                logger.error(f"Failed to record outbox results for brief ID {brief_id}: {e}", exc_info=True)
+            finally:
+                self.session.close()
+
+        sent = sum(1 for outcome in outcomes if outcome["status"] == "sent")
+        logger.info(f"Outbox drained: {sent}/{len(claimed)} entr(ies) sent")
+        return outcomes
+
+
+    def outbox_status(self, brief_id: int) -> List[Dict]:
+        """
+        The delivery state of every outbox entry of a brief.
+        """
+        try:
+            return [
+                {"channel": entry.channel, "recipient": entry.recipient, "status": entry.status,
+                 "attempts": entry.attempts, "error": entry.last_error}
+                for entry in self.outbox_repo.get_entries_by_brief(brief_id)
+            ]
+        finally:
+            self.session.close()
@@ -1,8 +1,13 @@
-from typing import Dict, List, Any
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Any, Optional
 from settings import settings
 from utils.logger import logger
-from utils.helpers import get_posts_from_subreddit, get_comments_from_submission
-from clients.reddit_client import get_reddit_client
+from utils.helpers import get_posts_from_subreddit, get_new_posts_from_subreddit, get_comments_from_submission
+from clients.reddit_client import get_reddit_client, get_reddit_rate_limiter
+
+# Incremental ingestion needs a time-ordered listing to stop at the cursor.
+INCREMENTAL_LISTING = "new"
 
 
 class IngressService:
@@ -13,20 +18,120 @@ class IngressService:
 
     def __init__(self):
         self.reddit = get_reddit_client()
+        self.rate_limiter = get_reddit_rate_limiter()
+        self.max_workers = settings.INGRESS_MAX_WORKERS
+        self.comment_workers = settings.COMMENT_FETCH_WORKERS
         self.subreddits = settings.DEFAULT_SUBREDDITS
         self.post_limit = settings.DEFAULT_POST_LIMIT
         self.comment_limit = settings.DEFAULT_COMMENT_LIMIT
         self.min_comments = settings.MIN_COMMENTS
         self.min_score = settings.MIN_SCORE
         self.min_upvote_ratio = settings.MIN_UPVOTE_RATIO
+        self.ingress_mode = settings.INGRESS_MODE
+        self.lookback_seconds = settings.INCREMENTAL_LOOKBACK_HOURS * 3600
+        self.incremental_max_posts = settings.INCREMENTAL_MAX_POSTS
+        self.cursors: Dict[str, Dict] = {}
+        self.cursor_updates: Dict[str, Dict] = {}
         self.posts = []
         self.submission_ids = []
         self.comments = []
+        self.fetched_submission_ids: List[str] = []
+        self.subreddit_timings: Dict[str, float] = {}
+
+
+    def _fetch_incremental_posts(self, subreddit_name: str) -> List[Dict[str, Any]]:
+        """
+        Fetch only the posts newer than the subreddit's cursor (minus the lookback window)
+        and record the pending cursor update. With a cursor the listing is paged until the
+        cursor is reached, up to INCREMENTAL_MAX_POSTS; without one only post_limit posts
+        are read.
+        Args:
+            subreddit_name (str): The subreddit to fetch posts from.
+        Returns:
+            List[Dict[str, Any]]: List of post data dictionaries.
+        """
+        cursor = self.cursors.get(subreddit_name)
+        stop_before_utc = None
+        walk_limit = self.post_limit
+        if cursor and cursor.get("created_utc") is not None:
+            stop_before_utc = cursor["created_utc"] - self.lookback_seconds
+            walk_limit = self.incremental_max_posts
+
+        subreddit_posts, cursor_update = get_new_posts_from_subreddit(
+            get_reddit_client(),
+            subreddit_name,
+            walk_limit,
+            stop_before_utc,
+            self.min_upvote_ratio,
+            self.min_score,
+            self.min_comments,
+            rate_limiter=self.rate_limiter
+        )
+
+        if cursor_update:
+            self.cursor_updates[subreddit_name] = cursor_update
+        return subreddit_posts
+
+
+    def _fetch_subreddit_posts(self, subreddit_name: str) -> List[Dict[str, Any]]:
+        """
+        Fetch posts from a single subreddit, isolating and logging any failure.
+        Args:
+            subreddit_name (str): The subreddit to fetch posts from.
+        Returns:
+            List[Dict[str, Any]]: List of post data dictionaries, empty on failure.
+        """
+        logger.info(f"Fetching posts from r/{subreddit_name} (limit={self.post_limit})...")
+        started = time.perf_counter()
+        subreddit_posts: List[Dict[str, Any]] = []
+
+        try:
+            if self.ingress_mode == "incremental":
+                subreddit_posts = self._fetch_incremental_posts(subreddit_name)
+            else:
+                subreddit_posts = get_posts_from_subreddit(
+                    get_reddit_client(),
+                    subreddit_name,
+                    self.post_limit,
+                    self.min_upvote_ratio,
+                    self.min_score,
+                    self.min_comments,
+                    rate_limiter=self.rate_limiter
+                )
+        except Exception as e:
+            logger.error(f"Error fetching posts from r/{subreddit_name}: {e}", exc_info=True)
+
+        elapsed = time.perf_counter() - started
+        self.subreddit_timings[subreddit_name] = elapsed
+        logger.info(f"r/{subreddit_name}: {len(subreddit_posts)} posts in {elapsed:.2f}s")
+        return subreddit_posts
+
+
+    def _fetch_submission_comments(self, submission_id: str) -> Optional[List[Dict[str, Any]]]:
+        """
+        Fetch comments for a single submission, isolating and logging any failure.
+        Args:
+            submission_id (str): The submission to fetch comments for.
+        Returns:
+            Optional[List[Dict[str, Any]]]: List of comment data dictionaries, or None on failure.
+        """
+        try:
+            return get_comments_from_submission(
+                get_reddit_client(),
+                submission_id,
+                self.comment_limit,
+                rate_limiter=self.rate_limiter
+            )
+        except Exception as e:
+            logger.error(f"Error fetching comments for submission {submission_id}: {e}", exc_info=True)
+            return None
 
 
     def fetch_reddit_posts(self) -> List[Dict[str, Any]]:
         """
         Fetch Reddit posts from the configured subreddits that meet minimum criteria.
+        Subreddits are fetched concurrently when INGRESS_MAX_WORKERS is greater than one;
+        each worker uses its own Reddit client and draws from the shared Reddit rate budget.
         Returns:
             List[Dict[str, Any]]: List of post data dictionaries.
         """
@@ -35,21 +140,19 @@ class IngressService:
             self.reddit = get_reddit_client()
 
         posts: List[Dict[str, Any]] = []
-
-        for subreddit_name in self.subreddits:
-            logger.info(f"Fetching posts from r/{subreddit_name} (limit={self.post_limit})...")
-            try:
-                subreddit_posts = get_posts_from_subreddit(
-                    self.reddit,
-                    subreddit_name,
-                    self.post_limit,
-                    self.min_upvote_ratio,
-                    self.min_score,
-                    self.min_comments
-                )
-                posts.extend(subreddit_posts)
-            except Exception as e:
-                logger.error(f"Error fetching posts from r/{subreddit_name}: {e}", exc_info=True)
+        self.subreddit_timings = {}
+        self.cursor_updates = {}
+        workers = min(self.max_workers, len(self.subreddits))
+
+        if workers > 1:
+            logger.info(f"Fetching {len(self.subreddits)} subreddits with {workers} workers")
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                results = executor.map(self._fetch_subreddit_posts, self.subreddits)
+                for subreddit_posts in results:
+                    posts.extend(subreddit_posts)
+        else:
+            for subreddit_name in self.subreddits:
+                posts.extend(self._fetch_subreddit_posts(subreddit_name))
 
         self.posts = posts
         logger.info(f"Collected {len(posts)} posts")
@@ -77,26 +180,49 @@ class IngressService:
         return submission_ids
 
 
-    def fetch_reddit_comments(self) -> List[Dict[str, Any]]:
+    def fetch_reddit_comments(self, submission_ids: Optional[List[str]] = None) -> List[Dict[str, Any]]:
         """
         Fetch comments for each submission ID collected from posts.
+        Submissions are fetched concurrently when COMMENT_FETCH_WORKERS is greater than one,
+        each worker with its own Reddit client; results keep the order of the submission IDs.
+        The submissions whose fetch succeeded are recorded in fetched_submission_ids.
+        Args:
+            submission_ids (Optional[List[str]]): Submissions to fetch; defaults to all collected IDs.
         Returns:
             List[Dict[str, Any]]: List of comment data dictionaries.
         """
-        if not self.submission_ids:
-            logger.warning("No submission IDs available. Running fetch_post_ids()...")
-            self.fetch_post_ids()
+        if submission_ids is None:
+            if not self.submission_ids:
+                logger.warning("No submission IDs available. Running fetch_post_ids()...")
+                self.fetch_post_ids()
+            submission_ids = self.submission_ids
 
         comments_collected: List[Dict[str, Any]] = []
-        logger.info(f"Fetching comments from {len(self.submission_ids)} submissions...")
-
-        for submission_id in self.submission_ids:
-            try:
-                comments = get_comments_from_submission(self.reddit, submission_id, self.comment_limit)
+        fetched_ids: List[str] = []
+        workers = min(self.comment_workers, len(submission_ids))
+        logger.info(f"Fetching comments from {len(submission_ids)} submissions...")
+        started = time.perf_counter()
+
+        if workers > 1:
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                results = list(executor.map(self._fetch_submission_comments, submission_ids))
+        else:
+            results = [self._fetch_submission_comments(submission_id) for submission_id in submission_ids]
+
+        for submission_id, comments in zip(submission_ids, results):
+            if comments is not None:
+                fetched_ids.append(submission_id)
                 comments_collected.extend(comments)
-            except Exception as e:
-                logger.error(f"Error fetching comments for submission {submission_id}: {e}", exc_info=True)
+
+        failed = len(submission_ids) - len(fetched_ids)
+        if failed:
+            logger.warning(f"Comment fetch failed for {failed} submission(s)")
+
+        logger.info(
+            f"Fetched comments for {len(submission_ids)} submissions in "
+            f"{time.perf_counter() - started:.2f}s using {max(workers, 1)} worker(s)")
 
         self.comments = comments_collected
+        self.fetched_submission_ids = fetched_ids
         logger.info(f"Collected {len(comments_collected)} comments")
         return comments_collected
\ No newline at end of file
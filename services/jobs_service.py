@@ -53,6 +53,13 @@ class JobService:
         logger.info("Full pipeline sequence finished")
 
 
+    def drain_egress_outbox(self):
+        """
+        Retries queued egress deliveries that failed earlier and are now due.
+        """
+        EgressPipeline().drain()
+
+
     def cleanup_curated_data(self):
         """
         Deletes records from the database that have been marked as curated
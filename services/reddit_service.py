@@ -1,8 +1,10 @@
-from typing import Dict, Any
+from typing import Dict, Any, List
+from settings import settings
 from database import get_session
 from repositories.post_repository import PostRepository
 from repositories.comment_repository import CommentRepository
-from services.ingress_service import IngressService
+from repositories.cursor_repository import CursorRepository
+from services.ingress_service import IngressService, INCREMENTAL_LISTING
 from utils.helpers import ensure_data_integrity
 from utils.logger import logger
 
@@ -14,34 +16,126 @@ class RedditService:
 
     def __init__(self):
         self.scraper = IngressService()
+        self.refresh_known = settings.REFRESH_KNOWN_SUBMISSIONS
+        self.avoided_api_calls = 0
+        self.bulk_write = settings.BULK_WRITE_ENABLED
+        self.batch_size = settings.BULK_WRITE_BATCH_SIZE
+
+    def partition_known_submissions(self, submission_ids: List[str]) -> Dict[str, List[str]]:
+        """
+        Split submission IDs into ones already stored in the database and new ones.
+        Args:
+            submission_ids (List[str]): Submission IDs extracted from the fetched posts.
+        Returns:
+            Dict[str, List[str]]: The "known" and "new" submission IDs, in their original order.
+        """
+        session = get_session()
+        try:
+            existing_ids = PostRepository(session).get_existing_submission_ids(submission_ids)
+        finally:
+            session.close()
+
+        known_ids = []
+        new_ids = []
+        for submission_id in submission_ids:
+            if submission_id in existing_ids:
+                known_ids.append(submission_id)
+            else:
+                new_ids.append(submission_id)
+
+        return {"known": known_ids, "new": new_ids}
+
+    def load_ingest_cursors(self) -> Dict[str, Dict]:
+        """
+        Load the stored high-water marks for the configured subreddits into the scraper.
+        Returns:
+            Dict[str, Dict]: Cursor data keyed by subreddit name.
+        """
+        session = get_session()
+        try:
+            cursors = CursorRepository(session).get_cursors(self.scraper.subreddits, INCREMENTAL_LISTING)
+        finally:
+            session.close()
+
+        logger.info(f"Loaded {len(cursors)} ingest cursor(s)")
+        self.scraper.cursors = cursors
+        return cursors
 
     def run_reddit_scraper(self) -> Dict[str, Any]:
         """
         Run the Reddit scraping pipeline: fetch posts, extract submission IDs, and fetch comments.
+        Comments are only fetched for submissions not yet stored, unless REFRESH_KNOWN_SUBMISSIONS
+        is set, in which case stored submissions are re-fetched and, where the fetch succeeded,
+        their comments replaced.
+        In incremental mode the stored cursors are loaded first and the advanced cursors are
+        returned under "cursor_updates" so they are only persisted once storage succeeds.
         Returns:
-            Dict[str, Any]: Dictionary containing posts, submission IDs, and comments.
+            Dict[str, Any]: Dictionary containing posts, submission IDs, comments, refreshed IDs
+            and cursor updates.
         """
         logger.info("Starting Reddit scraping")
+        if self.scraper.ingress_mode == "incremental":
+            logger.info("Loading ingest cursors")
+            self.load_ingest_cursors()
+
         logger.info("Fetching posts")
         posts = self.scraper.fetch_reddit_posts()
+        cursor_updates = self.scraper.cursor_updates
 
         if not posts:
             logger.warning("No posts were fetched. Exiting pipeline.")
-            return {"posts": [], "submission_ids": [], "comments": []}
+            return {"posts": [], "submission_ids": [], "comments": [], "refreshed_ids": [],
+                    "cursor_updates": cursor_updates}
 
         logger.info("Extracting submission IDs")
         submission_ids = self.scraper.fetch_post_ids()
 
         if not submission_ids:
             logger.warning("No submission IDs extracted. Exiting pipeline.")
-            return {"posts": posts, "submission_ids": [], "comments": []}
+            return {"posts": posts, "submission_ids": [], "comments": [], "refreshed_ids": [],
+                    "cursor_updates": cursor_updates}
+
+        logger.info("Checking for submissions that are already stored")
+        partitioned_ids = self.partition_known_submissions(submission_ids)
+        known_ids = partitioned_ids["known"]
+
+        if self.refresh_known:
+            ids_to_fetch = submission_ids
+            self.avoided_api_calls = 0
+            logger.info(f"Refreshing comments for {len(known_ids)} stored submissions")
+        else:
+            ids_to_fetch = partitioned_ids["new"]
+            self.avoided_api_calls = len(known_ids)
+            logger.info(
+                f"Skipping {len(known_ids)} stored submissions "
+                f"({self.avoided_api_calls} comment API calls avoided)")
 
         logger.info("Fetching comments")
-        comments = self.scraper.fetch_reddit_comments()
+        comments = []
+        if ids_to_fetch:
+            comments = self.scraper.fetch_reddit_comments(ids_to_fetch)
+
+        # Only replace stored comments of submissions whose fetch succeeded; a failed fetch
+        # must not wipe the comment history it would have refreshed.
+        fetched_ids = set(self.scraper.fetched_submission_ids)
+        refreshed_ids = []
+        if self.refresh_known:
+            refreshed_ids = [submission_id for submission_id in known_ids if submission_id in fetched_ids]
+
+        # A new post is only stored once its comments were fetched. Stored posts count as
+        # known and are skipped, so a post stored after a failed fetch would never get its
+        # comments; left unstored, it is fetched again on the next run.
+        storable_ids = fetched_ids.union(known_ids)
+        skipped = [submission_id for submission_id in ids_to_fetch
+                   if submission_id not in storable_ids]
+        if skipped:
+            logger.warning(f"Deferring {len(skipped)} new post(s) whose comment fetch failed to the next run")
+        posts = [post for post in posts if post["submission_id"] in storable_ids]
 
         if not comments:
             logger.warning("No comments were fetched. Exiting pipeline.")
-            return {"posts": posts, "submission_ids": submission_ids, "comments": []}
+            return {"posts": posts, "submission_ids": submission_ids, "comments": [], "refreshed_ids": [],
+                    "cursor_updates": cursor_updates}
 
         logger.info("Reddit scraping complete")
 
@@ -49,11 +143,16 @@ class RedditService:
             "posts": posts,
             "submission_ids": submission_ids,
             "comments": comments,
+            "refreshed_ids": refreshed_ids,
+            "cursor_updates": cursor_updates,
         }
 
     def run_reddit_storage(self, reddit_data: Dict):
         """
-        Store Reddit posts and comments using the respective repositories.
+        Store Reddit posts, comments and advanced ingest cursors using the respective
+        repositories. Everything is committed in one transaction, so a failed comment write
+        leaves no post behind that later runs would skip as already stored, and the cursors
+        only move once the data behind them is stored.
         Args:
             reddit_data (Dict): Dictionary containing posts and comments to store.
         """
@@ -66,24 +165,34 @@ class RedditService:
         try:
             logger.info("Storing posts")
             validated_ids = ensure_data_integrity(session, reddit_data)
-            stored_posts = post_repo.store_posts(reddit_data, validated_ids)
-            session.commit()
-            logger.info(f"Stored {stored_posts} posts.")
+            stored_posts = post_repo.store_posts(
+                reddit_data, validated_ids, bulk=self.bulk_write, batch_size=self.batch_size)
 
-        except Exception as e:
-            session.rollback()
-            logger.error(f"Error storing posts: {e}", exc_info=True)
-            return
-
-        try:
             logger.info("Storing comments")
-            stored_comments = comment_repo.store_comments(reddit_data)
+            refreshed_ids = reddit_data.get("refreshed_ids", [])
+            if refreshed_ids:
+                replaced = comment_repo.delete_comments_by_submission_ids(refreshed_ids)
+                logger.info(f"Replacing {replaced} comments of {len(refreshed_ids)} refreshed submissions.")
+            stored_comments = comment_repo.store_comments(
+                reddit_data, bulk=self.bulk_write, batch_size=self.batch_size)
+
+            cursor_updates = reddit_data.get("cursor_updates", {})
+            if cursor_updates:
+                logger.info("Advancing ingest cursors")
+                cursor_repo = CursorRepository(session)
+                for subreddit_name, cursor in cursor_updates.items():
+                    cursor_repo.save_cursor(
+                        subreddit_name, INCREMENTAL_LISTING, cursor["fullname"], cursor["created_utc"])
+
             session.commit()
-            logger.info(f"Stored {stored_comments} comments.")
+            logger.info(
+                f"Stored {stored_posts} posts and {stored_comments} comments; "
+                f"advanced {len(cursor_updates)} ingest cursor(s).")
 
         except Exception as e:
             session.rollback()
-            logger.error(f"Error storing comments: {e}", exc_info=True)
+            logger.error(f"Error storing Reddit data: {e}", exc_info=True)
+            return
 
         finally:
             session.close()
@@ -1,9 +1,16 @@
 import nltk
 from repositories.post_repository import PostRepository
 from repositories.sentiment_repository import SentimentRepository
-from typing import Dict, List
-from utils.helpers import serialize_post, get_comments_for_post
+from repositories.comment_repository import CommentRepository, NO_COMMENTS_FINGERPRINT
+from repositories.sentiment_cache_repository import SentimentCacheRepository
+from typing import Dict, List, Iterator, Optional
+from settings import settings
+from utils.helpers import serialize_post, serialize_comment
+from utils.sentiment_scoring import (
+    comment_cache_key, label_compound, score_texts_serial, score_texts_parallel, create_scoring_pool
+)
 from nltk.sentiment import SentimentIntensityAnalyzer
+from concurrent.futures import ProcessPoolExecutor
 from database import get_session
 from collections import Counter
 from utils.logger import logger
@@ -12,6 +19,8 @@ from utils.logger import logger
 class SentimentService:
     """
     Service for querying posts with comments, analyzing sentiment, summarizing sentiment and storing results.
+    Used as a context manager, it shuts down the scoring process pool on exit, so every
+    chunk of a run shares one pool.
     """
 
     def __init__(self):
@@ -19,12 +28,54 @@ class SentimentService:
         self.session = get_session()
         self.post_repo = PostRepository(self.session)
         self.sentiment_repo = SentimentRepository(self.session)
+        self.comment_repo = CommentRepository(self.session)
+        self.cache_repo = SentimentCacheRepository(self.session)
         self.sia = SentimentIntensityAnalyzer()
+        self.chunk_size = settings.SENTIMENT_QUERY_CHUNK_SIZE
+        self.full_rescore = settings.SENTIMENT_MODE == "full"
+        self.scoring_mode = settings.SENTIMENT_SCORING_MODE
+        self.scoring_workers = settings.SENTIMENT_WORKERS
+        self.scoring_batch_size = settings.SENTIMENT_BATCH_SIZE
+        self.scoring_pool: Optional[ProcessPoolExecutor] = None
+        self.cache_enabled = settings.SENTIMENT_CACHE_ENABLED
+        self.cache_max_entries = settings.SENTIMENT_CACHE_MAX_ENTRIES
+        self.cache_stats: Dict[str, float] = {"lookups": 0, "hits": 0, "hit_rate": 0.0}
+        self.streaming = settings.SENTIMENT_STREAMING
+        self.flush_batch_size = settings.SENTIMENT_FLUSH_BATCH_SIZE
+        self.comment_fingerprints: Dict[str, str] = {}
+        self.posts_to_score: Optional[List[str]] = None
         self.query_results: List[Dict] = []
         self.post_sentiment_scores: List[List[Dict]] = []
         self.post_sentiment_summaries: List[List[Dict]] = []
 
 
+    def __enter__(self) -> "SentimentService":
+        return self
+
+
+    def __exit__(self, *exc_info):
+        self.close_scoring_pool()
+
+
+    def get_scoring_pool(self) -> ProcessPoolExecutor:
+        """
+        Return the scoring process pool, starting it on first use.
+        """
+        if self.scoring_pool is None:
+            logger.info(f"Starting sentiment scoring pool with {self.scoring_workers} worker processes")
+            self.scoring_pool = create_scoring_pool(self.scoring_workers)
+        return self.scoring_pool
+
+
+    def close_scoring_pool(self):
+        """
+        Shut down the scoring process pool, if one was started.
+        """
+        if self.scoring_pool is not None:
+            self.scoring_pool.shutdown()
+            self.scoring_pool = None
+
+
     @staticmethod
     def ensure_nltk_resources() -> None:
         """
@@ -37,9 +88,64 @@ class SentimentService:
             nltk.download("vader_lexicon")
 
 
+    def select_posts_to_score(self) -> Optional[List[str]]:
+        """
+        Decide which posts need scoring and record the comment fingerprint of every post.
+        In incremental mode only uncurated posts without a sentiment, or whose comment set
+        changed since they were scored, are selected. A full re-score selects every post.
+        Returns:
+            Optional[List[str]]: Submission IDs to score, or None for every post.
+        """
+        self.comment_fingerprints = self.comment_repo.get_comment_fingerprints()
+
+        if self.full_rescore:
+            logger.info("Full re-score requested: scoring every post")
+            self.posts_to_score = None
+            return None
+
+        stored_fingerprints = self.sentiment_repo.get_fingerprints()
+        submission_ids = []
+        unchanged = 0
+
+        for submission_id in self.post_repo.get_submission_ids(include_curated=False):
+            current_fingerprint = self.comment_fingerprints.get(submission_id, NO_COMMENTS_FINGERPRINT)
+            if (
+                submission_id in stored_fingerprints
+                and stored_fingerprints[submission_id] == current_fingerprint
+            ):
+                unchanged += 1
+                continue
+            submission_ids.append(submission_id)
+
+        logger.info(f"{len(submission_ids)} posts need scoring; skipped {unchanged} unchanged posts")
+        self.posts_to_score = submission_ids
+        return submission_ids
+
+
+    def iter_posts_with_comments(self) -> Iterator[List[Dict]]:
+        """
+        Stream serialized posts with their comments in chunks of SENTIMENT_QUERY_CHUNK_SIZE,
+        using a constant number of queries per chunk. Only the posts chosen by
+        select_posts_to_score() are streamed.
+        Yields:
+            List[Dict]: A chunk of serialized posts with associated comments.
+        """
+        for posts in self.post_repo.iter_posts_with_comments(self.chunk_size, self.posts_to_score):
+            chunk = []
+            for post in posts:
+                comment_records = []
+                for comment in sorted(post.comments, key=lambda item: item.id):
+                    comment_records.append(serialize_comment(comment))
+                chunk.append(serialize_post(post, comment_records))
+
+            # Drop the loaded ORM objects so memory stays bounded by the chunk size.
+            self.session.expunge_all()
+            yield chunk
+
+
     def query_posts_with_comments(self) -> List[Dict]:
         """
-        Query all posts and their comments from the database.
+        Query the posts that need scoring and their comments from the database.
         Returns:
             List[Dict]: List of posts with associated comments.
         """
@@ -48,17 +154,15 @@ class SentimentService:
         logger.info("Querying posts with comments")
 
         try:
-            posts = self.post_repo.get_all_posts()
+            self.select_posts_to_score()
             total_comments = 0
 
-            for post in posts:
-                comment_records, comment_count = get_comments_for_post(
-                    self.session, post.submission_id)
-                total_comments += comment_count
+            for chunk in self.iter_posts_with_comments():
+                for post_record in chunk:
+                    total_comments += len(post_record["comments"])
+                    post_records.append(post_record)
 
-                post_records.append(serialize_post(post, comment_records))
-
-            logger.info(f"Retrieved {len(posts)} posts and {total_comments} comments")
+            logger.info(f"Retrieved {len(post_records)} posts and {total_comments} comments")
 
             self.query_results = post_records
             return post_records
@@ -73,6 +177,83 @@ class SentimentService:
             self.session.close()
 
 
+    def score_comment_texts(self, texts: List[str]) -> List[float]:
+        """
+        Compute VADER compound scores for comment texts, consulting the sentiment cache first
+        when it is enabled. Only distinct uncached texts reach the scoring engine.
+        Args:
+            texts (List[str]): Comment texts to score.
+        Returns:
+            List[float]: Compound scores in the same order as texts.
+        """
+        if not self.cache_enabled:
+            return self.run_scoring_engine(texts)
+
+        cache_keys = [comment_cache_key(text) for text in texts]
+
+        try:
+            cached_scores = self.cache_repo.get_many(set(cache_keys))
+        except Exception as e:
+            logger.error(f"Sentiment cache lookup failed, scoring without it: {e}", exc_info=True)
+            self.session.rollback()
+            return self.run_scoring_engine(texts)
+
+        miss_texts = {}
+        for cache_key, text in zip(cache_keys, texts):
+            if cache_key not in cached_scores and cache_key not in miss_texts:
+                miss_texts[cache_key] = text
+
+        new_scores = dict(zip(miss_texts.keys(), self.run_scoring_engine(list(miss_texts.values()))))
+
+        hits = 0
+        for cache_key in cache_keys:
+            if cache_key in cached_scores:
+                hits += 1
+        self.cache_stats = {
+            "lookups": len(cache_keys),
+            "hits": hits,
+            "hit_rate": hits / len(cache_keys) if cache_keys else 0.0,
+        }
+        logger.info(
+            f"Sentiment cache: {hits}/{len(cache_keys)} hits "
+            f"({self.cache_stats['hit_rate']:.1%}), {len(new_scores)} comments scored")
+
+        try:
+            self.cache_repo.put_many(new_scores)
+            evicted = self.cache_repo.evict(self.cache_max_entries)
+            self.session.commit()
+            if evicted:
+                logger.info(f"Evicted {evicted} old sentiment cache entries")
+        except Exception as e:
+            self.session.rollback()
+            logger.error(f"Failed to update sentiment cache: {e}", exc_info=True)
+
+        cached_scores.update(new_scores)
+        return [cached_scores[cache_key] for cache_key in cache_keys]
+
+
+    def run_scoring_engine(self, texts: List[str]) -> List[float]:
+        """
+        Compute VADER compound scores for comment texts with the configured scoring engine.
+        Small workloads stay serial since a process pool costs more to start than it saves;
+        larger ones reuse the service's pool, started on the first of them.
+        Args:
+            texts (List[str]): Comment texts to score.
+        Returns:
+            List[float]: Compound scores in the same order as texts.
+        """
+        if (
+            self.scoring_mode == "parallel"
+            and self.scoring_workers > 1
+            and len(texts) > self.scoring_batch_size
+        ):
+            logger.info(
+                f"Scoring {len(texts)} comments across {self.scoring_workers} worker processes")
+            return score_texts_parallel(self.get_scoring_pool(), texts, self.scoring_batch_size)
+
+        return score_texts_serial(self.sia, texts)
+
+
     def analyze_post_sentiment(self):
         """
         Analyze sentiment for each comment in the queried posts using VADER.
@@ -88,25 +269,26 @@ class SentimentService:
         logger.info(f"Analyzing sentiment for {len(self.query_results)} posts")
 
         try:
+            comment_texts = []
+            for posts in self.query_results:
+                for comment in posts.get("comments", []):
+                    comment_texts.append(comment.get("body", ""))
+
+            compound_scores = self.score_comment_texts(comment_texts)
+            position = 0
+
             for posts in self.query_results:
                 comments = posts.get("comments", [])
+                post_key = posts.get("post_key", "")
                 comment_sentiment_scores = []
 
-                for comment in comments:
-                    comment_text = comment.get("body", "")
-                    post_key = posts.get("post_key", "")
-                    score = self.sia.polarity_scores(comment_text)
-
-                    if score["compound"] > 0.05:
-                        label = "Positive"
-                    elif score["compound"] < -0.05:
-                        label = "Negative"
-                    else:
-                        label = "Neutral"
+                for _ in comments:
+                    compound = compound_scores[position]
+                    position += 1
 
                     comment_sentiment_scores.append(
                         {"post_key": post_key,
-                            "compound": score["compound"], "label": label}
+                            "compound": compound, "label": label_compound(compound)}
                     )
                 post_sentiment_scores.append(comment_sentiment_scores)
 
@@ -120,6 +302,17 @@ class SentimentService:
         return post_sentiment_scores
 
 
+    @staticmethod
+    def build_empty_summary(post_key: str) -> Dict:
+        """
+        Summary recorded for a post without comments, so incremental runs skip it until comments arrive.
+        """
+        return {
+            "post_key": post_key,
+            "sentiment_summary": {"dominant_sentiment": "Neutral", "avg_compound": 0.0, "counts": {}}
+        }
+
+
     def summarize_post_sentiment(self) -> List[Dict]:
         """
         Summarize sentiment results for each post, including dominant sentiment and average compound score.
@@ -136,9 +329,10 @@ class SentimentService:
         summaries = []
 
         try:
-            for post_comment in self.post_sentiment_scores:
+            for post_record, post_comment in zip(self.query_results, self.post_sentiment_scores):
 
                 if not post_comment:
+                    summaries.append(self.build_empty_summary(post_record.get("post_key")))
                     continue
 
                 sentiment_labels = []
@@ -185,6 +379,35 @@ class SentimentService:
         return summaries
 
 
+    def write_sentiment_summaries(self, sentiments: List[Dict]) -> int:
+        """
+        Add sentiment summaries to the session, replacing the previous sentiment of each post.
+        The caller is responsible for committing.
+        Args:
+            sentiments (List[Dict]): Summaries as produced by summarize_post_sentiment().
+        Returns:
+            int: Number of sentiments written.
+        """
+        sentiments_to_store = []
+        for post_sentiment_summary in sentiments:
+            post_key = post_sentiment_summary.get("post_key")
+            post_sentiment = post_sentiment_summary.get(
+                "sentiment_summary")
+
+            sentiments_to_store.append({
+                "post_id": post_key,
+                "sentiment_results": post_sentiment,
+                "comment_fingerprint": self.comment_fingerprints.get(post_key, NO_COMMENTS_FINGERPRINT)
+            })
+
+        # Re-scored posts replace their previous sentiment instead of adding another row.
+        replaced = self.sentiment_repo.delete_sentiments_for_posts(
+            [sentiment["post_id"] for sentiment in sentiments_to_store])
+        self.sentiment_repo.create_sentiments(sentiments_to_store)
+        logger.info(f"Stored {len(sentiments_to_store)} sentiments ({replaced} replaced)")
+        return len(sentiments_to_store)
+
+
     def store_sentiment_results(self):
         """
         Store sentiment summaries for posts in the database.
@@ -202,18 +425,7 @@ class SentimentService:
         try:
             logger.info("Storing sentiments")
 
-            sentiments_to_store = []
-            for post_sentiment_summary in sentiments:
-                post_key = post_sentiment_summary.get("post_key")
-                post_sentiment = post_sentiment_summary.get(
-                    "sentiment_summary")
-                
-                sentiments_to_store.append({
-                    "post_id": post_key,
-                    "sentiment_results": post_sentiment
-                })
-
-            self.sentiment_repo.create_sentiments(sentiments_to_store)
+            self.write_sentiment_summaries(sentiments)
             self.session.commit()
 
             logger.info("Sentiment storage complete")
@@ -224,3 +436,72 @@ class SentimentService:
         finally:
             self.session.close()
 
+
+    def run_streaming(self) -> int:
+        """
+        Query, score, summarize and store sentiment as one streaming pass.
+        Posts flow through in chunks of SENTIMENT_QUERY_CHUNK_SIZE, each post is summarized
+        with running counters, and summaries are flushed every SENTIMENT_FLUSH_BATCH_SIZE
+        posts, so peak memory is bounded by the chunk size rather than the table size.
+        Returns:
+            int: Number of sentiments stored.
+        """
+        logger.info("Streaming sentiment analysis started")
+        pending_summaries: List[Dict] = []
+        stored = 0
+        scored_posts = 0
+
+        try:
+            self.select_posts_to_score()
+
+            for chunk in self.iter_posts_with_comments():
+                comment_texts = []
+                for post_record in chunk:
+                    for comment in post_record["comments"]:
+                        comment_texts.append(comment.get("body", ""))
+
+                compound_scores = iter(self.score_comment_texts(comment_texts))
+
+                for post_record in chunk:
+                    if not post_record["comments"]:
+                        pending_summaries.append(self.build_empty_summary(post_record["post_key"]))
+                        continue
+
+                    label_counts = Counter()
+                    compound_total = 0.0
+                    compound_count = 0
+                    for _ in post_record["comments"]:
+                        compound = next(compound_scores)
+                        label_counts[label_compound(compound)] += 1
+                        compound_total += compound
+                        compound_count += 1
+
+                    pending_summaries.append({
+                        "post_key": post_record["post_key"],
+                        "sentiment_summary": {
+                            "dominant_sentiment": label_counts.most_common(1)[0][0],
+                            "avg_compound": compound_total / compound_count,
+                            "counts": dict(label_counts)}
+                    })
+                    scored_posts += 1
+
+                if len(pending_summaries) >= self.flush_batch_size:
+                    stored += self.write_sentiment_summaries(pending_summaries)
+                    self.session.commit()
+                    pending_summaries = []
+
+            if pending_summaries:
+                stored += self.write_sentiment_summaries(pending_summaries)
+                self.session.commit()
+
+            logger.info(f"Streaming sentiment analysis complete: {scored_posts} posts scored, {stored} stored")
+            return stored
+
+        except Exception as e:
+            self.session.rollback()
+            logger.error(f"Error during streaming sentiment analysis: {e}", exc_info=True)
+            return stored
+
+        finally:
+            self.close_scoring_pool()
+            self.session.close()
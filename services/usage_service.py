@@ -0,0 +1,61 @@
+import argparse
+from typing import Dict, List, Optional
+from database import get_session
+from repositories.llm_call_repository import LLMCallRepository
+from utils.logger import logger
+
+
+class UsageService:
+    """
+    Service for reporting Gemini usage recorded in the llm_calls table.
+    """
+
+    def __init__(self):
+        self.session = get_session()
+        self.llm_call_repo = LLMCallRepository(self.session)
+
+
+    def log_summaries(self, title: str, key: str, summaries: List[Dict]):
+        """
+        Log one line per aggregated row.
+        """
+        logger.info(title)
+        for summary in summaries:
+            avg_latency = summary["avg_latency_seconds"] or 0.0
+            logger.info(
+                f"{summary[key]}: {summary['calls']} call(s) "
+                f"({summary['successes']} ok, {summary['errors']} failed, {summary['cache_hits']} cached), "
+                f"{summary['retries']} retries, {summary['prompt_tokens']} prompt / "
+                f"{summary['candidate_tokens']} candidate / {summary['total_tokens']} total tokens, "
+                f"avg latency {avg_latency:.2f}s, max {summary['max_latency_seconds'] or 0.0:.2f}s")
+
+
+    def report(self, days: int = 7, runs: int = 10, run_id: Optional[str] = None) -> Dict[str, List[Dict]]:
+        """
+        Log and return per-run and per-day usage aggregates.
+        Args:
+            days (int): Number of days for the daily view.
+            runs (int): Number of most recent runs for the run view.
+            run_id (Optional[str]): Only report this run in the run view.
+        Returns:
+            Dict[str, List[Dict]]: "runs" and "days" aggregates.
+        """
+        try:
+            run_summaries = self.llm_call_repo.get_run_summaries(limit=runs, run_id=run_id)
+            daily_summaries = self.llm_call_repo.get_daily_summaries(days=days)
+        finally:
+            self.session.close()
+
+        self.log_summaries("Gemini usage per run:", "run_id", run_summaries)
+        self.log_summaries("Gemini usage per day:", "day", daily_summaries)
+        return {"runs": run_summaries, "days": daily_summaries}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Report Gemini usage per run and per day.")
+    parser.add_argument("--days", type=int, default=7, help="Days covered by the daily view.")
+    parser.add_argument("--runs", type=int, default=10, help="Most recent runs covered by the run view.")
+    parser.add_argument("--run-id", default=None, help="Only report this run.")
+    args = parser.parse_args()
+
+    UsageService().report(days=args.days, runs=args.runs, run_id=args.run_id)
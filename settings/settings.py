@@ -1,6 +1,6 @@
 import os
 from dotenv import load_dotenv
-from typing import List
+from typing import List, Dict
 from utils.logger import logger
 from services.infisical_service import InfisicalSecretsService
 
@@ -28,6 +28,12 @@ REDDIT_USER_AGENT = os.getenv("REDDIT_USER_AGENT")
 # =====================================================
 NOTION_API_KEY = os.getenv("NOTION_API_KEY")
 NOTION_DB_ID = os.getenv("NOTION_DB_ID")
+# Optional override of the Notion API endpoint, e.g. a local mock server for testing.
+NOTION_BASE_URL = os.getenv("NOTION_BASE_URL")
+# Notion allows an average of three requests per second and 100 child blocks per request.
+NOTION_REQUESTS_PER_MINUTE: int = 180
+NOTION_MAX_BLOCKS_PER_REQUEST: int = 100
+NOTION_MAX_RETRIES: int = 5
 
 
 # =====================================================
@@ -36,6 +42,20 @@ NOTION_DB_ID = os.getenv("NOTION_DB_ID")
 EMAIL_ADDRESS = os.getenv("EMAIL_ADDRESS")
 EMAIL_APP_PASSWORD = os.getenv("EMAIL_APP_PASSWORD")
 RECIPIENT_ADDRESS = os.getenv("RECIPIENT_ADDRESS")
+# Comma-separated list of report recipients; falls back to RECIPIENT_ADDRESS.
+RECIPIENT_ADDRESSES: List[str] = [
+    address.strip() for address in (os.getenv("RECIPIENT_ADDRESSES") or RECIPIENT_ADDRESS or "").split(",")
+    if address.strip()
+]
+# SMTP server; override to point at a local sink such as fakes/smtp_sink.py.
+SMTP_HOST = os.getenv("SMTP_HOST", "smtp.gmail.com")
+SMTP_PORT: int = int(os.getenv("SMTP_PORT", "587"))
+SMTP_USE_TLS: bool = os.getenv("SMTP_USE_TLS", "true").lower() not in ("0", "false", "no")
+SMTP_TIMEOUT_SECONDS: float = 30.0
+# Fan-out sends over at most this many authenticated SMTP sessions, each reused across messages.
+SMTP_POOL_SIZE: int = 2
+# Consecutive reconnects allowed when the server drops a session mid fan-out.
+SMTP_MAX_RECONNECTS: int = 2
 
 
 # =====================================================
@@ -45,11 +65,35 @@ CHOICE_ONE = "Notion"
 CHOICE_TWO = "Email"
 CHOICE_THREE = "Notion & Email"
 
+# Channel names registered with the egress dispatcher.
+NOTION_CHANNEL = "notion"
+EMAIL_CHANNEL = "email"
+# Channels are delivered concurrently; each one is given up on after its timeout.
+EGRESS_CHANNEL_TIMEOUT_SECONDS: float = 120.0
+EGRESS_CHANNEL_TIMEOUTS: Dict[str, float] = {
+    NOTION_CHANNEL: 600.0,
+    EMAIL_CHANNEL: 120.0,
+}
+
+# Deliveries are queued in the egress_outbox table, one row per brief, channel and recipient,
+# and retried with exponential backoff until sent or OUTBOX_MAX_ATTEMPTS is reached.
+OUTBOX_ENABLED: bool = True
+OUTBOX_MAX_ATTEMPTS: int = 6
+OUTBOX_BACKOFF_BASE_SECONDS: float = 60.0
+OUTBOX_BACKOFF_MAX_SECONDS: float = 6 * 60 * 60
+OUTBOX_BATCH_SIZE: int = 50
+# A "sending" entry older than this is assumed abandoned by a crashed worker or a timed-out
+# send and retried; keep it well above the longest EGRESS_CHANNEL_TIMEOUTS value.
+OUTBOX_SENDING_LEASE_SECONDS: float = 30 * 60
+OUTBOX_DRAIN_INTERVAL_MINUTES: int = 15
+
 
 # =====================================================
 # AGENT CONFIGURATION
 # =====================================================
 GEMINI_API_KEY = os.getenv("GEMINI_API_KEY")
+# Optional override of the Gemini API endpoint, e.g. a local fake server for testing.
+GEMINI_BASE_URL = os.getenv("GEMINI_BASE_URL")
 
 
 # =====================================================
@@ -67,6 +111,52 @@ DEFAULT_SUBREDDITS: List[str] = [
 DEFAULT_POST_LIMIT: int = 100
 DEFAULT_COMMENT_LIMIT: int = 80
 
+# Reddit allows 100 OAuth requests per minute; keep some headroom for retries.
+REDDIT_REQUESTS_PER_MINUTE: int = 90
+INGRESS_MAX_WORKERS: int = 8
+COMMENT_FETCH_WORKERS: int = 8
+
+# Re-fetch and replace comments of posts that are already stored instead of skipping them.
+REFRESH_KNOWN_SUBMISSIONS: bool = False
+
+# "full" re-reads the hot listing every run; "incremental" reads the new listing
+# only back to the stored per-subreddit cursor.
+INGRESS_MODE: str = "full"
+# New posts rarely meet the filtering requirements straight away, so incremental runs
+# re-walk this many hours behind the cursor to pick up posts that have since matured.
+INCREMENTAL_LOOKBACK_HOURS: int = 48
+# Incremental runs page through the new listing until they reach the cursor instead of
+# stopping at DEFAULT_POST_LIMIT; this caps the walk (Reddit serves at most ~1000 items).
+INCREMENTAL_MAX_POSTS: int = 1000
+
+
+# =====================================================
+# STORAGE SETTINGS
+# =====================================================
+# Write posts and comments with batched Core inserts/upserts instead of one ORM object per row.
+BULK_WRITE_ENABLED: bool = True
+BULK_WRITE_BATCH_SIZE: int = 1000
+
+
+# =====================================================
+# SENTIMENT ANALYSIS SETTINGS
+# =====================================================
+# Posts loaded (with their comments) per round trip when reading for sentiment scoring.
+SENTIMENT_QUERY_CHUNK_SIZE: int = 500
+# "incremental" only scores uncurated posts with no sentiment or a changed comment set;
+# "full" re-scores every post.
+SENTIMENT_MODE: str = "incremental"
+# "serial" scores on one core; "parallel" spreads comment batches over a process pool.
+SENTIMENT_SCORING_MODE: str = "serial"
+SENTIMENT_WORKERS: int = os.cpu_count() or 1
+SENTIMENT_BATCH_SIZE: int = 2000
+# Persistent cache of compound scores keyed by a hash of the comment body and analyzer version.
+SENTIMENT_CACHE_ENABLED: bool = True
+SENTIMENT_CACHE_MAX_ENTRIES: int = 1_000_000
+# Stream posts through query -> score -> summarize -> store with bounded memory.
+SENTIMENT_STREAMING: bool = True
+SENTIMENT_FLUSH_BATCH_SIZE: int = 500
+
 
 # =====================================================
 # REDDIT DATA FILTERING REQUIREMENTS
@@ -80,6 +170,58 @@ MIN_UPVOTE_RATIO = 0.8
 # AGENT SETTINGS AND OBJECTIVES
 # =====================================================
 AGENT_MODEL = "gemini-2.5-flash"
+
+# Curate every uncurated post in batches sized by estimated prompt tokens.
+CURATION_BATCHING: bool = True
+CURATION_TOKEN_BUDGET: int = 30000
+CURATION_MAX_CONCURRENCY: int = 2
+# Store one brief per run (merged) instead of one brief per batch.
+CURATION_MERGE_BRIEFS: bool = True
+# "tool" lets the model call query_posts_with_sentiments(); "inline" sends the posts
+# inside the prompt so each batch costs a single generate_content round trip;
+# "structured" inlines the posts and constrains the answer to a JSON array of problems,
+# stored one row per problem in curated_problems.
+CURATION_MODE: str = "structured"
+
+# Reuse Gemini responses for identical model/objective/payload inputs, e.g. when a run is retried.
+LLM_CACHE_ENABLED: bool = True
+LLM_CACHE_TTL_HOURS: int = 72
+LLM_CACHE_MAX_ENTRIES: int = 1000
+
+# Rank uncurated posts by pain signal and curate only the strongest CURATION_TOP_K (None = all).
+CURATION_TOP_K: int | None = None
+# Posts sent in a single curation call when CURATION_BATCHING is off and CURATION_TOP_K
+# is unset (None = all).
+CURATION_UNBATCHED_POST_LIMIT: int | None = 10
+PAIN_SIGNAL_WEIGHTS: Dict[str, float] = {
+    "score": 1.0,
+    "comments": 1.0,
+    "upvote_ratio": 1.0,
+    "negative_share": 4.0,
+    "negativity": 4.0,
+}
+
+# Group near-duplicate posts locally and send one representative per cluster to the curator.
+CLUSTERING_ENABLED: bool = True
+CLUSTER_SIMILARITY_THRESHOLD: float = 0.5
+CLUSTER_HASH_FEATURES: int = 2 ** 18
+CLUSTER_TOP_COMMENTS: int = 3
+
+# Trim post bodies to their key sentences, strip URLs/markdown, attach the top comments and
+# serialize records with short keys before they are sent to the curator.
+COMPACTION_ENABLED: bool = True
+COMPACTION_BODY_TOKEN_BUDGET: int = 250
+COMPACTION_TOP_COMMENTS: int = 3
+COMPACTION_COMMENT_MAX_CHARS: int = 280
+
+# Gemini call resilience: retries with backoff, circuit breaker and per-minute budgets.
+GEMINI_MAX_RETRIES: int = 5
+GEMINI_BACKOFF_BASE_SECONDS: float = 2.0
+GEMINI_BACKOFF_MAX_SECONDS: float = 60.0
+GEMINI_REQUESTS_PER_MINUTE: int = 10
+GEMINI_TOKENS_PER_MINUTE: int = 250000
+GEMINI_CIRCUIT_FAILURE_THRESHOLD: int = 5
+GEMINI_CIRCUIT_RESET_SECONDS: float = 120.0
 SCOUT_OBJECTIVE = """
 You are a market scout agent.
 
@@ -91,6 +233,7 @@ Each record returned by that method includes:
 - Body
 - Subreddit
 - Sentiment Score (counts, average compound, dominant sentiment)
+- Cluster Size (only present when the post stands for several similar posts)
 
 Your new workflow:
 
@@ -111,3 +254,50 @@ Your new workflow:
 Output:
 - Return the problem statements and their sentiment statements.
 """
+
+INLINE_SCOUT_OBJECTIVE = """
+You are a market scout agent.
+
+The posts to analyze are provided below as a JSON array. Each record includes:
+- post_number
+- title
+- body
+- subreddit
+- sentiment_score (counts, average compound, dominant sentiment)
+- cluster_size (only present when the post stands for several similar posts)
+
+Your workflow:
+
+1. Group the posts by subreddit for contextual analysis.
+
+2. For each post:
+   - Interpret the sentiment data to understand audience tone and emotional intensity.
+   - Identify whether the discussion highlights a common or critical market problem.
+
+3. For each post, return a problem statement:
+   "X people face Y problem so build Z solution for W results."
+
+4. Accompany each with a sentiment statement:
+   "Sentiment statement: Sentiment towards [X: Entity/Topic] is predominantly [Y: Sentiment Label], with users [Z: Key themes, opinions, or concerns drawn from the discussion]."
+
+Output:
+- Return the problem statements and their sentiment statements.
+"""
+
+STRUCTURED_OUTPUT_INSTRUCTIONS = """
+Respond with a JSON array containing one object per post:
+- post_number: the post number of the record
+- problem_statement: the problem statement, without a label
+- sentiment_statement: the sentiment statement, without the "Sentiment statement:" label
+"""
+
+COMPACT_RECORD_LEGEND = """
+Records use compact keys:
+- n: post number
+- r: subreddit
+- t: title
+- b: body, trimmed to its key sentences
+- s: sentiment score (d: dominant sentiment, l: counts per label, a: average compound)
+- k: cluster size (only present when the post stands for several similar posts)
+- c: top comments by score, each shortened
+"""
@@ -0,0 +1,149 @@
+import math
+import re
+import zlib
+from collections import Counter
+from typing import Dict, List
+
+TOKEN_PATTERN = re.compile(r"[a-z0-9']{3,}")
+
+STOPWORDS = frozenset("""
+about above after again against all also and any are aren't because been before being below
+between both but can can't cannot could couldn't did didn't does doesn't doing don't down during
+each few for from further had hadn't has hasn't have haven't having her here hers herself him
+himself his how i'd i'll i'm i've into isn't it's its itself just let's more most mustn't myself
+not now off once only other our ours ourselves out over own same shan't she she'd she'll she's
+should shouldn't some such than that that's the their theirs them themselves then there there's
+these they they'd they'll they're they've this those through too under until very was wasn't
+we'd we'll we're we've were weren't what what's when when's where where's which while who who's
+whom why why's will with won't would wouldn't you you'd you'll you're you've your yours yourself
+yourselves http https www com reddit
+""".split())
+
+# A sparse vector: feature index -> weight.
+SparseVector = Dict[int, float]
+
+
+def tokenize(text: str) -> List[str]:
+    """
+    Lowercase a text and split it into word tokens, dropping stopwords.
+    Args:
+        text (str): The text to tokenize.
+    Returns:
+        List[str]: The tokens.
+    """
+    return [token for token in TOKEN_PATTERN.findall((text or "").lower()) if token not in STOPWORDS]
+
+
+def hash_token(token: str, n_features: int) -> int:
+    """
+    Map a token to a feature index with a hash that is stable across processes.
+    """
+    return zlib.crc32(token.encode("utf-8")) % n_features
+
+
+def vectorize_documents(documents: List[str], n_features: int) -> List[SparseVector]:
+    """
+    Turn documents into L2-normalized TF-IDF vectors using the hashing trick,
+    so no vocabulary has to be built or stored.
+    Args:
+        documents (List[str]): The documents to vectorize.
+        n_features (int): Size of the hashed feature space.
+    Returns:
+        List[SparseVector]: One sparse vector per document.
+    """
+    term_counts = []
+    document_frequency: Counter = Counter()
+
+    for document in documents:
+        counts = Counter(hash_token(token, n_features) for token in tokenize(document))
+        term_counts.append(counts)
+        document_frequency.update(counts.keys())
+
+    total_documents = len(documents)
+    vectors = []
+    for counts in term_counts:
+        vector = {}
+        for feature, count in counts.items():
+            idf = math.log((1 + total_documents) / (1 + document_frequency[feature])) + 1
+            vector[feature] = (1 + math.log(count)) * idf
+
+        norm = math.sqrt(sum(weight * weight for weight in vector.values()))
+        if norm:
+            for feature in vector:
+                vector[feature] /= norm
+        vectors.append(vector)
+
+    return vectors
+
+
+def sparse_dot(left: SparseVector, right: SparseVector) -> float:
+    """
+    Dot product of two sparse vectors, iterating over the smaller one.
+    """
+    if len(left) > len(right):
+        left, right = right, left
+    return sum(weight * right.get(feature, 0.0) for feature, weight in left.items())
+
+
+def cluster_vectors(vectors: List[SparseVector], similarity_threshold: float) -> List[List[int]]:
+    """
+    Group vectors with single-pass incremental clustering: each vector joins the most
+    similar existing cluster if the cosine similarity to its centroid reaches the
+    threshold, otherwise it starts a new cluster.
+    Args:
+        vectors (List[SparseVector]): L2-normalized vectors.
+        similarity_threshold (float): Minimum cosine similarity to join a cluster.
+    Returns:
+        List[List[int]]: Clusters as lists of vector indexes, in order of creation.
+    """
+    clusters: List[List[int]] = []
+    centroid_sums: List[SparseVector] = []
+    centroid_norms: List[float] = []
+
+    for index, vector in enumerate(vectors):
+        best_cluster = None
+        best_similarity = similarity_threshold
+
+        if vector:
+            for cluster_index, centroid_sum in enumerate(centroid_sums):
+                norm = centroid_norms[cluster_index]
+                if not norm:
+                    continue
+                similarity = sparse_dot(vector, centroid_sum) / norm
+                if similarity >= best_similarity:
+                    best_cluster = cluster_index
+                    best_similarity = similarity
+
+        if best_cluster is None:
+            clusters.append([index])
+            centroid_sums.append(dict(vector))
+            centroid_norms.append(math.sqrt(sum(weight * weight for weight in vector.values())))
+            continue
+
+        clusters[best_cluster].append(index)
+        centroid_sum = centroid_sums[best_cluster]
+        for feature, weight in vector.items():
+            centroid_sum[feature] = centroid_sum.get(feature, 0.0) + weight
+        centroid_norms[best_cluster] = math.sqrt(sum(weight * weight for weight in centroid_sum.values()))
+
+    return clusters
+
+
+def pick_representative(cluster: List[int], vectors: List[SparseVector]) -> int:
+    """
+    Pick the member of a cluster closest to the cluster centroid.
+    Args:
+        cluster (List[int]): Vector indexes of the cluster members.
+        vectors (List[SparseVector]): All vectors.
+    Returns:
+        int: The index of the representative member.
+    """
+    if len(cluster) == 1:
+        return cluster[0]
+
+    centroid: SparseVector = {}
+    for index in cluster:
+        for feature, weight in vectors[index].items():
+            centroid[feature] = centroid.get(feature, 0.0) + weight
+
+    return max(cluster, key=lambda index: sparse_dot(vectors[index], centroid))
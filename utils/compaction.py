@@ -0,0 +1,166 @@
+import html
+import re
+from collections import Counter
+from typing import Dict, List, Optional
+from utils.clustering import tokenize
+from utils.helpers import estimate_tokens
+
+URL_PATTERN = re.compile(r"https?://\S+|www\.\S+")
+MARKDOWN_LINK_PATTERN = re.compile(r"!?\[([^\]]*)\]\([^)]*\)")
+MARKDOWN_LINE_PREFIX_PATTERN = re.compile(r"^\s{0,3}(?:#{1,6}\s+|>+\s?|[-*+]\s+|\d+[.)]\s+)", re.MULTILINE)
+MARKDOWN_EMPHASIS_PATTERN = re.compile(r"(\*{1,3}|_{2,3}|~~|`+)")
+HORIZONTAL_RULE_PATTERN = re.compile(r"^\s*(?:[-*_]\s*){3,}$", re.MULTILINE)
+ZERO_WIDTH_PATTERN = re.compile(r"[\u200b\u200c\u200d\ufeff]")
+WHITESPACE_PATTERN = re.compile(r"\s+")
+SENTENCE_SPLIT_PATTERN = re.compile(r"(?<=[.!?])\s+")
+
+# Short keys used in compact records; the prompt legend explains them to the model.
+COMPACT_KEYS = {
+    "post_number": "n",
+    "subreddit": "r",
+    "title": "t",
+    "body": "b",
+    "sentiment_score": "s",
+    "cluster_size": "k",
+    "comments": "c",
+}
+
+
+def clean_text(text: Optional[str]) -> str:
+    """
+    Strip URLs, markdown syntax and HTML entities from Reddit text and collapse whitespace.
+    Args:
+        text (Optional[str]): Raw post or comment text.
+    Returns:
+        str: Plain text on a single line.
+    """
+    if not text:
+        return ""
+
+    text = html.unescape(text)
+    text = MARKDOWN_LINK_PATTERN.sub(r"\1", text)
+    text = URL_PATTERN.sub("", text)
+    text = HORIZONTAL_RULE_PATTERN.sub("", text)
+    text = MARKDOWN_LINE_PREFIX_PATTERN.sub("", text)
+    text = MARKDOWN_EMPHASIS_PATTERN.sub("", text)
+    text = ZERO_WIDTH_PATTERN.sub("", text)
+    return WHITESPACE_PATTERN.sub(" ", text).strip()
+
+
+def truncate_text(text: str, max_chars: int) -> str:
+    """
+    Cut a text to at most max_chars characters, at a word boundary where possible.
+    """
+    if len(text) <= max_chars:
+        return text
+
+    cut = text[:max_chars - 1]
+    boundary = cut.rfind(" ")
+    if boundary > max_chars // 2:
+        cut = cut[:boundary]
+    return cut.rstrip() + "…"
+
+
+def summarize_text(text: str, token_budget: int) -> str:
+    """
+    Trim a text to a token budget with extractive summarization. The opening sentence,
+    which usually states the problem, is kept first; the rest are picked greedily by the
+    frequency of their words in the text (SumBasic), discounting words already covered so
+    repeated sentences are not picked twice. Kept sentences are returned in their original order.
+    Args:
+        text (str): Cleaned text.
+        token_budget (int): Maximum estimated tokens of the result.
+    Returns:
+        str: The text itself if it fits, otherwise its highest-ranked sentences.
+    """
+    if estimate_tokens(text) <= token_budget:
+        return text
+
+    sentences = [sentence for sentence in SENTENCE_SPLIT_PATTERN.split(text) if sentence]
+    sentence_tokens = [tokenize(sentence) for sentence in sentences]
+    frequencies = Counter(token for tokens in sentence_tokens for token in tokens)
+    total_tokens = sum(frequencies.values()) or 1
+    weights = {token: count / total_tokens for token, count in frequencies.items()}
+
+    selected = []
+    remaining = token_budget
+    candidates = [index for index, tokens in enumerate(sentence_tokens) if tokens]
+
+    while candidates:
+        if not selected and candidates[0] == 0:
+            best = 0
+        else:
+            best = max(candidates, key=lambda index: sum(weights[token] for token in sentence_tokens[index])
+                       / len(sentence_tokens[index]))
+        candidates.remove(best)
+
+        cost = estimate_tokens(sentences[best])
+        if cost > remaining:
+            continue
+
+        selected.append(best)
+        remaining -= cost
+        for token in sentence_tokens[best]:
+            weights[token] *= weights[token]
+
+    if not selected:
+        return truncate_text(text, token_budget * 4)
+
+    return " ".join(sentences[index] for index in sorted(selected))
+
+
+def compact_sentiment(sentiment_results: Optional[Dict]) -> Dict:
+    """
+    Keep only the fields of a sentiment summary the curator uses, with short keys.
+    """
+    sentiment_results = sentiment_results or {}
+    compact = {"l": sentiment_results.get("counts") or {}}
+    if sentiment_results.get("dominant_sentiment"):
+        compact["d"] = sentiment_results["dominant_sentiment"]
+    if sentiment_results.get("avg_compound") is not None:
+        compact["a"] = round(sentiment_results["avg_compound"], 3)
+    return compact
+
+
+def compact_post_record(record: Dict, body_token_budget: int, comments: Optional[List[Dict]] = None,
+                        comment_max_chars: int = 280) -> Dict:
+    """
+    Build the compact form of a post record sent to the curator.
+    Args:
+        record (Dict): A post record from CoreService.
+        body_token_budget (int): Maximum estimated tokens of the trimmed body.
+        comments (Optional[List[Dict]]): Top comments of the post, best first.
+        comment_max_chars (int): Maximum characters kept per comment.
+    Returns:
+        Dict: The record with short keys; empty fields are left out.
+    """
+    compact = {
+        COMPACT_KEYS["post_number"]: record["post_number"],
+        COMPACT_KEYS["subreddit"]: record["subreddit"],
+        COMPACT_KEYS["title"]: clean_text(record["title"]),
+    }
+
+    body = summarize_text(clean_text(record.get("body")), body_token_budget)
+    if body:
+        compact[COMPACT_KEYS["body"]] = body
+
+    compact[COMPACT_KEYS["sentiment_score"]] = compact_sentiment(record.get("sentiment_score"))
+
+    if record.get("cluster_size"):
+        compact[COMPACT_KEYS["cluster_size"]] = record["cluster_size"]
+
+    comment_texts = [truncate_text(clean_text(comment["body"]), comment_max_chars) for comment in comments or []]
+    comment_texts = [text for text in comment_texts if text]
+    if comment_texts:
+        compact[COMPACT_KEYS["comments"]] = comment_texts
+
+    return compact
+
+
+def record_post_number(record: Dict) -> int:
+    """
+    Read the post number of a full or compact post record.
+    """
+    if "post_number" in record:
+        return record["post_number"]
+    return record[COMPACT_KEYS["post_number"]]
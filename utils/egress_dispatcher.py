@@ -0,0 +1,91 @@
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from typing import Callable, Dict, List, Optional
+from utils.logger import logger
+
+
+class EgressDispatcher:
+    """
+    Delivers a brief to several channels concurrently. Channels are registered by name
+    with a send callable returning True on success; each gets its own timeout, so egress
+    takes as long as the slowest channel instead of the sum of all of them.
+    """
+
+    def __init__(self, default_timeout: float):
+        self.default_timeout = default_timeout
+        self.channels: Dict[str, Dict] = {}
+
+
+    def register(self, name: str, send: Callable[[], bool], timeout: Optional[float] = None):
+        """
+        Register a delivery channel.
+        Args:
+            name (str): Channel name, e.g. "notion" or "email".
+            send (Callable[[], bool]): Delivers the brief and returns True on success.
+            timeout (Optional[float]): Seconds to wait for the channel, or None for the default.
+        """
+        self.channels[name] = {"send": send, "timeout": timeout or self.default_timeout}
+
+
+    def dispatch(self, channel_names: List[str]) -> Dict[str, Dict]:
+        """
+        Deliver to the given channels concurrently and wait for each up to its timeout.
+        A channel that times out keeps running in the background but is reported as failed.
+        Args:
+            channel_names (List[str]): Registered channels to deliver to.
+        Returns:
+            Dict[str, Dict]: Per-channel "success", "timed_out", "error" and "elapsed_seconds".
+        """
+        results: Dict[str, Dict] = {}
+        futures = {}
+
+        unknown = [name for name in channel_names if name not in self.channels]
+        for name in unknown:
+            logger.error(f"Unknown egress channel: {name}")
+            results[name] = {"success": False, "timed_out": False, "error": "Unknown channel", "elapsed_seconds": 0.0}
+
+        selected = [name for name in channel_names if name in self.channels]
+        if not selected:
+            return results
+
+        executor = ThreadPoolExecutor(max_workers=len(selected), thread_name_prefix="egress")
+        started = time.monotonic()
+        try:
+            for name in selected:
+                futures[name] = (executor.submit(self._run_channel, name), started + self.channels[name]["timeout"])
+
+            for name, (future, deadline) in futures.items():
+                try:
+                    results[name] = future.result(timeout=max(0.0, deadline - time.monotonic()))
+                except FutureTimeoutError:
+                    logger.error(f"Egress channel {name} timed out after {self.channels[name]['timeout']:g}s")
+                    results[name] = {
+                        "success": False,
+                        "timed_out": True,
+                        "error": "Timed out",
+                        "elapsed_seconds": time.monotonic() - started,
+                    }
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+        succeeded = [name for name in selected if results[name]["success"]]
+        logger.info(
+            f"Egress delivered to {len(succeeded)}/{len(channel_names)} channel(s) "
+            f"in {time.monotonic() - started:.2f}s")
+        return results
+
+
+    def _run_channel(self, name: str) -> Dict:
+        """
+        Run one channel's send callable and capture its outcome.
+        """
+        started = time.monotonic()
+        try:
+            success = bool(self.channels[name]["send"]())
+            error = None if success else "Delivery failed"
+        except Exception as e:
+            logger.error(f"Egress channel {name} raised: {e}", exc_info=True)
+            success = False
+            error = str(e)
+
+        return {"success": success, "timed_out": False, "error": error, "elapsed_seconds": time.monotonic() - started}
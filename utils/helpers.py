@@ -1,10 +1,17 @@
+import json
+import math
 import markdown2
 from jinja2 import Environment
+from sqlalchemy import insert
+from sqlalchemy.dialects import mysql, postgresql, sqlite
 from sqlalchemy.orm import Session
 from typing import List, Dict, Tuple, Any
+from settings import settings
 from database.models import Comment, Post
 from utils.logger import logger
 
+REDDIT_LISTING_PAGE_SIZE = 100
+
 
 def serialize_comment(comment: Comment) -> Dict:
     """
@@ -66,7 +73,12 @@ def get_comments_for_post(session, post_id: str) -> Tuple[List[Dict], int]:
     return comment_records, count
 
 
-def get_comments_from_submission(reddit, submission_id: str, comment_limit: int) -> List[Dict[str, Any]]:
+def get_comments_from_submission(
+        reddit,
+        submission_id: str,
+        comment_limit: int,
+        rate_limiter=None
+) -> List[Dict[str, Any]]:
     """
     Fetch and format comments from a single Reddit submission.
 
@@ -74,12 +86,16 @@ def get_comments_from_submission(reddit, submission_id: str, comment_limit: int)
         reddit: The Reddit client instance.
         submission_id: The Reddit submission ID to fetch comments from.
         comment_limit: Max number of comments to retrieve.
+        rate_limiter: Optional shared TokenBucket charged for the comment tree request.
 
     Returns:
         List[Dict[str, Any]]: List of comment data dictionaries.
     """
     comments_collected = []
 
+    if rate_limiter:
+        rate_limiter.acquire()
+
     submission = reddit.submission(id=submission_id)
     submission.comments.replace_more(limit=0)
 
@@ -110,7 +126,8 @@ def get_posts_from_subreddit(
         post_limit: int,
         min_upvote_ratio: float,
         min_score: int,
-        min_comments: int
+        min_comments: int,
+        rate_limiter=None
 ) -> List[Dict[str, Any]]:
     """
     Fetch and filter posts from a single subreddit.
@@ -122,37 +139,136 @@ def get_posts_from_subreddit(
         min_upvote_ratio: Minimum upvote ratio to include a post.
         min_score: Minimum score to include a post.
         min_comments: Minimum number of comments to include a post.
+        rate_limiter: Optional shared TokenBucket charged once per listing page.
 
     Returns:
         List[Dict[str, Any]]: List of post data dictionaries.
     """
     posts = []
 
+    if rate_limiter:
+        rate_limiter.acquire(max(1, math.ceil(post_limit / REDDIT_LISTING_PAGE_SIZE)))
+
     subreddit_posts = list(reddit.subreddit(subreddit_name).hot(limit=post_limit))
     logger.info(f"Retrieved {len(subreddit_posts)} posts from r/{subreddit_name}.")
 
     for submission in subreddit_posts:
-        if (
-            submission.upvote_ratio >= min_upvote_ratio
-            and submission.score >= min_score
-            and submission.num_comments >= min_comments
-            and not submission.stickied
-        ):
-            post_data: Dict[str, Any] = {
-                "subreddit": subreddit_name,
-                "submission_id": submission.id,
-                "title": submission.title,
-                "body": submission.selftext,
-                "upvote_ratio": submission.upvote_ratio,
-                "score": submission.score,
-                "number_of_comments": submission.num_comments,
-                "post_url": submission.url
-            }
-            posts.append(post_data)
+        if meets_post_criteria(submission, min_upvote_ratio, min_score, min_comments):
+            posts.append(serialize_submission(submission, subreddit_name))
 
     return posts
 
 
+def get_new_posts_from_subreddit(
+        reddit,
+        subreddit_name: str,
+        post_limit: int,
+        stop_before_utc: float | None,
+        min_upvote_ratio: float,
+        min_score: int,
+        min_comments: int,
+        rate_limiter=None
+) -> Tuple[List[Dict[str, Any]], Dict[str, Any] | None]:
+    """
+    Fetch and filter posts from a subreddit's "new" listing, newest first,
+    stopping as soon as a post at or before the cursor timestamp is reached.
+    If the walk ends before reaching the cursor, the posts between the oldest one
+    walked and the cursor were never seen, so the oldest walked item is returned as
+    the new cursor instead of the newest.
+
+    Args:
+        reddit: The Reddit client instance.
+        subreddit_name: The name of the subreddit to fetch posts from.
+        post_limit: Max number of posts to walk through.
+        stop_before_utc: Creation timestamp at which pagination stops, or None to walk the whole listing.
+        min_upvote_ratio: Minimum upvote ratio to include a post.
+        min_score: Minimum score to include a post.
+        min_comments: Minimum number of comments to include a post.
+        rate_limiter: Optional shared TokenBucket charged once per listing page.
+
+    Returns:
+        Tuple[List[Dict[str, Any]], Dict[str, Any] | None]: The filtered posts and the item
+        to advance the cursor to ("fullname" and "created_utc"), or None if the listing had
+        nothing new.
+    """
+    posts = []
+    newest = None
+    oldest = None
+    walked = 0
+    reached_cursor = False
+
+    if rate_limiter:
+        rate_limiter.acquire()
+
+    for submission in reddit.subreddit(subreddit_name).new(limit=post_limit):
+        if stop_before_utc is not None and submission.created_utc <= stop_before_utc:
+            reached_cursor = True
+            break
+
+        # PRAW paginates lazily, so every further page of the listing costs one more request.
+        walked += 1
+        if rate_limiter and walked % REDDIT_LISTING_PAGE_SIZE == 0:
+            rate_limiter.acquire()
+
+        if newest is None or submission.created_utc > newest["created_utc"]:
+            newest = {"fullname": submission.fullname, "created_utc": submission.created_utc}
+        if oldest is None or submission.created_utc < oldest["created_utc"]:
+            oldest = {"fullname": submission.fullname, "created_utc": submission.created_utc}
+
+        if meets_post_criteria(submission, min_upvote_ratio, min_score, min_comments):
+            posts.append(serialize_submission(submission, subreddit_name))
+
+    logger.info(f"Walked {walked} new posts from r/{subreddit_name}.")
+
+    if stop_before_utc is not None and not reached_cursor and oldest is not None:
+        logger.warning(
+            f"Walk of r/{subreddit_name} stopped after {walked} posts without reaching the cursor; "
+            f"posts between {stop_before_utc:.0f} and {oldest['created_utc']:.0f} were not seen. "
+            f"Advancing the cursor only to the oldest post walked.")
+        return posts, oldest
+    return posts, newest
+
+
+def meets_post_criteria(submission, min_upvote_ratio: float, min_score: int, min_comments: int) -> bool:
+    """
+    Check whether a Reddit submission passes the configured filtering requirements.
+    Args:
+        submission: The PRAW submission to check.
+        min_upvote_ratio (float): Minimum upvote ratio.
+        min_score (int): Minimum score.
+        min_comments (int): Minimum number of comments.
+    Returns:
+        bool: True if the submission should be kept.
+    """
+    return (
+        submission.upvote_ratio >= min_upvote_ratio
+        and submission.score >= min_score
+        and submission.num_comments >= min_comments
+        and not submission.stickied
+    )
+
+
+def serialize_submission(submission, subreddit_name: str) -> Dict[str, Any]:
+    """
+    Serializes a PRAW submission into a post data dictionary.
+    Args:
+        submission: The PRAW submission to serialize.
+        subreddit_name (str): The subreddit the submission was fetched from.
+    Returns:
+        Dict[str, Any]: A dictionary containing the post data.
+    """
+    return {
+        "subreddit": subreddit_name,
+        "submission_id": submission.id,
+        "title": submission.title,
+        "body": submission.selftext,
+        "upvote_ratio": submission.upvote_ratio,
+        "score": submission.score,
+        "number_of_comments": submission.num_comments,
+        "post_url": submission.url
+    }
+
+
 def ensure_data_integrity(session: Session, reddit_data) -> list:
     """
     Ensures data integrity by checking if the submission_ids in the reddit_data exist in the database.
@@ -185,74 +301,125 @@ def ensure_data_integrity(session: Session, reddit_data) -> list:
     return new_submission_ids
 
 
-def chunk_text(content: str, max_block_size: int = 2000) -> List[str]:
+def build_upsert_statement(session: Session, model, conflict_columns: List[str], update_columns: List[str]):
     """
-    Split a string into chunks no larger than max_block_size characters.
+    Build a Core INSERT for the session's dialect that upserts on the given unique columns.
+    Uses ON CONFLICT on SQLite/PostgreSQL and ON DUPLICATE KEY UPDATE on MySQL; other
+    dialects fall back to a plain INSERT.
     Args:
-        content (str): The text to chunk.
-        max_block_size (int): Maximum characters per block.
+        session (Session): The database session, used to detect the dialect.
+        model: The ORM model whose table is written to.
+        conflict_columns (List[str]): Columns of the unique constraint to upsert on.
+        update_columns (List[str]): Columns overwritten on conflict; empty to ignore duplicates.
     Returns:
-        List[str]: List of text chunks.
+        Insert: The insert statement, ready for executemany.
     """
-    total_characters = len(content)
-    logger.info(f"Total characters in the text: {total_characters}")
+    table = model.__table__
+    dialect_name = session.get_bind().dialect.name
+
+    if dialect_name in ("sqlite", "postgresql"):
+        dialect_insert = sqlite.insert if dialect_name == "sqlite" else postgresql.insert
+        statement = dialect_insert(table)
+        if update_columns:
+            return statement.on_conflict_do_update(
+                index_elements=conflict_columns,
+                set_={column: statement.excluded[column] for column in update_columns}
+            )
+        return statement.on_conflict_do_nothing(index_elements=conflict_columns)
+
+    if dialect_name == "mysql":
+        statement = mysql.insert(table)
+        # MySQL has no DO NOTHING, so a duplicate rewrites its own key instead.
+        columns = update_columns or conflict_columns[:1]
+        return statement.on_duplicate_key_update(
+            {column: statement.inserted[column] for column in columns}
+        )
 
-    blocks = []
-    try:
-        if total_characters > max_block_size:
-            full_blocks = total_characters // max_block_size
-            remainder = total_characters % max_block_size
+    return insert(table)
 
-            for i in range(full_blocks):
-                start_index = i * max_block_size
-                end_index = start_index + max_block_size
-                blocks.append(content[start_index:end_index])
 
-            if remainder > 0:
-                blocks.append(content[-remainder:])
-        else:
-            blocks.append(content)
+def execute_in_batches(session: Session, statement, rows: List[Dict], batch_size: int) -> int:
+    """
+    Execute a Core statement with executemany over fixed-size batches of rows.
+    Args:
+        session (Session): The database session.
+        statement: The Core statement to execute.
+        rows (List[Dict]): Parameter dictionaries, one per row.
+        batch_size (int): Maximum rows per executemany call.
+    Returns:
+        int: Number of rows sent to the database.
+    """
+    for start in range(0, len(rows), batch_size):
+        session.execute(statement, rows[start:start + batch_size])
+    return len(rows)
+
 
-        logger.info(f"Total blocks created: {len(blocks)}")
-        for idx, block in enumerate(blocks):
-            logger.debug(f"Block {idx + 1} length: {len(block)}")
+def compute_pain_signal(post: Post, sentiment_results: Dict, weights: Dict[str, float]) -> float:
+    """
+    Score how strongly a post signals a real pain point, from its engagement and the
+    intensity of negative sentiment in its comments.
+    Args:
+        post (Post): The post.
+        sentiment_results (Dict): The post's stored sentiment summary.
+        weights (Dict[str, float]): Weights for "score", "comments", "upvote_ratio",
+            "negative_share" and "negativity".
+    Returns:
+        float: The signal; higher means stronger.
+    """
+    sentiment_results = sentiment_results or {}
+    counts = sentiment_results.get("counts") or {}
+    total_comments = sum(counts.values())
+    negative_share = counts.get("Negative", 0) / total_comments if total_comments else 0.0
+    avg_compound = sentiment_results.get("avg_compound") or 0.0
+
+    return (
+        weights["score"] * math.log1p(max(post.score or 0, 0))
+        + weights["comments"] * math.log1p(max(post.number_of_comments or 0, 0))
+        + weights["upvote_ratio"] * (post.upvote_ratio or 0.0)
+        + weights["negative_share"] * negative_share
+        + weights["negativity"] * max(-avg_compound, 0.0)
+    )
 
-    except Exception as e:
-        logger.error(f"Error while chunking text: {e}", exc_info=True)
 
-    return blocks
+def estimate_tokens(text: str) -> int:
+    """
+    Roughly estimate the number of LLM tokens in a string (about four characters per token).
+    Args:
+        text (str): The text to estimate.
+    Returns:
+        int: Estimated token count.
+    """
+    return len(text) // 4 + 1
 
 
-def create_notion_blocks(text_blocks: List[str], safe_max: int = 1950) -> List[Dict]:
+def plan_token_batches(records: List[Dict], token_budget: int) -> List[List[Dict]]:
     """
-    Convert a list of text chunks into Notion paragraph block dicts.
+    Greedily pack records into batches whose serialized size stays within a token budget.
+    A single record larger than the budget gets a batch of its own.
     Args:
-        text_blocks (List[str]): Text chunks to convert.
-        safe_max (int): Maximum characters per Notion rich_text entry.
+        records (List[Dict]): JSON-serializable records, in the order they should be sent.
+        token_budget (int): Maximum estimated tokens per batch.
     Returns:
-        List[Dict]: List of Notion block dictionaries.
+        List[List[Dict]]: The planned batches.
     """
-    notion_blocks = []
-    try:
-        for block in text_blocks:
-            start = 0
-            while start < len(block):
-                chunk = block[start:start + safe_max]
-                notion_blocks.append({
-                    "object": "block",
-                    "type": "paragraph",
-                    "paragraph": {
-                        "rich_text": [{"type": "text", "text": {"content": chunk}}]
-                    }
-                })
-                start += safe_max
-
-        logger.info(f"Created {len(notion_blocks)} Notion blocks.")
+    batches = []
+    current_batch = []
+    current_tokens = 0
 
-    except Exception as e:
-        logger.error(f"Error creating Notion blocks: {e}", exc_info=True)
+    for record in records:
+        record_tokens = estimate_tokens(json.dumps(record, default=str))
+        if current_batch and current_tokens + record_tokens > token_budget:
+            batches.append(current_batch)
+            current_batch = []
+            current_tokens = 0
+
+        current_batch.append(record)
+        current_tokens += record_tokens
+
+    if current_batch:
+        batches.append(current_batch)
 
-    return notion_blocks
+    return batches
 
 
 def format_email(
@@ -289,21 +456,39 @@ def format_email(
         return ""
 
 
-def send_by_channel(service: Any, choice: str, notion_only: str, email_only: str, all_channels: str) -> None:
+def channels_for_choice(choice: str, notion_only: str, email_only: str, all_channels: str) -> List[str]:
     """
-    Dispatch a processed brief to the appropriate output channels.
+    Map the user's output choice to the egress channels it covers.
     Args:
-        service: An EgressService instance with create_notion_page() and send_email() methods.
         choice (str): The user's selected output channel.
         notion_only (str): Config value representing the Notion-only choice.
         email_only (str): Config value representing the email-only choice.
         all_channels (str): Config value representing the all-channels choice.
+    Returns:
+        List[str]: Channel names, e.g. ["notion", "email"].
     """
+    channels = []
     if choice in (notion_only, all_channels):
-        logger.info("Publishing to Notion...")
-        service.create_notion_page()
+        channels.append(settings.NOTION_CHANNEL)
 
     if choice in (email_only, all_channels):
-        logger.info("Sending email report...")
-        service.send_email()
-        
\ No newline at end of file
+        channels.append(settings.EMAIL_CHANNEL)
+
+    return channels
+
+
+def send_by_channel(service: Any, choice: str, notion_only: str, email_only: str, all_channels: str) -> Dict[str, Dict]:
+    """
+    Dispatch a processed brief to the appropriate output channels concurrently.
+    Args:
+        service: An EgressService instance with a dispatcher holding the registered channels.
+        choice (str): The user's selected output channel.
+        notion_only (str): Config value representing the Notion-only choice.
+        email_only (str): Config value representing the email-only choice.
+        all_channels (str): Config value representing the all-channels choice.
+    Returns:
+        Dict[str, Dict]: Per-channel delivery results from the dispatcher.
+    """
+    channels = channels_for_choice(choice, notion_only, email_only, all_channels)
+    logger.info(f"Delivering brief to: {', '.join(channels) or 'no channels'}")
+    return service.dispatcher.dispatch(channels)
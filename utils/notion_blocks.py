@@ -0,0 +1,254 @@
+import io
+import re
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+# Notion limits: characters per rich text object and rich text objects per block.
+MAX_RICH_TEXT_LENGTH = 2000
+MAX_RICH_TEXT_ITEMS = 100
+
+HEADING_PATTERN = re.compile(r"^\s{0,3}(#{1,6})\s+(.*?)\s*#*\s*$")
+BULLET_PATTERN = re.compile(r"^\s*[-*+]\s+(.*)$")
+NUMBERED_PATTERN = re.compile(r"^\s*\d+[.)]\s+(.*)$")
+QUOTE_PATTERN = re.compile(r"^\s{0,3}>\s?(.*)$")
+FENCE_PATTERN = re.compile(r"^\s{0,3}```\s*([\w+-]*)\s*$")
+DIVIDER_PATTERN = re.compile(r"^\s{0,3}(?:[-*_]\s*){3,}$")
+# Bold is **text** or __text__; underscores only count at word boundaries, so names
+# such as snake__case stay literal.
+INLINE_PATTERN = re.compile(r"\*\*(.+?)\*\*|(?<!\w)__(?!\s)(.+?)(?<!\s)__(?!\w)|`([^`\n]+)`")
+IDENTIFIER_PATTERN = re.compile(r"\w+")
+
+# Preferred places to split long text, strongest first.
+SENTENCE_BREAKS = (". ", "! ", "? ", "\n")
+
+CODE_LANGUAGES = {"bash", "css", "html", "java", "javascript", "json", "markdown", "python", "shell", "sql",
+                  "typescript", "yaml"}
+
+# A run of text with its annotations, e.g. ("hello", {"bold": True}).
+Span = Tuple[str, Dict[str, bool]]
+
+
+def find_split(text: str, start: int, limit: int) -> int:
+    """
+    Find where to end a chunk of text[start:] no longer than limit characters: after the
+    last sentence break in the window, else at the last space, else at the limit itself.
+    Only the window is scanned, so splitting a whole text stays linear.
+    """
+    end = start + limit
+    floor = start + limit // 2
+
+    sentence_end = max(text.rfind(separator, floor, end) for separator in SENTENCE_BREAKS)
+    if sentence_end != -1:
+        return sentence_end + 1
+
+    space = text.rfind(" ", floor, end)
+    if space != -1:
+        return space
+
+    return end
+
+
+def split_text(text: str, limit: int = MAX_RICH_TEXT_LENGTH) -> Iterator[str]:
+    """
+    Split text into chunks of at most limit characters at sentence or word boundaries.
+    """
+    start = 0
+    while len(text) - start > limit:
+        end = find_split(text, start, limit)
+        yield text[start:end]
+        start = end
+    if start < len(text):
+        yield text[start:]
+
+
+def parse_inline(text: str) -> Iterator[Span]:
+    """
+    Split one line of markdown into plain, bold and inline code spans.
+    """
+    position = 0
+    for match in INLINE_PATTERN.finditer(text):
+        if match.start() > position:
+            yield text[position:match.start()], {}
+        if match.group(3) is not None:
+            yield match.group(3), {"code": True}
+        elif match.group(1) is not None:
+            yield match.group(1), {"bold": True}
+        elif IDENTIFIER_PATTERN.fullmatch(match.group(2)):
+            # A dunder name such as __init__ is literal text, not bold.
+            yield match.group(0), {}
+        else:
+            yield match.group(2), {"bold": True}
+        position = match.end()
+    if position < len(text):
+        yield text[position:], {}
+
+
+def merge_spans(spans: Iterable[Span]) -> Iterator[Span]:
+    """
+    Join adjacent spans with the same annotations, so line breaks and plain runs
+    do not each cost a rich text object.
+    """
+    pending_text: List[str] = []
+    pending_annotations: Optional[Dict[str, bool]] = None
+    for text, annotations in spans:
+        if pending_text and annotations != pending_annotations:
+            yield "".join(pending_text), pending_annotations
+            pending_text = []
+        pending_text.append(text)
+        pending_annotations = annotations
+    if pending_text:
+        yield "".join(pending_text), pending_annotations
+
+
+def build_rich_text(spans: Iterable[Span]) -> Iterator[Dict]:
+    """
+    Turn spans into Notion rich text objects, merging adjacent spans with the same
+    annotations and splitting any span over the length limit.
+    """
+    for text, annotations in merge_spans(spans):
+        for chunk in split_text(text):
+            rich_text = {"type": "text", "text": {"content": chunk}}
+            if annotations:
+                rich_text["annotations"] = dict(annotations)
+            yield rich_text
+
+
+def make_blocks(block_type: str, spans: List[Span], extra: Optional[Dict] = None) -> Iterator[Dict]:
+    """
+    Build one block of the given type, continuing in further blocks of the same type
+    if the text needs more rich text objects than a block can hold.
+    """
+    items: List[Dict] = []
+    for rich_text in build_rich_text(spans):
+        items.append(rich_text)
+        if len(items) == MAX_RICH_TEXT_ITEMS:
+            yield {"object": "block", "type": block_type, block_type: {"rich_text": items, **(extra or {})}}
+            items = []
+    if items:
+        yield {"object": "block", "type": block_type, block_type: {"rich_text": items, **(extra or {})}}
+
+
+class MarkdownToNotionConverter:
+    """
+    Streaming converter from markdown to Notion blocks. Lines are fed one at a time and
+    finished blocks are emitted as soon as the next line shows they are complete, so a
+    brief is converted in a single linear pass.
+    Supports headings, bulleted and numbered lists, quotes, dividers, fenced code
+    and paragraphs, with bold and inline code inside text.
+    """
+
+    def __init__(self):
+        self.block_type: Optional[str] = None
+        self.spans: List[Span] = []
+        self.code_language: Optional[str] = None
+        self.code_lines: List[str] = []
+
+
+    def _flush(self) -> Iterator[Dict]:
+        """
+        Emit the block being built, if any.
+        """
+        if self.block_type and self.spans:
+            yield from make_blocks(self.block_type, self.spans)
+        self.block_type = None
+        self.spans = []
+
+
+    def _start(self, block_type: str, text: str) -> Iterator[Dict]:
+        """
+        Finish the current block and start a new one with the given text.
+        """
+        yield from self._flush()
+        self.block_type = block_type
+        self.spans = list(parse_inline(text))
+
+
+    def feed(self, line: str) -> Iterator[Dict]:
+        """
+        Consume one line of markdown and emit the blocks it completes.
+        """
+        line = line.rstrip("\r\n")
+
+        if self.code_language is not None:
+            if FENCE_PATTERN.match(line):
+                language = self.code_language if self.code_language in CODE_LANGUAGES else "plain text"
+                yield from make_blocks("code", [("\n".join(self.code_lines), {})], {"language": language})
+                self.code_language = None
+                self.code_lines = []
+            else:
+                self.code_lines.append(line)
+            return
+
+        if not line.strip():
+            yield from self._flush()
+            return
+
+        fence = FENCE_PATTERN.match(line)
+        if fence:
+            yield from self._flush()
+            self.code_language = fence.group(1).lower()
+            return
+
+        heading = HEADING_PATTERN.match(line)
+        if heading:
+            level = min(len(heading.group(1)), 3)
+            yield from self._start(f"heading_{level}", heading.group(2))
+            yield from self._flush()
+            return
+
+        if DIVIDER_PATTERN.match(line):
+            yield from self._flush()
+            yield {"object": "block", "type": "divider", "divider": {}}
+            return
+
+        bullet = BULLET_PATTERN.match(line)
+        if bullet:
+            yield from self._start("bulleted_list_item", bullet.group(1))
+            return
+
+        numbered = NUMBERED_PATTERN.match(line)
+        if numbered:
+            yield from self._start("numbered_list_item", numbered.group(1))
+            return
+
+        quote = QUOTE_PATTERN.match(line)
+        if quote:
+            if self.block_type == "quote":
+                self.spans.append(("\n", {}))
+                self.spans.extend(parse_inline(quote.group(1)))
+            else:
+                yield from self._start("quote", quote.group(1))
+            return
+
+        if self.block_type is None:
+            yield from self._start("paragraph", line.strip())
+        else:
+            # A plain line continues the current paragraph, list item or quote.
+            self.spans.append(("\n", {}))
+            self.spans.extend(parse_inline(line.strip()))
+
+
+    def close(self) -> Iterator[Dict]:
+        """
+        Emit whatever is still open at the end of the document; an unterminated
+        code fence becomes a code block.
+        """
+        if self.code_language is not None:
+            language = self.code_language if self.code_language in CODE_LANGUAGES else "plain text"
+            yield from make_blocks("code", [("\n".join(self.code_lines), {})], {"language": language})
+            self.code_language = None
+            self.code_lines = []
+        yield from self._flush()
+
+
+def markdown_to_notion_blocks(markdown: str) -> Iterator[Dict]:
+    """
+    Convert a markdown brief to Notion blocks in a single pass.
+    Args:
+        markdown (str): The markdown content.
+    Returns:
+        Iterator[Dict]: Notion block dicts, in document order.
+    """
+    converter = MarkdownToNotionConverter()
+    for line in io.StringIO(markdown or ""):
+        yield from converter.feed(line)
+    yield from converter.close()
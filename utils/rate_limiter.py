@@ -0,0 +1,51 @@
+import threading
+import time
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket used to share one request budget between concurrent workers.
+    """
+
+    def __init__(self, rate_per_minute: float, capacity: float | None = None):
+        if rate_per_minute <= 0:
+            raise ValueError("rate_per_minute must be greater than zero.")
+
+        self.rate_per_second = rate_per_minute / 60.0
+        self.capacity = capacity if capacity is not None else rate_per_minute
+        self.tokens = self.capacity
+        self.updated_at = time.monotonic()
+        self.lock = threading.Lock()
+
+
+    def _refill(self) -> None:
+        """
+        Add the tokens accumulated since the last refill, capped at capacity.
+        """
+        now = time.monotonic()
+        elapsed = now - self.updated_at
+        self.tokens = min(self.capacity, self.tokens + elapsed * self.rate_per_second)
+        self.updated_at = now
+
+
+    def acquire(self, tokens: float = 1) -> float:
+        """
+        Block until the requested number of tokens is available and consume them.
+        Args:
+            tokens (float): Number of tokens to consume.
+        Returns:
+            float: Seconds spent waiting for the budget.
+        """
+        tokens = min(tokens, self.capacity)
+        waited = 0.0
+
+        while True:
+            with self.lock:
+                self._refill()
+                if self.tokens >= tokens:
+                    self.tokens -= tokens
+                    return waited
+                wait_time = (tokens - self.tokens) / self.rate_per_second
+
+            time.sleep(wait_time)
+            waited += wait_time
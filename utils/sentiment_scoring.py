@@ -0,0 +1,99 @@
+import hashlib
+import nltk
+from concurrent.futures import ProcessPoolExecutor
+from typing import List
+from nltk.sentiment import SentimentIntensityAnalyzer
+
+# Part of every cache key, so upgrading NLTK (and its VADER implementation) invalidates old scores.
+ANALYZER_VERSION = f"vader-nltk-{nltk.__version__}"
+
+# Analyzer owned by each pool worker, loaded once by _initialize_worker().
+_worker_analyzer = None
+
+
+def _initialize_worker() -> None:
+    """
+    Load the VADER lexicon once per worker process.
+    """
+    global _worker_analyzer
+    _worker_analyzer = SentimentIntensityAnalyzer()
+
+
+def _score_batch(texts: List[str]) -> List[float]:
+    """
+    Score one batch of comment texts inside a worker process.
+    """
+    return [_worker_analyzer.polarity_scores(text)["compound"] for text in texts]
+
+
+def comment_cache_key(text: str) -> str:
+    """
+    Hash a comment body together with the analyzer version for the sentiment cache.
+    Runs of whitespace are collapsed first: VADER tokenizes on whitespace, so this
+    never changes the score, while case and punctuation (which VADER uses) are kept.
+    Args:
+        text (str): The comment body.
+    Returns:
+        str: Hex SHA-256 digest.
+    """
+    normalized = " ".join((text or "").split())
+    return hashlib.sha256(f"{ANALYZER_VERSION}\n{normalized}".encode("utf-8")).hexdigest()
+
+
+def label_compound(compound: float) -> str:
+    """
+    Map a VADER compound score to its sentiment label.
+    Args:
+        compound (float): The compound score.
+    Returns:
+        str: "Positive", "Negative" or "Neutral".
+    """
+    if compound > 0.05:
+        return "Positive"
+    elif compound < -0.05:
+        return "Negative"
+    return "Neutral"
+
+
+def score_texts_serial(analyzer: SentimentIntensityAnalyzer, texts: List[str]) -> List[float]:
+    """
+    Score comment texts one at a time on the current process.
+    Args:
+        analyzer (SentimentIntensityAnalyzer): A loaded VADER analyzer.
+        texts (List[str]): Comment texts to score.
+    Returns:
+        List[float]: Compound scores in the same order as texts.
+    """
+    return [analyzer.polarity_scores(text)["compound"] for text in texts]
+
+
+def create_scoring_pool(workers: int) -> ProcessPoolExecutor:
+    """
+    Start a process pool whose workers each load the VADER lexicon once.
+    The caller owns the pool and should reuse it for every batch of a run.
+    Args:
+        workers (int): Number of worker processes.
+    Returns:
+        ProcessPoolExecutor: The scoring pool.
+    """
+    return ProcessPoolExecutor(max_workers=workers, initializer=_initialize_worker)
+
+
+def score_texts_parallel(executor: ProcessPoolExecutor, texts: List[str], batch_size: int) -> List[float]:
+    """
+    Score comment texts across a process pool, one batch per task.
+    Results are returned in input order and are identical to the serial path.
+    Args:
+        executor (ProcessPoolExecutor): Pool from create_scoring_pool().
+        texts (List[str]): Comment texts to score.
+        batch_size (int): Comment texts per task.
+    Returns:
+        List[float]: Compound scores in the same order as texts.
+    """
+    batches = [texts[start:start + batch_size] for start in range(0, len(texts), batch_size)]
+    compound_scores: List[float] = []
+
+    for batch_scores in executor.map(_score_batch, batches):
+        compound_scores.extend(batch_scores)
+
+    return compound_scores